@@ -0,0 +1,7 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 14:10
+@Author  : tianshiyang
+@File    : __init__.py.py
+"""
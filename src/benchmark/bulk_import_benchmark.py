@@ -0,0 +1,101 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/19 15:40
+@Author  : tianshiyang
+@File    : bulk_import_benchmark.py
+"""
+import sys
+import time
+
+import numpy as np
+
+from milvus.bulk_import import DEFAULT_INDEX_PARAMS, bulk_insert_rows, create_collection
+
+# 本地 standalone（docker compose 启动，自带 MinIO）
+STANDALONE_ARGS = {"uri": "http://localhost:19530", "token": "root:Milvus"}
+
+ROW_COLLECTION = "bulk_benchmark_rows"
+
+BULK_COLLECTION = "bulk_benchmark_import"
+
+
+def synthetic_rows(num_rows: int, dim: int, seed: int = 0, batch: int = 10_000):
+    """随机向量代替真实 embedding，只比较写入路径的耗时"""
+    rng = np.random.default_rng(seed)
+    for start in range(0, num_rows, batch):
+        vectors = rng.normal(size=(min(batch, num_rows - start), dim)).astype(np.float32)
+        for i, vector in enumerate(vectors):
+            row_id = start + i
+            yield {
+                "id": f"chunk-{row_id}",
+                "content": f"chunk {row_id}",
+                "vector": vector.tolist(),
+                "$meta": {"source": f"doc-{row_id // 100}"},
+            }
+
+
+def _reset(client, collection_name: str):
+    if client.has_collection(collection_name):
+        client.drop_collection(collection_name)
+
+
+def row_insert(client, num_rows: int, dim: int, batch_size: int = 1000) -> dict:
+    """现有路径：先建索引并 load，再按批 insert"""
+    _reset(client, ROW_COLLECTION)
+    create_collection(client, ROW_COLLECTION, dim)
+    params = client.prepare_index_params()
+    params.add_index("vector", **DEFAULT_INDEX_PARAMS)
+    client.create_index(ROW_COLLECTION, params)
+    client.load_collection(ROW_COLLECTION)
+
+    start = time.perf_counter()
+    rows = []
+    for row in synthetic_rows(num_rows, dim):
+        meta = row.pop("$meta")
+        rows.append({**row, **meta})
+        if len(rows) >= batch_size:
+            client.insert(ROW_COLLECTION, rows)
+            rows = []
+    if rows:
+        client.insert(ROW_COLLECTION, rows)
+    insert_seconds = time.perf_counter() - start
+    client.flush(ROW_COLLECTION)
+    total = time.perf_counter() - start
+    return {"insert": insert_seconds, "flush": total - insert_seconds, "total": total}
+
+
+def bulk_insert(client, num_rows: int, dim: int, file_type: str = None) -> dict:
+    _reset(client, BULK_COLLECTION)
+    return bulk_insert_rows(
+        BULK_COLLECTION,
+        synthetic_rows(num_rows, dim),
+        dim,
+        connection_args=STANDALONE_ARGS,
+        file_type=file_type,
+        verbose=False,
+    )
+
+
+def main(num_rows: int = 1_000_000, dim: int = 1024, file_type: str = None):
+    """
+    对比 100 万条 chunk 的两种写入方式（需要本地 Milvus standalone + MinIO）：
+    逐批 insert（索引已存在） vs 写列式文件 + bulk import + 导入后建索引。
+    """
+    from pymilvus import MilvusClient
+
+    client = MilvusClient(**STANDALONE_ARGS)
+    results = {
+        "row insert": row_insert(client, num_rows, dim),
+        "bulk import": bulk_insert(client, num_rows, dim, file_type),
+    }
+    for name, timings in results.items():
+        detail = ", ".join(f"{key}={value:.1f}s" for key, value in timings.items() if key not in ("rows", "total"))
+        print(f"{name:<12} total={timings['total']:.1f}s  {num_rows / timings['total']:.0f} rows/s  ({detail})")
+    for collection_name in (ROW_COLLECTION, BULK_COLLECTION):
+        _reset(client, collection_name)
+
+
+if __name__ == "__main__":
+    # python benchmark/bulk_import_benchmark.py 100000
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
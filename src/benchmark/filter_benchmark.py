@@ -0,0 +1,100 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/19 16:50
+@Author  : tianshiyang
+@File    : filter_benchmark.py
+"""
+import sys
+import time
+
+import numpy as np
+
+from milvus.schema import COLLECTION_SCHEMAS, create_collection, prepare_index_params
+
+# 本地 standalone，Milvus Lite 不支持标量索引
+STANDALONE_ARGS = {"uri": "http://localhost:19530", "token": "root:Milvus"}
+
+VECTOR_INDEX = {"index_type": "HNSW", "metric_type": "L2", "params": {"M": 16, "efConstruction": 200}}
+
+# 与 index.py / rag.py / semantic_search.py 中的过滤条件同类
+FILTERS = {
+    "==": 'book_name == "book_{n}"',
+    "like 前缀": 'book_name like "book_{n}%"',
+    "in": 'book_id in ["id-{n}", "id-{m}"]',
+    "范围": "page_no >= {n} and page_no < {m}",
+    "and": 'source == "source_{s}" and page_no < 10',
+}
+
+
+def _rows(num_rows: int, dim: int, rng):
+    for start in range(0, num_rows, 5000):
+        vectors = rng.normal(size=(min(5000, num_rows - start), dim)).astype(np.float32)
+        yield [
+            {
+                "pk": f"pk-{start + i}",
+                "text": f"chunk {start + i}",
+                "vector": vector.tolist(),
+                "book_id": f"id-{(start + i) // 50}",
+                "book_name": f"book_{(start + i) % 1000}",
+                "source": f"source_{(start + i) % 100}",
+                "page_no": int((start + i) % 500),
+                "chunk_id": f"chunk-{start + i}",
+            }
+            for i, vector in enumerate(vectors)
+        ]
+
+
+def _create(client, name: str, mode: str, dim: int):
+    """dynamic：过滤字段在 $meta 中；typed：有类型但无标量索引；indexed：有类型 + 标量索引"""
+    if client.has_collection(name):
+        client.drop_collection(name)
+    fields = COLLECTION_SCHEMAS["books"]
+    if mode == "indexed":
+        create_collection(client, name, dim, fields, index_params=VECTOR_INDEX)
+        return
+    create_collection(client, name, dim, fields if mode == "typed" else [], with_index=False)
+    client.create_index(name, prepare_index_params(client, [], index_params=VECTOR_INDEX))
+    client.load_collection(name)
+
+
+def main(num_rows: int = 200_000, dim: int = 128, num_queries: int = 100):
+    """
+    同样的数据分别写入三种集合，对比带过滤条件的检索延迟（p50 / p99，毫秒）。
+    """
+    from pymilvus import MilvusClient
+
+    client = MilvusClient(**STANDALONE_ARGS)
+    modes = ("dynamic", "typed", "indexed")
+    for mode in modes:
+        name = f"filter_benchmark_{mode}"
+        _create(client, name, mode, dim)
+        for rows in _rows(num_rows, dim, np.random.default_rng(0)):
+            client.insert(name, rows)
+        client.flush(name)
+
+    rng = np.random.default_rng(1)
+    print(f"{'filter':<10}" + "".join(f"{mode + ' p50':>14}{mode + ' p99':>14}" for mode in modes))
+    for label, template in FILTERS.items():
+        expressions = [
+            template.format(n=rng.integers(0, 400), m=rng.integers(400, 1000), s=rng.integers(0, 100))
+            for _ in range(num_queries)
+        ]
+        queries = rng.normal(size=(num_queries, dim)).astype(np.float32)
+        line = f"{label:<10}"
+        for mode in modes:
+            latencies = []
+            for expr, query in zip(expressions, queries):
+                start = time.perf_counter()
+                client.search(f"filter_benchmark_{mode}", data=[query.tolist()], limit=10, filter=expr)
+                latencies.append((time.perf_counter() - start) * 1000)
+            line += f"{np.percentile(latencies, 50):>14.2f}{np.percentile(latencies, 99):>14.2f}"
+        print(line)
+
+    for mode in modes:
+        client.drop_collection(f"filter_benchmark_{mode}")
+
+
+if __name__ == "__main__":
+    # python benchmark/filter_benchmark.py 200000
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,81 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/19 12:10
+@Author  : tianshiyang
+@File    : hybrid_eval.py
+"""
+import itertools
+import json
+import statistics
+
+from milvus.hybrid import HybridLeg, hybrid_search
+
+
+def load_eval_set(path: str) -> list[dict]:
+    """jsonl，每行 {"query": "...", "relevant_ids": ["...", ...]}"""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def candidate_settings(dense_field: str, sparse_field: str):
+    """需要评估的融合方式、权重和每一路的候选数量"""
+    for limit in (10, 20, 50):
+        for rrf_k in (20, 60, 100):
+            yield "rrf", {"k": rrf_k}, [HybridLeg(dense_field, limit), HybridLeg(sparse_field, limit)]
+        for dense_weight in (0.2, 0.4, 0.5, 0.6, 0.8):
+            yield "weighted", {}, [
+                HybridLeg(dense_field, limit, weight=dense_weight),
+                HybridLeg(sparse_field, limit, weight=round(1 - dense_weight, 2)),
+            ]
+
+
+def evaluate(store, eval_set: list[dict], ranker: str, ranker_params: dict, legs: list[HybridLeg], k: int) -> dict:
+    pk = store._primary_field
+    recalls, latencies = [], []
+    for item in eval_set:
+        result = hybrid_search(store, item["query"], legs=legs, k=k, ranker=ranker, ranker_params=ranker_params)
+        found = {doc.metadata.get(pk) for doc, _ in result.documents}
+        relevant = set(item["relevant_ids"])
+        recalls.append(len(found & relevant) / max(1, len(relevant)))
+        latencies.append(result.timings["fused"])
+    latencies.sort()
+    return {
+        "recall": statistics.mean(recalls),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+    }
+
+
+def main(store, eval_set: list[dict], latency_budget_ms: float = 50, k: int = 4,
+         dense_field: str = "vector", sparse_field: str = "sparse") -> dict:
+    """
+    网格搜索融合参数，在 p95 延迟不超过 latency_budget_ms 的组合中选 recall 最高的。
+
+    Args:
+        store: 混合检索的 Milvus store
+        eval_set: 标注好的 query 和相关文档主键
+        latency_budget_ms: p95 延迟预算
+        k: 返回条数
+    """
+    rows = []
+    for ranker, ranker_params, legs in candidate_settings(dense_field, sparse_field):
+        metrics = evaluate(store, eval_set, ranker, ranker_params, legs, k)
+        rows.append({"ranker": ranker, "ranker_params": ranker_params, "legs": legs, **metrics})
+        weights = "/".join(str(leg.weight) for leg in legs) if ranker == "weighted" else f"k={ranker_params['k']}"
+        print(
+            f"{ranker:<10}{weights:<10}limit={legs[0].limit:<5}"
+            f"recall@{k}={metrics['recall']:.3f}  p50={metrics['p50_ms']:.1f}ms  p95={metrics['p95_ms']:.1f}ms"
+        )
+
+    within_budget = [row for row in rows if row["p95_ms"] <= latency_budget_ms] or rows
+    best = max(within_budget, key=lambda row: (row["recall"], -row["p95_ms"]))
+    print(f"推荐: ranker={best['ranker']} params={best['ranker_params']} legs={best['legs']}")
+    return best
+
+
+if __name__ == "__main__":
+    from milvus.hybrid_search import get_milvus_client
+
+    # main(get_milvus_client(), load_eval_set("hybrid_eval.jsonl"))
+    pass
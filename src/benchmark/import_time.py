@@ -0,0 +1,152 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 14:10
+@Author  : tianshiyang
+@File    : import_time.py
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 名称 -> 在新进程中执行的代码
+CASES = {
+    # 改造前 import provider 会同时加载三个厂商 SDK 并创建三个客户端
+    "eager (旧: 三个 SDK)": "import langchain_openai, langchain_qwq, langchain_google_genai",
+    "import provider": "import provider",
+    "provider.qwenLLM": "import provider; provider.qwenLLM",
+    "import milvus": "import milvus",
+    "import utils": "import utils",
+}
+
+# python -X importtime 统计的累计耗时上限（毫秒），可用环境变量 IMPORT_BUDGET_MS 覆盖
+IMPORT_BUDGET_MS = {
+    "milvus": 150,
+    "utils": 150,
+    "provider": 150,
+}
+
+
+def measure(code: str, repeat: int = 5) -> list[float]:
+    """在独立进程中执行 code，返回每次的耗时（秒）"""
+    env = dict(os.environ, PYTHONPATH=SRC_PATH)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=SRC_PATH, env=env, check=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def import_time_us(module: str) -> int:
+    """用 python -X importtime 统计 import module 的累计耗时（微秒）"""
+    env = dict(os.environ, PYTHONPATH=SRC_PATH)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_PATH, env=env, check=True, capture_output=True, text=True,
+    )
+    # 格式: import time: self [us] | cumulative | imported package
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = [part.strip() for part in line[len("import time:"):].split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise RuntimeError(f"未在 -X importtime 输出中找到 {module}")
+
+
+def check_budget() -> bool:
+    """import 耗时回归检查，任何一个模块超出预算返回 False"""
+    override = os.getenv("IMPORT_BUDGET_MS")
+    ok = True
+    for module, budget in IMPORT_BUDGET_MS.items():
+        budget = float(override) if override else budget
+        # 取多次中的最小值，降低机器抖动的影响
+        cost = min(import_time_us(module) for _ in range(3)) / 1000
+        status = "OK" if cost <= budget else "超出预算"
+        print(f"import {module:<10}{cost:>10.1f}ms / {budget:.0f}ms  {status}")
+        ok = ok and cost <= budget
+    return ok
+
+
+# 包中按名字懒加载的实例：同名的子模块一旦被 import 就会覆盖包属性，__getattr__ 不再生效
+LAZY_INSTANCES = {
+    "milvus": ["client"],
+    "utils": ["embeddings", "dashscope_embeddings"],
+}
+
+# from milvus import client 必须得到 books store 而不是模块；用占位的 get_client 避免连接 Milvus
+CLIENT_BINDING_CHECK = (
+    "import types, milvus, milvus.books_store as books_store\n"
+    "books_store.get_client = lambda: 'books store'\n"
+    "from milvus import client\n"
+    "assert not isinstance(client, types.ModuleType), type(client)\n"
+    "assert client == 'books store', client\n"
+)
+
+# from utils import embeddings 必须得到 Embeddings 实例（需要 langchain_community / dashscope）
+EMBEDDINGS_BINDING_CHECK = (
+    "import os, pkgutil, importlib, utils\n"
+    "os.environ.setdefault('DASHSCOPE_API_KEY', 'import-check')\n"
+    "from langchain_core.embeddings import Embeddings\n"
+    "for info in pkgutil.iter_modules(utils.__path__):\n"
+    "    importlib.import_module(f'utils.{info.name}')\n"
+    "from utils import embeddings\n"
+    "assert isinstance(embeddings, Embeddings), type(embeddings)\n"
+)
+
+
+def check_lazy_names() -> bool:
+    """懒加载的名字不能有同名子模块"""
+    ok = True
+    for package, names in LAZY_INSTANCES.items():
+        for name in names:
+            path = os.path.join(SRC_PATH, package, f"{name}.py")
+            clash = os.path.exists(path) or os.path.isdir(os.path.join(SRC_PATH, package, name))
+            print(f"{package}.{name:<22}{'同名子模块会覆盖懒加载: ' + path if clash else 'OK'}")
+            ok = ok and not clash
+    return ok
+
+
+def _run_check(title: str, code: str, skip_missing: bool = False) -> bool:
+    env = dict(os.environ, PYTHONPATH=SRC_PATH)
+    result = subprocess.run([sys.executable, "-c", code], cwd=SRC_PATH, env=env, capture_output=True, text=True)
+    if result.returncode == 0:
+        print(f"{title:<32}OK")
+        return True
+    last = result.stderr.strip().splitlines()[-1]
+    if skip_missing and last.startswith("ModuleNotFoundError"):
+        # 缺少可选依赖时无法创建实例，子模块同名的问题由 check_lazy_names 覆盖
+        print(f"{title:<32}跳过（{last}）")
+        return True
+    print(f"{title:<32}失败: {last}")
+    return False
+
+
+def check_bindings() -> bool:
+    results = [
+        check_lazy_names(),
+        _run_check("from milvus import client", CLIENT_BINDING_CHECK),
+        _run_check("from utils import embeddings", EMBEDDINGS_BINDING_CHECK, skip_missing=True),
+    ]
+    return all(results)
+
+
+def main(repeat: int = 5):
+    baseline = statistics.median(measure("pass", repeat))
+    print(f"{'case':<24}{'median(ms)':>12}{'min(ms)':>12}")
+    for name, code in CASES.items():
+        timings = [t - baseline for t in measure(code, repeat)]
+        print(f"{name:<24}{statistics.median(timings) * 1000:>12.1f}{min(timings) * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    # python benchmark/import_time.py --check 作为回归检查，超出预算时退出码为 1
+    if "--check" in sys.argv:
+        budget_ok = check_budget()
+        sys.exit(0 if check_bindings() and budget_ok else 1)
+    main()
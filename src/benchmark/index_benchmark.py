@@ -0,0 +1,219 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 21:30
+@Author  : tianshiyang
+@File    : index_benchmark.py
+"""
+import os
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from milvus.config import CONNECTION_ARGS
+
+SRC_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 默认在本地 Milvus Lite 上压测，可以换成 standalone 的地址
+LITE_URI = os.path.join(SRC_PATH, ".cache", "index_benchmark.db")
+
+BENCH_COLLECTION = "index_benchmark"
+
+# collection -> (向量字段, 度量方式)，与建表时保持一致
+COLLECTIONS = {
+    "books": ("vector", "L2"),
+    "hybrid": ("vector", "COSINE"),
+    "rag_agent": ("dense", "COSINE"),
+}
+
+
+@dataclass
+class IndexConfig:
+    index_type: str
+    build_params: dict = field(default_factory=dict)
+    search_params: dict = field(default_factory=dict)
+
+    @property
+    def name(self) -> str:
+        params = {**self.build_params, **self.search_params}
+        return f"{self.index_type}({', '.join(f'{k}={v}' for k, v in params.items())})"
+
+
+def sweep_configs(num_vectors: int) -> list[IndexConfig]:
+    """需要压测的索引参数组合，nlist 按数据量取 4*sqrt(n)"""
+    nlist = max(16, int(4 * np.sqrt(num_vectors)))
+    configs = [IndexConfig("FLAT")]
+    for index_type, extra in (("IVF_FLAT", {}), ("IVF_SQ8", {}), ("IVF_PQ", {"m": 16, "nbits": 8})):
+        for nprobe in (8, 16, 64):
+            configs.append(IndexConfig(index_type, {"nlist": nlist, **extra}, {"nprobe": nprobe}))
+    for m in (8, 16, 32):
+        for ef in (32, 64, 128):
+            configs.append(IndexConfig("HNSW", {"M": m, "efConstruction": 200}, {"ef": ef}))
+    return configs
+
+
+def load_vectors(collection: str, limit: int = 100_000, connection_args: dict = None) -> np.ndarray:
+    """从线上 collection 分页拉取向量"""
+    from pymilvus import MilvusClient
+
+    vector_field, _ = COLLECTIONS[collection]
+    client = MilvusClient(**{k: v for k, v in (connection_args or CONNECTION_ARGS).items() if v is not None})
+    iterator = client.query_iterator(collection, batch_size=1000, limit=limit, output_fields=[vector_field])
+    vectors = []
+    while True:
+        rows = iterator.next()
+        if not rows:
+            iterator.close()
+            break
+        vectors.extend(row[vector_field] for row in rows)
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def synthetic_vectors(num: int = 20_000, dim: int = 1024, seed: int = 0) -> np.ndarray:
+    """没有线上数据时使用的聚簇随机向量"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(64, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, 64, num)] + 0.3 * rng.normal(size=(num, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _prepare(client, vectors: np.ndarray, metric: str):
+    from pymilvus import DataType
+
+    if client.has_collection(BENCH_COLLECTION):
+        client.drop_collection(BENCH_COLLECTION)
+    schema = client.create_schema(auto_id=False, enable_dynamic_field=False)
+    schema.add_field("id", DataType.INT64, is_primary=True)
+    schema.add_field("vector", DataType.FLOAT_VECTOR, dim=vectors.shape[1])
+    client.create_collection(BENCH_COLLECTION, schema=schema)
+    for start in range(0, len(vectors), 1000):
+        part = vectors[start:start + 1000]
+        client.insert(BENCH_COLLECTION, [{"id": start + i, "vector": v.tolist()} for i, v in enumerate(part)])
+    client.flush(BENCH_COLLECTION)
+
+
+def _run(client, config: IndexConfig, queries: np.ndarray, metric: str, k: int) -> tuple[list[list[int]], np.ndarray, float]:
+    client.release_collection(BENCH_COLLECTION)
+    for index_name in client.list_indexes(BENCH_COLLECTION):
+        client.drop_index(BENCH_COLLECTION, index_name)
+
+    index_params = client.prepare_index_params()
+    index_params.add_index("vector", index_type=config.index_type, metric_type=metric, params=config.build_params)
+    build_start = time.perf_counter()
+    client.create_index(BENCH_COLLECTION, index_params)
+    client.load_collection(BENCH_COLLECTION)
+    build_seconds = time.perf_counter() - build_start
+
+    ids, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        result = client.search(
+            BENCH_COLLECTION,
+            data=[query.tolist()],
+            limit=k,
+            search_params={"metric_type": metric, "params": config.search_params},
+        )
+        latencies.append(time.perf_counter() - start)
+        ids.append([hit["id"] for hit in result[0]])
+    return ids, np.asarray(latencies), build_seconds
+
+
+def recall_at_k(ids: list[list[int]], truth: list[list[int]]) -> float:
+    hits = sum(len(set(found) & set(expected)) for found, expected in zip(ids, truth))
+    return hits / max(1, sum(len(expected) for expected in truth))
+
+
+def benchmark(
+        vectors: np.ndarray,
+        metric: str,
+        uri: str = LITE_URI,
+        num_queries: int = 200,
+        k: int = 10,
+        configs: list[IndexConfig] = None,
+) -> list[dict]:
+    """
+    对一组向量依次构建每种索引，统计 p50 / p99 延迟、QPS 和以 FLAT 为基准的 recall@k。
+
+    Args:
+        vectors: 待入库的向量
+        metric: L2 / COSINE / IP
+        uri: Milvus 地址，默认本地 Milvus Lite 文件
+        num_queries: 查询条数，从 vectors 中抽样并加少量噪声
+        k: top k
+        configs: 索引参数组合，默认 sweep_configs
+    """
+    from pymilvus import MilvusClient
+
+    os.makedirs(os.path.dirname(LITE_URI), exist_ok=True)
+    client = MilvusClient(uri)
+    _prepare(client, vectors, metric)
+
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.choice(len(vectors), size=min(num_queries, len(vectors)), replace=False)]
+    queries = queries + 0.01 * rng.normal(size=queries.shape).astype(np.float32)
+
+    truth = None
+    rows = []
+    for config in configs or sweep_configs(len(vectors)):
+        try:
+            ids, latencies, build_seconds = _run(client, config, queries, metric, k)
+        except Exception as e:
+            # Milvus Lite 不支持部分索引类型，跳过并记录原因
+            print(f"跳过 {config.name}: {e}")
+            continue
+        if truth is None:
+            # 第一个配置是 FLAT，作为精确结果
+            truth = ids
+        rows.append({
+            "config": config,
+            "recall": recall_at_k(ids, truth),
+            "p50_ms": float(np.percentile(latencies, 50) * 1000),
+            "p99_ms": float(np.percentile(latencies, 99) * 1000),
+            "qps": len(latencies) / float(latencies.sum()),
+            "build_s": build_seconds,
+        })
+    client.drop_collection(BENCH_COLLECTION)
+    return rows
+
+
+def print_report(rows: list[dict], k: int = 10):
+    print(f"{'index':<48}{f'recall@{k}':>10}{'p50(ms)':>10}{'p99(ms)':>10}{'QPS':>10}{'build(s)':>10}")
+    for row in rows:
+        print(
+            f"{row['config'].name:<48}{row['recall']:>10.3f}{row['p50_ms']:>10.2f}"
+            f"{row['p99_ms']:>10.2f}{row['qps']:>10.0f}{row['build_s']:>10.2f}"
+        )
+
+
+def recommend(rows: list[dict], metric: str, min_recall: float = 0.95) -> dict:
+    """在 recall 达标的配置里选 QPS 最高的，输出可直接传给 Milvus 的 index_params / search_params"""
+    candidates = [row for row in rows if row["recall"] >= min_recall] or rows
+    best = max(candidates, key=lambda row: row["qps"])
+    config = best["config"]
+    return {
+        "index_params": {"index_type": config.index_type, "metric_type": metric, "params": config.build_params},
+        "search_params": {"metric_type": metric, "params": config.search_params},
+        "recall": best["recall"],
+        "qps": best["qps"],
+    }
+
+
+def main(collections: list[str] = None, use_synthetic: bool = False, uri: str = LITE_URI, min_recall: float = 0.95):
+    recommendations = {}
+    for collection in collections or list(COLLECTIONS):
+        _, metric = COLLECTIONS[collection]
+        vectors = synthetic_vectors() if use_synthetic else load_vectors(collection)
+        print(f"\n===== {collection}: {len(vectors)} 条向量, metric={metric} =====")
+        rows = benchmark(vectors, metric, uri=uri)
+        print_report(rows)
+        recommendations[collection] = recommend(rows, metric, min_recall)
+        print(f"推荐: {recommendations[collection]}")
+    return recommendations
+
+
+if __name__ == "__main__":
+    # 线上数据
+    # main()
+    # 离线随机数据
+    main(use_synthetic=True)
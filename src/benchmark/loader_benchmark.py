@@ -0,0 +1,95 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/19 19:40
+@Author  : tianshiyang
+@File    : loader_benchmark.py
+"""
+import os
+import shutil
+import sys
+import time
+
+from milvus.parallel_loader import parallel_load
+
+SRC_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CORPUS_PATH = os.path.join(SRC_PATH, ".cache", "loader_benchmark")
+
+PARAGRAPH = (
+    "LLMOps platform documentation. The retrieval service loads documents, splits them into chunks, "
+    "embeds every chunk and writes the vectors into Milvus for similarity search.\n\n"
+)
+
+
+def write_pdf(path: str, num_pages: int, lines_per_page: int = 40):
+    """生成只包含文本的最小 PDF，不依赖第三方库"""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in range(num_pages):
+        lines = [f"BT /F1 10 Tf 40 {780 - 18 * i} Td (Page {page + 1} line {i}: {PARAGRAPH[:80]}) Tj ET"
+                 for i in range(lines_per_page)]
+        stream = "\n".join(lines).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects)
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, num_pages)
+
+    body = b"%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objects, start=1):
+        offsets.append(len(body))
+        body += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref = len(body)
+    body += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    body += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    body += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(body)
+
+
+def build_corpus(num_files: int = 1000, num_pages: int = 500, extension: str = ".md") -> list[str]:
+    shutil.rmtree(CORPUS_PATH, ignore_errors=True)
+    os.makedirs(CORPUS_PATH)
+    paths = []
+    for i in range(num_files):
+        path = os.path.join(CORPUS_PATH, f"doc_{i:04d}{extension}")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"# 文档 {i}\n\n" + PARAGRAPH * 20)
+        paths.append(path)
+    pdf_path = os.path.join(CORPUS_PATH, "report.pdf")
+    write_pdf(pdf_path, num_pages)
+    return paths + [pdf_path]
+
+
+def main(num_files: int = 1000, num_pages: int = 500, extension: str = ".md"):
+    """
+    1000 个 markdown 文件 + 1 个 500 页 PDF，统计不同进程数下的解析耗时和加速比。
+    各进程数得到的 Document 序列应完全一致（顺序与单进程相同）。
+    """
+    paths = build_corpus(num_files, num_pages, extension)
+    cpu_count = os.cpu_count() or 1
+    workers = sorted({1, 2, 4, 8, cpu_count} & set(range(1, cpu_count + 1)))
+
+    baseline, expected = None, None
+    print(f"{'workers':>8}{'documents':>12}{'seconds':>10}{'speedup':>10}")
+    for max_workers in workers:
+        start = time.perf_counter()
+        documents = list(parallel_load(paths, max_workers=max_workers))
+        elapsed = time.perf_counter() - start
+        signature = [(doc.metadata.get("source"), doc.metadata.get("page_no"), len(doc.page_content)) for doc in documents]
+        if expected is None:
+            baseline, expected = elapsed, signature
+        elif signature != expected:
+            raise AssertionError(f"{max_workers} 个进程的输出顺序与单进程不一致")
+        print(f"{max_workers:>8}{len(documents):>12}{elapsed:>10.2f}{baseline / elapsed:>9.2f}x")
+    shutil.rmtree(CORPUS_PATH, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    # python benchmark/loader_benchmark.py 1000 500
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,45 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/19 09:50
+@Author  : tianshiyang
+@File    : mmr_benchmark.py
+"""
+import time
+
+import numpy as np
+from langchain_core.vectorstores.utils import maximal_marginal_relevance
+
+from milvus.mmr import mmr_select
+
+
+def _timeit(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main(fetch_ks=(20, 100, 500), k: int = 10, dim: int = 1024, lambda_mult: float = 0.5, repeat: int = 20):
+    """
+    对比 langchain 自带的 maximal_marginal_relevance（Milvus.max_marginal_relevance_search 使用的实现）
+    与 mmr_select 的选择耗时，并检查两者选出的结果是否一致。
+
+    只统计客户端计算部分；原实现还需要按主键再查询一次候选向量，这部分网络开销不在此统计内。
+    """
+    rng = np.random.default_rng(0)
+    print(f"{'fetch_k':>8}{'langchain(ms)':>16}{'vectorized(ms)':>16}{'speedup':>10}{'same':>8}")
+    for fetch_k in fetch_ks:
+        query = rng.normal(size=dim).astype(np.float32)
+        candidates = rng.normal(size=(fetch_k, dim)).astype(np.float32)
+        candidate_list = candidates.tolist()
+
+        baseline = _timeit(lambda: maximal_marginal_relevance(query, candidate_list, lambda_mult=lambda_mult, k=k), repeat)
+        vectorized = _timeit(lambda: mmr_select(query, candidates, k=k, lambda_mult=lambda_mult), repeat)
+        same = maximal_marginal_relevance(query, candidate_list, lambda_mult=lambda_mult, k=k) == \
+            mmr_select(query, candidates, k=k, lambda_mult=lambda_mult)
+        print(f"{fetch_k:>8}{baseline:>16.3f}{vectorized:>16.3f}{baseline / vectorized:>9.1f}x{str(same):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/19 17:55
+@Author  : tianshiyang
+@File    : quantization_report.py
+"""
+import os
+
+import numpy as np
+
+from milvus.quantization import bytes_per_vector, normalize, quantize, rerank
+
+SRC_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DOCS_PATH = os.path.join(SRC_PATH, "docs")
+
+# (维度, 检索字段类型)，维度 None 为模型默认的 1024
+OPTIONS = [
+    (None, "float32"),
+    (None, "float16"),
+    (None, "binary"),
+    (512, "float32"),
+    (512, "float16"),
+    (512, "binary"),
+    (256, "float16"),
+    (128, "float16"),
+]
+
+
+def load_corpus(chunk_size: int = 500, chunk_overlap: int = 50) -> list[str]:
+    """docs 目录下的 books 文档和财报，与入库时相同的 loader"""
+    from langchain_community.document_loaders import PDFMinerLoader, UnstructuredMarkdownLoader
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    documents = []
+    for file_name in sorted(os.listdir(DOCS_PATH)):
+        file_path = os.path.join(DOCS_PATH, file_name)
+        if file_name.endswith(".md"):
+            documents.extend(UnstructuredMarkdownLoader(file_path).load())
+        elif file_name.endswith(".pdf"):
+            documents.extend(PDFMinerLoader(file_path).load())
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return [chunk.page_content for chunk in splitter.split_documents(documents)]
+
+
+def sample_queries(texts: list[str], num_queries: int, seed: int = 0) -> list[str]:
+    """随机取 chunk 的开头一句作为 query"""
+    rng = np.random.default_rng(seed)
+    picked = rng.choice(len(texts), size=min(num_queries, len(texts)), replace=False)
+    return [texts[i][:60] for i in picked]
+
+
+def search(queries: np.ndarray, vectors: np.ndarray, vector_type: str, k: int, rerank_factor: int) -> list[list[int]]:
+    """
+    模拟 QuantizedVectorStore 的检索：按检索字段的类型粗召回 k * rerank_factor 个，再用 float32 精排。
+    float32 不需要精排，直接返回 top k。
+    """
+    stored = quantize(vectors, vector_type)
+    results = []
+    for query in queries:
+        if vector_type == "binary":
+            # HAMMING 距离越小越相似
+            bits = quantize(query[None, :], "binary")
+            scores = -np.unpackbits(stored ^ bits, axis=1).sum(axis=1)
+        else:
+            scores = stored.astype(np.float32) @ quantize(query, vector_type).astype(np.float32)
+        if vector_type == "float32":
+            results.append(list(np.argsort(-scores)[:k]))
+            continue
+        candidates = np.argsort(-scores)[:k * rerank_factor]
+        results.append([int(candidates[i]) for i, _ in rerank(query, vectors[candidates], k)])
+    return results
+
+
+def recall(results: list[list[int]], truth: list[list[int]]) -> float:
+    return float(np.mean([len(set(r) & set(t)) / len(t) for r, t in zip(results, truth)]))
+
+
+def main(num_queries: int = 200, k: int = 10, rerank_factor: int = 4):
+    """
+    对每种 (维度, 类型) 组合统计 recall@k（以 1024 维 float32 精确检索为基准）和检索字段的内存占用。
+    降维向量需要重新请求模型，结果写入 embedding 缓存，重复运行不会再次计费。
+    """
+    from utils import get_embeddings
+
+    texts = load_corpus()
+    queries = sample_queries(texts, num_queries)
+
+    vectors_by_dim, queries_by_dim = {}, {}
+    for dimension in sorted({dimension for dimension, _ in OPTIONS}, key=lambda d: d or 1024, reverse=True):
+        embeddings = get_embeddings(dimension)
+        vectors_by_dim[dimension] = normalize(embeddings.embed_documents(texts))
+        queries_by_dim[dimension] = normalize(embeddings.embed_queries(queries))
+
+    base = vectors_by_dim[None]
+    truth = [list(np.argsort(-(base @ query))[:k]) for query in queries_by_dim[None]]
+    full_bytes = len(texts) * bytes_per_vector(base.shape[1], "float32")
+
+    print(f"corpus: {len(texts)} chunks, queries: {len(queries)}, recall@{k}, rerank x{rerank_factor}")
+    print(f"{'dim':>6}{'type':>10}{'recall':>10}{'memory(MB)':>14}{'vs 1024 float32':>18}{'mmap(MB)':>12}")
+    for dimension, vector_type in OPTIONS:
+        vectors = vectors_by_dim[dimension]
+        results = search(queries_by_dim[dimension], vectors, vector_type, k, rerank_factor)
+        memory = len(texts) * bytes_per_vector(vectors.shape[1], vector_type)
+        # 精排用的 float32 原始向量：字段数据 + FLAT 索引数据各一份，都开启了 mmap
+        mmapped = 0 if vector_type == "float32" else 2 * len(texts) * bytes_per_vector(vectors.shape[1], "float32")
+        print(
+            f"{vectors.shape[1]:>6}{vector_type:>10}{recall(results, truth):>10.3f}"
+            f"{memory / 1024 / 1024:>14.2f}{memory / full_bytes:>17.1%}{mmapped / 1024 / 1024:>12.2f}"
+        )
+    print("memory 为常驻 query node 内存的检索字段；mmap 为精排用的 float32 原始向量（字段 + FLAT 索引），")
+    print("只在精排读取时进入 page cache，没有开启 mmap 时应计入 memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/19 21:00
+@Author  : tianshiyang
+@File    : splitter_report.py
+"""
+import os
+import shutil
+import time
+
+import numpy as np
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from milvus.local_store import LocalVectorStore
+from milvus.parallel_loader import parallel_load
+from utils import TokenAwareSplitter
+from utils.token_splitter import default_token_counter
+
+SRC_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DOCS_PATH = os.path.join(SRC_PATH, "docs")
+
+STORE_PATH = os.path.join(SRC_PATH, ".cache", "splitter_report")
+
+# text-embedding-v3 每千 token 的价格（元）
+PRICE_PER_1K_TOKENS = 0.0005
+
+SETTINGS = {
+    "char 50/20 (edit.py)": lambda: RecursiveCharacterTextSplitter(chunk_size=50, chunk_overlap=20, add_start_index=True),
+    "char 100/50 (semantic_search.py)": lambda: RecursiveCharacterTextSplitter(chunk_size=100, chunk_overlap=50, add_start_index=True),
+    "char 500/200 (rag.py)": lambda: RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=200, add_start_index=True),
+    "token 128/16": lambda: TokenAwareSplitter(chunk_size=128, chunk_overlap=16, add_start_index=True),
+    "token 256/32": lambda: TokenAwareSplitter(chunk_size=256, chunk_overlap=32, add_start_index=True),
+    "token 512/64": lambda: TokenAwareSplitter(chunk_size=512, chunk_overlap=64, add_start_index=True),
+}
+
+
+def build_eval_set(documents, num_queries: int = 100, seed: int = 0) -> list[dict]:
+    """从原文中随机取一句话作为 query，答案位置为 (source, 原文偏移)，与切分方式无关"""
+    rng = np.random.default_rng(seed)
+    eval_set = []
+    while len(eval_set) < num_queries:
+        doc = documents[rng.integers(0, len(documents))]
+        text = doc.page_content
+        if len(text) < 200:
+            continue
+        offset = int(rng.integers(0, len(text) - 60))
+        query = text[offset:offset + 60].strip()
+        if len(query) < 30:
+            continue
+        eval_set.append({"query": query, "source": doc.metadata.get("source"), "page_no": doc.metadata.get("page_no"), "offset": offset})
+    return eval_set
+
+
+def _hit(doc, item: dict) -> bool:
+    """召回的 chunk 覆盖了 query 在原文中的位置即算命中"""
+    metadata = doc.metadata
+    if metadata.get("source") != item["source"] or metadata.get("page_no") != item["page_no"]:
+        return False
+    start = metadata.get("start_index", -1)
+    return start <= item["offset"] < start + len(doc.page_content)
+
+
+def main(num_queries: int = 100, k: int = 4):
+    """
+    在 docs 下的语料上对比各种切分方式：chunk 数、向量化 token 数 / 费用、切分耗时和 recall@k。
+    检索使用 LocalVectorStore，不需要 Milvus 服务；向量走 embedding 缓存，重复运行不会重复计费。
+    """
+    from utils import get_embeddings
+
+    paths = [os.path.join(DOCS_PATH, name) for name in sorted(os.listdir(DOCS_PATH))]
+    documents = list(parallel_load(paths))
+    eval_set = build_eval_set(documents, num_queries)
+    count_tokens = default_token_counter()
+    embeddings = get_embeddings()
+
+    print(f"{'setting':<34}{'chunks':>8}{'tokens':>10}{'cost(元)':>10}{'split(s)':>10}{'recall@' + str(k):>10}")
+    for name, make_splitter in SETTINGS.items():
+        start = time.perf_counter()
+        chunks = make_splitter().split_documents(documents)
+        split_seconds = time.perf_counter() - start
+        tokens = sum(count_tokens(chunk.page_content) for chunk in chunks)
+
+        shutil.rmtree(STORE_PATH, ignore_errors=True)
+        store = LocalVectorStore(embeddings, collection_name="report", path=STORE_PATH)
+        store.add_documents(chunks)
+        hits = [
+            any(_hit(doc, item) for doc in store.similarity_search(item["query"], k=k))
+            for item in eval_set
+        ]
+        print(
+            f"{name:<34}{len(chunks):>8}{tokens:>10}{tokens / 1000 * PRICE_PER_1K_TOKENS:>10.3f}"
+            f"{split_seconds:>10.2f}{np.mean(hits):>10.3f}"
+        )
+    shutil.rmtree(STORE_PATH, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
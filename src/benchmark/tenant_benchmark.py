@@ -0,0 +1,96 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/19 14:00
+@Author  : tianshiyang
+@File    : tenant_benchmark.py
+"""
+import os
+import time
+
+import numpy as np
+
+from milvus.tenant import tenant_filter
+
+SRC_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LITE_URI = os.path.join(SRC_PATH, ".cache", "tenant_benchmark.db")
+
+BENCH_COLLECTION = "tenant_benchmark"
+
+
+def _create(client, dim: int, num_partitions: int):
+    from pymilvus import DataType
+
+    if client.has_collection(BENCH_COLLECTION):
+        client.drop_collection(BENCH_COLLECTION)
+    schema = client.create_schema(auto_id=True, enable_dynamic_field=False)
+    schema.add_field("id", DataType.INT64, is_primary=True)
+    schema.add_field("namespace", DataType.VARCHAR, max_length=128, is_partition_key=True)
+    schema.add_field("vector", DataType.FLOAT_VECTOR, dim=dim)
+    index_params = client.prepare_index_params()
+    index_params.add_index("vector", index_type="HNSW", metric_type="COSINE", params={"M": 16, "efConstruction": 200})
+    client.create_collection(BENCH_COLLECTION, schema=schema, index_params=index_params, num_partitions=num_partitions)
+
+
+def _insert_tenants(client, start: int, end: int, docs_per_tenant: int, dim: int, rng):
+    rows = []
+    for tenant in range(start, end):
+        vectors = rng.normal(size=(docs_per_tenant, dim)).astype(np.float32)
+        rows.extend({"namespace": f"tenant_{tenant}", "vector": v.tolist()} for v in vectors)
+        if len(rows) >= 5000:
+            client.insert(BENCH_COLLECTION, rows)
+            rows = []
+    if rows:
+        client.insert(BENCH_COLLECTION, rows)
+    client.flush(BENCH_COLLECTION)
+
+
+def main(
+        tenant_steps=(10, 100, 1000),
+        docs_per_tenant: int = 50,
+        dim: int = 256,
+        num_queries: int = 200,
+        num_partitions: int = 64,
+        uri: str = LITE_URI,
+):
+    """
+    租户数逐步增加到 1000（每个租户的数据量不变），统计按租户检索的 p50 / p99 延迟，
+    并与不带分区键过滤的全量检索对比。分区键路由生效时，按租户检索的延迟应基本不随租户数增长。
+    """
+    from pymilvus import MilvusClient
+
+    os.makedirs(os.path.dirname(LITE_URI), exist_ok=True)
+    client = MilvusClient(uri)
+    _create(client, dim, num_partitions)
+    rng = np.random.default_rng(0)
+
+    print(f"{'tenants':>8}{'rows':>10}{'tenant p50(ms)':>16}{'tenant p99(ms)':>16}{'global p50(ms)':>16}")
+    inserted = 0
+    for tenants in tenant_steps:
+        _insert_tenants(client, inserted, tenants, docs_per_tenant, dim, rng)
+        inserted = tenants
+        client.load_collection(BENCH_COLLECTION)
+
+        tenant_latencies, global_latencies = [], []
+        for _ in range(num_queries):
+            query = rng.normal(size=dim).astype(np.float32).tolist()
+            tenant = f"tenant_{rng.integers(0, tenants)}"
+            start = time.perf_counter()
+            client.search(BENCH_COLLECTION, data=[query], limit=10, filter=tenant_filter(tenant))
+            tenant_latencies.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            client.search(BENCH_COLLECTION, data=[query], limit=10)
+            global_latencies.append(time.perf_counter() - start)
+
+        print(
+            f"{tenants:>8}{tenants * docs_per_tenant:>10}"
+            f"{np.percentile(tenant_latencies, 50) * 1000:>16.2f}"
+            f"{np.percentile(tenant_latencies, 99) * 1000:>16.2f}"
+            f"{np.percentile(global_latencies, 50) * 1000:>16.2f}"
+        )
+    client.drop_collection(BENCH_COLLECTION)
+
+
+if __name__ == "__main__":
+    main()
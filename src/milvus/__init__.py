@@ -5,10 +5,21 @@
 @Author  : tianshiyang
 @File    : __init__.py.py
 """
-from .client import client
-from .index import CONNECTION_ARGS
+from importlib import import_module
+
+from .config import CONNECTION_ARGS
 
 __all__ = [
     "client",
+    "get_client",
     "CONNECTION_ARGS"
-]
\ No newline at end of file
+]
+
+
+# client 在第一次访问时才连接 Milvus；模块不能叫 client.py，否则子模块会覆盖这个属性
+def __getattr__(name: str):
+    if name == "get_client":
+        return import_module(".books_store", __name__).get_client
+    if name == "client":
+        return import_module(".books_store", __name__).get_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
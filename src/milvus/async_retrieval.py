@@ -0,0 +1,111 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 17:40
+@Author  : tianshiyang
+@File    : async_retrieval.py
+"""
+import threading
+from typing import Any, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict
+
+from milvus.config import CONNECTION_ARGS
+from utils.loop_scoped import LoopScoped
+
+# AsyncMilvusClient 绑定创建时的事件循环，按 (uri, db_name) 每个 loop 各用一个，loop 结束时关闭
+_clients: dict[tuple, LoopScoped] = {}
+_lock = threading.Lock()
+
+
+async def get_async_client(connection_args: dict = None):
+    from pymilvus import AsyncMilvusClient
+
+    connection_args = connection_args or CONNECTION_ARGS
+    key = (connection_args.get("uri"), connection_args.get("db_name"))
+    with _lock:
+        scoped = _clients.get(key)
+        if scoped is None:
+            scoped = LoopScoped(
+                lambda: AsyncMilvusClient(**{k: v for k, v in connection_args.items() if v is not None}),
+                lambda client: client.close(),
+            )
+            _clients[key] = scoped
+    return await scoped.get()
+
+
+def hits_to_documents(store, hits: list[dict]) -> list[tuple[Document, float]]:
+    """把 Milvus search 返回的一组 hit 转成 (Document, score)，字段解析和 store 保持一致"""
+    return [(store._parse_document(dict(hit["entity"])), hit["distance"]) for hit in hits]
+
+
+class AsyncMilvusRetriever(BaseRetriever):
+    """
+    基于 AsyncMilvusClient 的检索器，ainvoke / astream 时向量化和检索都是原生异步，不占用线程。
+
+    同步 invoke 时回退到 Milvus store 的 similarity_search。
+
+    Args:
+        store: 已有的 Milvus store，提供 collection / 字段名 / embedding / 同步检索
+        connection_args: 连接参数，默认与 store 相同
+        k: 返回条数
+        expr: 过滤表达式
+        search_params: Milvus 搜索参数
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    store: Any
+    connection_args: Optional[dict] = None
+    k: int = 4
+    expr: Optional[str] = None
+    search_params: Optional[dict] = None
+
+    def _get_relevant_documents(
+            self, query: str, *, run_manager: CallbackManagerForRetrieverRun, **kwargs: Any
+    ) -> list[Document]:
+        return self.store.similarity_search(
+            query, k=kwargs.get("k", self.k), expr=kwargs.get("expr", self.expr)
+        )
+
+    async def _aget_relevant_documents(
+            self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun, **kwargs: Any
+    ) -> list[Document]:
+        pairs = await self.asearch_with_score(query, k=kwargs.get("k", self.k), expr=kwargs.get("expr", self.expr))
+        return [doc for doc, _ in pairs]
+
+    async def warm_up(self):
+        """提前建立当前事件循环的 AsyncMilvusClient 连接，LocalVectorStore 不需要"""
+        if hasattr(self.store, "aclient"):
+            await get_async_client(self.connection_args or self.store._connection_args)
+
+    async def asearch_by_vector(self, vector: list[float], k: int = None, expr: str = None) -> list[tuple[Document, float]]:
+        """k / expr 为 None 时使用检索器上配置的值"""
+        k = self.k if k is None else k
+        expr = self.expr if expr is None else expr
+        client = await get_async_client(self.connection_args or self.store._connection_args)
+        result = await client.search(
+            collection_name=self.store.collection_name,
+            data=[vector],
+            # 混合检索的 store 有多个向量字段，这里只检索由 embedding 生成的稠密向量
+            anns_field=self.store._vector_fields_from_embedding[0],
+            limit=k,
+            filter=expr or "",
+            output_fields=["*"],
+            search_params=self.search_params or {},
+        )
+        return hits_to_documents(self.store, result[0])
+
+    async def asearch_with_score(self, query: str, k: int = None, expr: str = None) -> list[tuple[Document, float]]:
+        """k / expr 为 None 时使用检索器上配置的值"""
+        k = self.k if k is None else k
+        expr = self.expr if expr is None else expr
+        if not hasattr(self.store, "aclient"):
+            # LocalVectorStore 没有 Milvus 连接，直接使用它的检索
+            return await self.store.asimilarity_search_with_score(query, k=k, expr=expr)
+        embedding = self.store._as_list(self.store.embedding_func)[0]
+        vector = await embedding.aembed_query(query)
+        return await self.asearch_by_vector(vector, k=k, expr=expr)
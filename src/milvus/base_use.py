@@ -6,10 +6,9 @@
 @File    : base_use.py
 """
 from langchain_core.documents import Document
-from langchain_milvus import Milvus
-
 from milvus import CONNECTION_ARGS
-from utils import embeddings
+from milvus.registry import get_store
+from milvus.tenant import TenantStore
 import uuid
 
 docs = [
@@ -17,25 +16,32 @@ docs = [
     Document(page_content="i worked at facebook", metadata={"namespace": "ankush"}),
 ]
 
-vector_store = Milvus(
+vector_store = get_store(
+    "partitioned_collection",
     connection_args=CONNECTION_ARGS,
-    embedding_function=embeddings,
-    collection_name="partitioned_collection",
     partition_key_field="namespace",
     text_field="content",
     primary_field="id"
 )
 
+tenant_store = TenantStore(vector_store, partition_key_field="namespace")
+
 def add_document():
     vector_store.add_documents(
         docs,
         ids=[str(uuid.uuid4()) for _ in range(len(docs))],
     )
 
+def add_tenant_documents():
+    # 按租户写入，namespace 由 TenantStore 统一设置
+    tenant_store.add_documents_by_tenant({
+        "harrison": [Document(page_content="i worked at kensho")],
+        "ankush": [Document(page_content="i worked at facebook")],
+    })
+
 def search_document():
-    result = vector_store.as_retriever(
-        search_kwargs={"expr": 'namespace == "ankush"'}
-    ).invoke("where did i work")
+    # 租户作为参数传入，只会扫描该租户所在的分区
+    result = tenant_store.as_retriever("ankush").invoke("where did i work")
     print(result)
 
 search_document()
\ No newline at end of file
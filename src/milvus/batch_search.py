@@ -0,0 +1,71 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/19 10:40
+@Author  : tianshiyang
+@File    : batch_search.py
+"""
+from typing import Optional
+
+from langchain_core.documents import Document
+
+
+def embed_queries(store, queries: list[str]) -> list[list[float]]:
+    """一次请求向量化全部 query；embeddings 不支持批量 query 时退化为 embed_documents"""
+    embedding = store._as_list(store.embedding_func)[0]
+    if hasattr(embedding, "embed_queries"):
+        return embedding.embed_queries(queries)
+    return embedding.embed_documents(queries)
+
+
+def batch_similarity_search_with_score(
+        store,
+        queries: list[str],
+        k: int = 4,
+        expr: Optional[str] = None,
+        param: Optional[dict] = None,
+) -> list[list[tuple[Document, float]]]:
+    """
+    多个 query 一次向量化、一次 Milvus search，按 query 顺序返回各自的 (Document, score)。
+
+    Args:
+        store: Milvus store / LocalVectorStore / CachedVectorStore
+        queries: query 列表
+        k: 每个 query 返回的条数
+        expr: 过滤表达式，对所有 query 生效
+        param: Milvus 搜索参数
+    """
+    if not queries:
+        return []
+    vectors = embed_queries(store, queries)
+
+    if not hasattr(store, "client"):
+        # LocalVectorStore
+        return store.batch_search_by_vectors(vectors, k=k, expr=expr)
+
+    result = store.client.search(
+        collection_name=store.collection_name,
+        data=vectors,
+        anns_field=store._vector_fields_from_embedding[0],
+        limit=k,
+        filter=expr or "",
+        output_fields=["*"],
+        search_params=param or {},
+    )
+    return [
+        [(store._parse_document(dict(hit["entity"])), hit["distance"]) for hit in hits]
+        for hits in result
+    ]
+
+
+def batch_similarity_search(
+        store,
+        queries: list[str],
+        k: int = 4,
+        expr: Optional[str] = None,
+        param: Optional[dict] = None,
+) -> list[list[Document]]:
+    return [
+        [doc for doc, _ in pairs]
+        for pairs in batch_similarity_search_with_score(store, queries, k=k, expr=expr, param=param)
+    ]
@@ -0,0 +1,33 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2025/12/31 15:24
+@Author  : tianshiyang
+@File    : books_store.py
+"""
+import os
+import warnings
+
+# 抑制警告
+os.environ["GRPC_VERBOSITY"] = "ERROR"
+os.environ["GRPC_ENABLE_FORK_SUPPORT"] = "false"
+warnings.filterwarnings("ignore", message=".*AsyncMilvusClient.*")
+
+TOKEN = "tianshiyang:tianshiyang"
+
+URI = "http://localhost:19530"
+
+
+
+def get_client():
+    """books collection 的 Milvus store，首次调用时才建立连接，之后复用"""
+    from milvus.registry import get_store
+
+    return get_store(
+        "books",
+        connection_args={"uri": URI, "token": "root:Milvus", "db_name": "langchain"},
+        index_params={"index_type": "FLAT", "metric_type": "L2"},
+        consistency_level="Strong",
+        text_field="content",  # 指定文本字段名
+        drop_old=False,  # set to True if seeking to drop the collection with that name if it exists
+    )
@@ -0,0 +1,133 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/19 18:30
+@Author  : tianshiyang
+@File    : bulk_delete.py
+"""
+import time
+from typing import Optional
+
+from milvus.query_cache import invalidate
+from utils import RateLimiter
+
+
+def iter_primary_keys(client, collection_name: str, expr: str, primary_field: str, page_size: int = 1000):
+    """按页查出满足 expr 的主键，每次最多 page_size 条"""
+    iterator = client.query_iterator(
+        collection_name,
+        batch_size=page_size,
+        filter=expr,
+        output_fields=[primary_field],
+    )
+    try:
+        while True:
+            page = iterator.next()
+            if not page:
+                return
+            yield [row[primary_field] for row in page]
+    finally:
+        iterator.close()
+
+
+def wait_for_compaction(client, collection_name: str, poll_interval: float = 2.0, timeout: float = 1800,
+                        verbose: bool = True) -> dict:
+    """
+    flush 后触发 compaction 并等待完成，让删除产生的 tombstone 尽快被合并掉。
+
+    Args:
+        client: MilvusClient
+        collection_name: 集合名
+        poll_interval: 轮询间隔（秒）
+        timeout: 超时时间（秒）
+        verbose: 是否打印进度
+    """
+    start = time.perf_counter()
+    client.flush(collection_name)
+    flushed = time.perf_counter()
+    job_id = client.compact(collection_name)
+    deadline = time.monotonic() + timeout
+    while True:
+        state = client.get_compaction_state(job_id)
+        if verbose:
+            print(f"compaction {job_id}: {state}, {time.perf_counter() - flushed:.1f}s")
+        if state == "Completed":
+            break
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"compaction {job_id} 超过 {timeout}s 未完成")
+        time.sleep(poll_interval)
+    return {
+        "compaction_id": job_id,
+        "flush_seconds": flushed - start,
+        "compaction_seconds": time.perf_counter() - flushed,
+    }
+
+
+def bulk_delete(
+        client,
+        collection_name: str,
+        expr: str,
+        primary_field: str = "pk",
+        page_size: int = 1000,
+        batch_size: int = 500,
+        max_batches_per_second: Optional[float] = 5,
+        compact: bool = True,
+        verbose: bool = True,
+) -> dict:
+    """
+    分批删除满足 expr 的数据：按页解析主键，每批最多 batch_size 个主键按 id 删除，批次之间限速，
+    最后触发 compaction 并等待完成，避免一次性产生大量 tombstone 拖慢其他人的检索。
+
+    Args:
+        client: MilvusClient
+        collection_name: 集合名
+        expr: 删除条件，如 'book_name like "%book_name"'
+        primary_field: 主键字段名
+        page_size: 每页查询的主键数
+        batch_size: 每次 delete 的主键数
+        max_batches_per_second: 每秒最多 delete 批次，None 表示不限速
+        compact: 删除后是否触发并等待 compaction
+        verbose: 是否打印进度
+    """
+    limiter = RateLimiter(max_batches_per_second)
+    stats = {"matched": 0, "deleted": 0, "batches": 0, "query_seconds": 0.0, "delete_seconds": 0.0}
+    start = time.perf_counter()
+
+    pages = iter_primary_keys(client, collection_name, expr, primary_field, page_size)
+    while True:
+        query_start = time.perf_counter()
+        ids = next(pages, None)
+        stats["query_seconds"] += time.perf_counter() - query_start
+        if ids is None:
+            break
+        stats["matched"] += len(ids)
+        for i in range(0, len(ids), batch_size):
+            batch = ids[i:i + batch_size]
+            limiter.acquire()
+            delete_start = time.perf_counter()
+            result = client.delete(collection_name, ids=batch)
+            stats["delete_seconds"] += time.perf_counter() - delete_start
+            stats["deleted"] += result.get("delete_count", len(batch))
+            stats["batches"] += 1
+        if verbose:
+            print(f"bulk delete {collection_name}: 已删除 {stats['deleted']} 条，{stats['batches']} 批")
+
+    if compact and stats["deleted"]:
+        stats.update(wait_for_compaction(client, collection_name, verbose=verbose))
+    stats["total_seconds"] = time.perf_counter() - start
+    return stats
+
+
+def bulk_delete_from_store(store, expr: str, **kwargs) -> dict:
+    """
+    对 Milvus store（或 CachedVectorStore）按 expr 分批删除，完成后清理该集合的检索缓存。
+    LocalVectorStore 没有 tombstone 问题，直接按 expr 删除。
+    """
+    collection_name = store.collection_name
+    try:
+        if not hasattr(store, "client"):
+            store.delete(expr=expr)
+            return {"deleted": None, "total_seconds": 0.0}
+        return bulk_delete(store.client, collection_name, expr, primary_field=store._primary_field, **kwargs)
+    finally:
+        invalidate(collection_name)
@@ -0,0 +1,397 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/19 15:10
+@Author  : tianshiyang
+@File    : bulk_import.py
+"""
+import json
+import os
+import shutil
+import time
+import uuid
+from functools import partial
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from milvus import schema
+from milvus.config import CONNECTION_ARGS, MINIO_ARGS
+from utils import embed_in_batches
+
+SRC_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 导入文件先写到本地，再上传到 MinIO
+DEFAULT_WORK_DIR = os.path.join(SRC_PATH, ".cache", "bulk_import")
+
+# 动态字段在导入文件中的列名
+DYNAMIC_FIELD = "$meta"
+
+# 导入完成后建的默认索引，与 books_store.py 保持一致
+DEFAULT_INDEX_PARAMS = {"index_type": "FLAT", "metric_type": "L2"}
+
+# 集合字段类型对应的 NumPy dtype，NumPy 格式的每个 .npy 必须与字段类型一致
+NUMPY_DTYPES = {
+    "BOOL": np.bool_,
+    "INT8": np.int8,
+    "INT16": np.int16,
+    "INT32": np.int32,
+    "INT64": np.int64,
+    "FLOAT": np.float32,
+    "DOUBLE": np.float64,
+    "VARCHAR": np.str_,
+    "JSON": np.str_,
+    "FLOAT_VECTOR": np.float32,
+}
+
+
+def default_file_type() -> str:
+    """安装了 pyarrow 时写 Parquet，否则写 NumPy"""
+    try:
+        import pyarrow  # noqa: F401
+        return "parquet"
+    except ImportError:
+        return "numpy"
+
+
+def field_types(client, collection_name: str) -> dict[str, str]:
+    """集合各字段的类型名（INT64 / VARCHAR / FLOAT_VECTOR ...）"""
+    return {field["name"]: field["type"].name for field in client.describe_collection(collection_name)["fields"]}
+
+
+def create_collection(client, collection_name: str, dim: int):
+    """
+    创建与 langchain Milvus 字段一致的集合（id / content / vector + 声明的过滤字段 + 动态字段），
+    不建索引、不 load，索引等数据导入完成后再建。
+    """
+    schema.create_collection(
+        client,
+        collection_name,
+        dim,
+        schema.get_filter_fields(collection_name),
+        primary_field="id",
+        text_field="content",
+        with_index=False,
+    )
+
+
+def document_rows(
+        documents: Iterable[Document],
+        embeddings: Embeddings,
+        window: int = 10_000,
+        **embed_kwargs,
+) -> Iterator[dict]:
+    """
+    按 window 条一组向量化 Document 并转成导入行，metadata 写入动态字段。
+
+    Args:
+        documents: 待导入的 Document，可以是生成器
+        embeddings: Embeddings 实例
+        window: 每次向量化的条数，控制内存占用
+        embed_kwargs: 透传给 embed_in_batches
+    """
+    def _flush(batch: list[Document]):
+        vectors = embed_in_batches([doc.page_content for doc in batch], embeddings, **embed_kwargs)
+        for doc, vector in zip(batch, vectors):
+            yield {
+                "id": doc.id or doc.metadata.get("chunk_id") or str(uuid.uuid4()),
+                "content": doc.page_content,
+                "vector": vector,
+                DYNAMIC_FIELD: doc.metadata,
+            }
+
+    batch = []
+    for doc in documents:
+        batch.append(doc)
+        if len(batch) >= window:
+            yield from _flush(batch)
+            batch = []
+    if batch:
+        yield from _flush(batch)
+
+
+def _columns(rows: list[dict], typed_fields: list[str] = ()) -> dict:
+    fields = [field for field in rows[0] if field != DYNAMIC_FIELD]
+    columns = {field: [row[field] for row in rows] for field in fields}
+    columns["vector"] = np.asarray(columns["vector"], dtype=np.float32)
+    if DYNAMIC_FIELD in rows[0]:
+        metas = [dict(row.get(DYNAMIC_FIELD) or {}) for row in rows]
+        # 声明为有类型字段的 metadata 单独成列，其余留在动态字段
+        for field in typed_fields:
+            if field not in columns:
+                columns[field] = [meta.pop(field, None) for meta in metas]
+        columns[DYNAMIC_FIELD] = [json.dumps(meta, ensure_ascii=False) for meta in metas]
+    return columns
+
+
+def _write_parquet(columns: dict, path: str) -> list[str]:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("写 Parquet 需要 pyarrow，请 pip install pyarrow，或使用 file_type='numpy'")
+
+    arrays = {}
+    for field, values in columns.items():
+        if field == "vector":
+            # 与 pymilvus BulkWriter 一致，向量列为 list<float>
+            offsets = pa.array(np.arange(0, values.size + 1, values.shape[1], dtype=np.int32))
+            arrays[field] = pa.ListArray.from_arrays(offsets, pa.array(values.ravel()))
+        else:
+            arrays[field] = pa.array(values)
+    file_path = f"{path}.parquet"
+    pq.write_table(pa.table(arrays), file_path)
+    return [file_path]
+
+
+def _write_numpy(columns: dict, path: str, types: dict = None) -> list[str]:
+    # NumPy 格式每个字段一个 .npy 文件，同一目录下的文件组成一次导入；每列按集合中的字段类型写入，$meta 是 JSON 字符串
+    os.makedirs(path, exist_ok=True)
+    files = []
+    for field, values in columns.items():
+        if field != "vector" and any(value is None for value in values):
+            raise ValueError(f"NumPy 格式不支持空值（字段 {field}），请安装 pyarrow 使用 parquet")
+        file_path = os.path.join(path, f"{field}.npy")
+        np.save(file_path, np.asarray(values, dtype=NUMPY_DTYPES.get((types or {}).get(field), np.str_)))
+        files.append(file_path)
+    return files
+
+
+def write_files(
+        rows: Iterable[dict],
+        work_dir: str,
+        file_rows: int = 100_000,
+        file_type: Optional[str] = None,
+        typed_fields: list[str] = (),
+        types: dict = None,
+) -> list[list[str]]:
+    """
+    把导入行按 file_rows 条一个文件写成列式文件，返回每次导入的文件组。
+
+    Args:
+        rows: 导入行，可以是生成器
+        work_dir: 本地输出目录
+        file_rows: 单个文件的行数
+        file_type: parquet / numpy，默认有 pyarrow 时用 parquet
+        typed_fields: 集合中有类型的过滤字段，从 metadata 中取出单独成列
+        types: 字段名 -> 集合中的类型名（field_types 的返回值），NumPy 格式按它确定每列的 dtype
+    """
+    file_type = file_type or default_file_type()
+    if file_type == "numpy":
+        types = dict(types or {}, vector="FLOAT_VECTOR")
+        writer = partial(_write_numpy, types=types)
+    else:
+        writer = _write_parquet
+    os.makedirs(work_dir, exist_ok=True)
+    groups = []
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= file_rows:
+            groups.append(writer(_columns(batch, typed_fields), os.path.join(work_dir, f"part-{len(groups)}")))
+            batch = []
+    if batch:
+        groups.append(writer(_columns(batch, typed_fields), os.path.join(work_dir, f"part-{len(groups)}")))
+    return groups
+
+
+def upload_files(groups: list[list[str]], work_dir: str, prefix: str, minio_args: dict = None) -> list[list[str]]:
+    """上传到 Milvus 使用的 MinIO bucket，返回 bucket 内的对象路径"""
+    try:
+        from minio import Minio
+    except ImportError:
+        raise ImportError("上传导入文件需要 minio，请 pip install minio 或 pymilvus[bulk_writer]")
+
+    minio_args = minio_args or MINIO_ARGS
+    minio = Minio(
+        minio_args["endpoint"],
+        access_key=minio_args["access_key"],
+        secret_key=minio_args["secret_key"],
+        secure=False,
+    )
+    if not minio.bucket_exists(minio_args["bucket"]):
+        minio.make_bucket(minio_args["bucket"])
+
+    remote_groups = []
+    for group in groups:
+        remote = []
+        for file_path in group:
+            key = f"{prefix}/{os.path.relpath(file_path, work_dir)}".replace(os.sep, "/")
+            minio.fput_object(minio_args["bucket"], key, file_path)
+            remote.append(key)
+        remote_groups.append(remote)
+    return remote_groups
+
+
+def run_import(
+        collection_name: str,
+        remote_groups: list[list[str]],
+        connection_args: dict = None,
+        poll_interval: float = 2.0,
+        timeout: float = 3600,
+        verbose: bool = True,
+) -> int:
+    """
+    每个文件组提交一个导入任务，轮询直到全部完成，返回导入行数。
+
+    Args:
+        collection_name: 目标集合
+        remote_groups: upload_files 返回的对象路径
+        connection_args: 连接参数，默认 CONNECTION_ARGS
+        poll_interval: 轮询间隔（秒）
+        timeout: 超时时间（秒）
+        verbose: 是否打印进度
+    """
+    from pymilvus import BulkInsertState, connections, utility
+
+    connection_args = connection_args or CONNECTION_ARGS
+    alias = f"bulk_import_{uuid.uuid4().hex[:8]}"
+    connections.connect(
+        alias=alias,
+        uri=connection_args["uri"],
+        token=connection_args.get("token") or "",
+        db_name=connection_args.get("db_name") or "default",
+    )
+    try:
+        task_ids = [
+            utility.do_bulk_insert(collection_name, files=files, using=alias)
+            for files in remote_groups
+        ]
+        deadline = time.monotonic() + timeout
+        done = {}
+        while len(done) < len(task_ids):
+            for task_id in task_ids:
+                if task_id in done:
+                    continue
+                state = utility.get_bulk_insert_state(task_id, using=alias)
+                if state.state in (BulkInsertState.ImportFailed, BulkInsertState.ImportFailedAndCleaned):
+                    raise RuntimeError(f"bulk import 任务 {task_id} 失败：{state.failed_reason}")
+                if state.state == BulkInsertState.ImportCompleted:
+                    done[task_id] = state.row_count
+            if verbose:
+                print(f"bulk import: {len(done)}/{len(task_ids)} 个任务完成，已导入 {sum(done.values())} 行")
+            if len(done) < len(task_ids):
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"bulk import 超过 {timeout}s 未完成")
+                time.sleep(poll_interval)
+        return sum(done.values())
+    finally:
+        connections.disconnect(alias)
+
+
+def build_index(client, collection_name: str, index_params: dict = None, field: str = "vector"):
+    """
+    数据导入完成后再建向量索引和过滤字段的标量索引并 load，避免边写边建索引。
+    已有索引的字段跳过，向已建好索引的集合再次导入时不会重复建索引。
+    """
+    indexed = {client.describe_index(collection_name, name).get("field_name") for name in client.list_indexes(collection_name)}
+    params = client.prepare_index_params()
+    missing = []
+    if field not in indexed:
+        params.add_index(field, **(index_params or DEFAULT_INDEX_PARAMS))
+        missing.append(field)
+    for spec in schema.get_filter_fields(collection_name):
+        if spec.name not in indexed:
+            params.add_index(spec.name, index_type=spec.scalar_index, index_name=f"{spec.name}_idx")
+            missing.append(spec.name)
+    if missing:
+        client.create_index(collection_name, params)
+    client.load_collection(collection_name)
+
+
+def bulk_insert_rows(
+        collection_name: str,
+        rows: Iterable[dict],
+        dim: int,
+        connection_args: dict = None,
+        index_params: dict = None,
+        file_rows: int = 100_000,
+        file_type: Optional[str] = None,
+        work_dir: str = DEFAULT_WORK_DIR,
+        verbose: bool = True,
+) -> dict:
+    """
+    批量导入：写列式文件 -> 上传 MinIO -> bulk import -> 建索引并 load，返回各阶段耗时。
+    集合不存在时按 create_collection 创建；已存在的集合需字段一致且尚未建索引。
+
+    Args:
+        collection_name: 目标集合
+        rows: 导入行（id / content / vector / $meta）
+        dim: 向量维度
+        connection_args: 连接参数，默认 CONNECTION_ARGS
+        index_params: 导入完成后建的索引，默认 FLAT / L2
+        file_rows: 单个文件的行数
+        file_type: parquet / numpy
+        work_dir: 本地临时目录
+        verbose: 是否打印进度
+    """
+    from pymilvus import MilvusClient
+
+    connection_args = connection_args or CONNECTION_ARGS
+    client = MilvusClient(**{key: value for key, value in connection_args.items() if value})
+    try:
+        if not client.has_collection(collection_name):
+            create_collection(client, collection_name, dim)
+
+        job = uuid.uuid4().hex[:12]
+        job_dir = os.path.join(work_dir, job)
+        timings = {}
+        try:
+            start = time.perf_counter()
+            groups = write_files(
+                rows,
+                job_dir,
+                file_rows=file_rows,
+                file_type=file_type,
+                typed_fields=[spec.name for spec in schema.get_filter_fields(collection_name)],
+                types=field_types(client, collection_name),
+            )
+            timings["write"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            remote_groups = upload_files(groups, job_dir, f"bulk_import/{collection_name}/{job}")
+            timings["upload"] = time.perf_counter() - start
+        finally:
+            shutil.rmtree(job_dir, ignore_errors=True)
+
+        start = time.perf_counter()
+        timings["rows"] = run_import(collection_name, remote_groups, connection_args, verbose=verbose)
+        timings["import"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        build_index(client, collection_name, index_params)
+        timings["index_and_load"] = time.perf_counter() - start
+    finally:
+        client.close()
+    timings["total"] = timings["write"] + timings["upload"] + timings["import"] + timings["index_and_load"]
+    if verbose:
+        print({key: round(value, 2) for key, value in timings.items()})
+    return timings
+
+
+def bulk_insert_documents(
+        collection_name: str,
+        documents: Iterable[Document],
+        embeddings: Embeddings,
+        connection_args: dict = None,
+        index_params: dict = None,
+        embed_window: int = 10_000,
+        **kwargs,
+) -> dict:
+    """
+    Document 版本的 bulk_insert_rows：分窗口向量化后直接写入导入文件，适合首次灌入大量数据。
+
+    Args:
+        collection_name: 目标集合
+        documents: 待导入的 Document
+        embeddings: Embeddings 实例
+        connection_args: 连接参数，默认 CONNECTION_ARGS
+        index_params: 导入完成后建的索引
+        embed_window: 每次向量化的条数
+        kwargs: 透传给 bulk_insert_rows
+    """
+    dim = len(embeddings.embed_query("dimension"))
+    rows = document_rows(documents, embeddings, window=embed_window)
+    return bulk_insert_rows(collection_name, rows, dim, connection_args, index_params, **kwargs)
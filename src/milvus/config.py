@@ -0,0 +1,27 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 15:02
+@Author  : tianshiyang
+@File    : config.py
+"""
+import os
+
+import dotenv
+
+dotenv.load_dotenv()
+
+# MILVUS_URI 设置为 local://<目录> 时使用 LocalVectorStore，不需要 Milvus 服务
+CONNECTION_ARGS = {
+    "uri": os.getenv("MILVUS_URI"),
+    "db_name": os.getenv("MILVUS_DB_NAME"),
+    "token": os.getenv("MILVUS_TOKEN"),
+}
+
+# bulk import 使用的对象存储（Milvus standalone 默认自带的 MinIO）
+MINIO_ARGS = {
+    "endpoint": os.getenv("MINIO_ENDPOINT", "localhost:9000"),
+    "access_key": os.getenv("MINIO_ACCESS_KEY", "minioadmin"),
+    "secret_key": os.getenv("MINIO_SECRET_KEY", "minioadmin"),
+    "bucket": os.getenv("MINIO_BUCKET", "a-bucket"),
+}
@@ -0,0 +1,206 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/19 21:40
+@Author  : tianshiyang
+@File    : dedup.py
+"""
+import json
+import math
+import uuid
+from collections import defaultdict
+from typing import Iterator, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+# text-embedding-v3 单次请求最多 10 条文本，用于估算节省的请求次数
+EMBED_BATCH_SIZE = 10
+
+# 被合并掉的 chunk 的出处记录在保留 chunk 的这个 metadata 中（JSON 字符串，Milvus 动态字段可以直接存）
+COLLAPSED_KEY = "collapsed_offsets"
+
+
+def shingle_hashes(text: str, ngram: int = 5) -> np.ndarray:
+    """字符 n-gram 的 32 位哈希（去重），中英文都按字符切，不依赖分词；空白会先压缩"""
+    text = " ".join(text.split())
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    if len(codes) < ngram:
+        codes = np.pad(codes, (0, ngram - len(codes)))
+    # 多项式滚动哈希，一次算出全部 n-gram
+    windows = np.lib.stride_tricks.sliding_window_view(codes, ngram)
+    powers = np.uint64(1000003) ** np.arange(ngram - 1, -1, -1, dtype=np.uint64)
+    return np.unique((windows * powers).sum(axis=1) & np.uint64(0xFFFFFFFF))
+
+
+class NearDuplicateFilter:
+    """
+    MinHash + LSH 的近似重复检测：估算的 Jaccard 相似度不低于 threshold 的 chunk 视为重复，
+    只保留第一次出现的 chunk，后出现的重复 chunk 的出处（source / start_index / page_no）记到保留的 chunk 上。
+
+    不持有 Document：每个保留的 chunk 只占一行 uint32 签名、各段的桶和它的 chunk_id，
+    内存与语料大小线性相关，且远小于 chunk 本身。
+
+    Args:
+        threshold: Jaccard 相似度阈值
+        num_perm: MinHash 签名长度
+        bands: LSH 分段数，num_perm 需能被整除；段越多越容易成为候选
+        ngram: 字符 n-gram 长度
+        seed: 随机种子，相同种子结果可复现
+        id_key: 保留 chunk 的 metadata 中的 id 字段，没有时分配 uuid，跨批次的重复按它回写
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, bands: int = 32, ngram: int = 5, seed: int = 1,
+                 id_key: str = "chunk_id"):
+        if num_perm % bands:
+            raise ValueError("num_perm 需要能被 bands 整除")
+        rng = np.random.default_rng(seed)
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.ngram = ngram
+        self.id_key = id_key
+        # multiply-shift 哈希族的参数，a 取奇数
+        self._a = rng.integers(0, np.iinfo(np.uint64).max, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, np.iinfo(np.uint64).max, size=num_perm, dtype=np.uint64)
+        # 桶的 key 是 (段号, 段内容) 的哈希值，不保存段内容本身
+        self._buckets: dict[int, list[int]] = defaultdict(list)
+        # 保留 chunk 的签名按行存放，容量不够时翻倍
+        self._signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self._ids: list[str] = []
+        # 保留的 chunk 已经被之前的 filter 调用返回后才出现的重复，按 chunk_id 记在这里
+        self.late_collapses: dict[str, list[dict]] = defaultdict(list)
+        self.seen = 0
+        self.removed = 0
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = shingle_hashes(text, self.ngram)
+        # (a * x + b) mod 2^64 取高 32 位，uint64 溢出即取模
+        with np.errstate(over="ignore"):
+            values = (self._a[:, None] * hashes[None, :] + self._b[:, None]) >> np.uint64(32)
+        return values.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> list[int]:
+        return [hash((band, signature[band * self.rows:(band + 1) * self.rows].tobytes())) for band in range(self.bands)]
+
+    def find(self, signature: np.ndarray) -> Optional[int]:
+        """返回与之重复的已保留 chunk 的下标，没有则为 None"""
+        candidates = {index for key in self._band_keys(signature) for index in self._buckets.get(key, ())}
+        best, best_score = None, self.threshold
+        for index in sorted(candidates):
+            score = float(np.mean(self._signatures[index] == signature))
+            if score >= best_score:
+                best, best_score = index, score
+        return best
+
+    def _add(self, chunk_id: str, signature: np.ndarray) -> int:
+        index = len(self._ids)
+        if index == len(self._signatures):
+            grown = np.empty((max(256, index * 2), self._signatures.shape[1]), dtype=np.uint32)
+            grown[:index] = self._signatures
+            self._signatures = grown
+        self._signatures[index] = signature
+        self._ids.append(chunk_id)
+        for key in self._band_keys(signature):
+            self._buckets[key].append(index)
+        return index
+
+    def filter(self, chunks: list[Document]) -> list[Document]:
+        """
+        过滤一批 chunk，返回需要向量化的 chunk（副本，metadata 中带 id_key）。
+
+        与本批保留的 chunk 重复时，出处直接合并进返回的 chunk；与之前批次保留的 chunk 重复时
+        （流式入库时它们已经写入），出处记到 late_collapses，入库后由 write_back_collapses 回写。
+        """
+        batch_start = len(self._ids)
+        kept = []
+        for chunk in chunks:
+            self.seen += 1
+            signature = self.signature(chunk.page_content)
+            index = self.find(signature)
+            if index is None:
+                # 保留的是副本，之后写入 collapsed_offsets / chunk_id 不会修改调用方的 Document
+                chunk = chunk.model_copy(update={"metadata": dict(chunk.metadata)})
+                chunk.metadata.setdefault(self.id_key, str(uuid.uuid4()))
+                self._add(chunk.metadata[self.id_key], signature)
+                kept.append(chunk)
+                continue
+            self.removed += 1
+            offset = {key: chunk.metadata.get(key) for key in ("source", "start_index", "page_no") if key in chunk.metadata}
+            if index < batch_start:
+                self.late_collapses[self._ids[index]].append(offset)
+            else:
+                representative = kept[index - batch_start]
+                representative.metadata[COLLAPSED_KEY] = merge_offsets(representative.metadata.get(COLLAPSED_KEY), [offset])
+        return kept
+
+    def pending_collapses(self) -> list[tuple[str, list[dict]]]:
+        """之前批次保留的 chunk 的 id 及其之后才出现的重复出处，需要回写到向量库"""
+        return list(self.late_collapses.items())
+
+    def stats(self) -> dict:
+        kept = self.seen - self.removed
+        return {
+            "chunks": self.seen,
+            "kept": kept,
+            "removed": self.removed,
+            "removed_ratio": self.removed / self.seen if self.seen else 0.0,
+            "embedding_calls_saved": math.ceil(self.seen / EMBED_BATCH_SIZE) - math.ceil(kept / EMBED_BATCH_SIZE),
+        }
+
+
+def dedup_documents(chunks: list[Document], threshold: float = 0.8, verbose: bool = True, **kwargs) -> list[Document]:
+    """一次性去重一组 chunk，保持原有顺序，被合并 chunk 的出处写入保留 chunk 的 collapsed_offsets"""
+    dedup = NearDuplicateFilter(threshold=threshold, **kwargs)
+    kept = dedup.filter(chunks)
+    if verbose:
+        print(f"近似去重: {dedup.stats()}")
+    return kept
+
+
+def dedup_stage(dedup: NearDuplicateFilter):
+    """pipeline 阶段：list[chunk] -> 去重后的 list[chunk]，放在 batch_stage 和 embed_stage 之间"""
+    def _stage(batches: Iterator[list[Document]]) -> Iterator[list[Document]]:
+        for chunks in batches:
+            kept = dedup.filter(chunks)
+            if kept:
+                yield kept
+    return _stage
+
+
+def merge_offsets(collapsed: str, offsets: list[dict]) -> str:
+    return json.dumps(json.loads(collapsed or "[]") + offsets, ensure_ascii=False)
+
+
+def write_back_collapses(client, collection_name: str, dedup: NearDuplicateFilter, id_field: str = "chunk_id",
+                         batch_size: int = 200) -> int:
+    """
+    流式入库结束后，把跨批次发现的重复出处合并进已写入的保留 chunk（按 id_field 查出整行后 upsert），
+    返回更新的行数。id_field 存的需要是去重时保留 chunk 的 id（dedup.id_key）。
+
+    Args:
+        client: MilvusClient
+        collection_name: 集合名
+        dedup: 入库时使用的 NearDuplicateFilter
+        id_field: 能唯一定位一行的字段
+        batch_size: 每批查询 / upsert 的行数
+    """
+    from milvus.tenant import in_filter
+
+    pending = dict(dedup.pending_collapses())
+    ids = list(pending)
+    updated = 0
+    for start in range(0, len(ids), batch_size):
+        rows = client.query(
+            collection_name,
+            filter=in_filter(id_field, ids[start:start + batch_size]),
+            output_fields=["*"],
+            consistency_level="Strong",
+        )
+        for row in rows:
+            row[COLLAPSED_KEY] = merge_offsets(row.get(COLLAPSED_KEY), pending[row[id_field]])
+        if rows:
+            client.upsert(collection_name=collection_name, data=rows)
+            updated += len(rows)
+    dedup.late_collapses.clear()
+    return updated
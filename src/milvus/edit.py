@@ -13,11 +13,16 @@ import uuid
 os.environ["GRPC_VERBOSITY"] = "ERROR"
 os.environ["GRPC_ENABLE_FORK_SUPPORT"] = "false"
 
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.document_loaders import UnstructuredMarkdownLoader
 
 from milvus import client
-from utils import embeddings
+from milvus.dedup import COLLAPSED_KEY, NearDuplicateFilter, dedup_documents, dedup_stage, write_back_collapses
+from milvus.manifest import IngestManifest, file_hash, sync_sources
+from milvus.query_cache import invalidate
+from milvus.tenant import in_filter
+from milvus.parallel_loader import parallel_load, parallel_load_stage
+from milvus.pipeline import run_pipeline, split_stage, batch_stage, embed_stage, insert_stage, report
+from utils import embeddings, embed_in_batches, TokenAwareSplitter
 
 COLLECTION_NAME = "books"
 
@@ -29,53 +34,148 @@ def get_system_files():
     files = os.listdir(base_path)
     return files, base_path
 
-def get_books_documents():
+def load_book(file_path: str):
+    return UnstructuredMarkdownLoader(file_path).load()
+
+def get_text_splitter():
+    # 按 token 切分，句子 / 标题感知，重叠约 12%
+    return TokenAwareSplitter(
+        chunk_size=256,
+        chunk_overlap=32,
+        add_start_index=True
+    )
+
+def book_id_of(source: str) -> str:
+    """按文件名生成确定性的 book_id，同一本书重复入库时不变"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, os.path.basename(source or "")))
+
+def to_row(chunk, vector):
+    # 增量入库时使用确定性的 chunk_id，否则随机生成并记回 metadata（流式入库回写出处时按它定位）；
+    # books 的主键 pk 是非自增的 VARCHAR，与 chunk_id 相同，insert / upsert 的每一行都必须带上
+    chunk_id = chunk.metadata.setdefault("chunk_id", str(uuid.uuid4()))
+    return {
+        "pk": chunk_id,
+        "book_id": book_id_of(chunk.metadata.get("source")),
+        "page_no": 1,
+        "book_name": "llmops项目文档",
+        "source": chunk.metadata.get("source"),
+        "content": chunk.page_content,
+        "vector": vector,
+        "chunk_id": chunk_id,
+        # 去重时合并进来的其它出处，引用时一并给出
+        COLLAPSED_KEY: chunk.metadata.get(COLLAPSED_KEY, "[]"),
+    }
+
+def get_books_documents(max_workers: int = None):
+    """多进程解析 docs 下的文件，按扩展名选择 loader，顺序与文件列表一致"""
     files, base_path = get_system_files()
-    docs = []
-    for file_name in files:
-        file_path = os.path.join(base_path, file_name)
-        cur_docs = UnstructuredMarkdownLoader(file_path).load()
-        for cur_doc in cur_docs:
-            docs.append(cur_doc)
-    return docs
+    return list(parallel_load((os.path.join(base_path, file_name) for file_name in files), max_workers=max_workers))
 
 def get_books_chunks():
     docs = get_books_documents()
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=50,
-        chunk_overlap=20,
-        add_start_index=True
-    )
+    text_splitter = get_text_splitter()
     chunks = text_splitter.split_documents(docs)
-    return chunks
-
-def get_insert_data():
-    chunks = get_books_chunks()
-    data = []
-    for i, chunk in enumerate(chunks[:10]):
-        content = chunk.page_content
-        vector = embeddings.embed_query(content)
-        book_id = str(uuid.uuid4())
-        chunk_id = str(uuid.uuid4())
-        page_no = 1
-        book_name = "llmops项目文档"
-        data.append({
-            "book_id": book_id,
-            "page_no": page_no,
-            "book_name": book_name,
-            "content": content,
-            "vector": vector,
-            "chunk_id": chunk_id,
-        })
-    return data
+    # 重叠和重复的页眉页脚产生的近似重复 chunk 不再向量化
+    return dedup_documents(chunks)
+
+def get_insert_data(batch_size: int = 10, max_workers: int = 4, max_rps: float = None):
+    chunks = get_books_chunks()[:10]
+    # 分批并发向量化，结果顺序与 chunks 一致
+    vectors = embed_in_batches(
+        [chunk.page_content for chunk in chunks],
+        embeddings,
+        batch_size=batch_size,
+        max_workers=max_workers,
+        max_rps=max_rps,
+    )
+    return [to_row(chunk, vector) for chunk, vector in zip(chunks, vectors)]
 
 def inset_to_milvus():
     data = get_insert_data()
-    client.insert(collection_name=COLLECTION_NAME, data=data)
+    client.client.insert(collection_name=COLLECTION_NAME, data=data)
+    invalidate(COLLECTION_NAME)
+
+def ingest_books_streaming(embed_batch_size: int = 50, insert_batch_size: int = 200, queue_size: int = 4):
+    """流式入库：加载 -> 切分 -> 向量化 -> 写入 各阶段并发执行，内存占用与语料大小无关"""
+    files, base_path = get_system_files()
+    paths = (os.path.join(base_path, file_name) for file_name in files if file_name.endswith(".md"))
+    dedup = NearDuplicateFilter()
+
+    inserted = run_pipeline(
+        paths,
+        [
+            parallel_load_stage(),
+            split_stage(get_text_splitter()),
+            batch_stage(embed_batch_size),
+            dedup_stage(dedup),
+            embed_stage(embeddings),
+            insert_stage(
+                # client 是 langchain 的 Milvus store，按行写入使用底层的 MilvusClient
+                lambda rows: client.client.insert(collection_name=COLLECTION_NAME, data=rows),
+                # 去重器保留的 chunk 已带 chunk_id，to_row 用它作主键，回写出处时按它定位
+                to_row,
+                insert_batch_size,
+            ),
+        ],
+        queue_size=queue_size,
+    )
+    try:
+        total = report(inserted)
+        # 跨批次发现的重复，其保留 chunk 已经写入，出处在全部写完后回写
+        updated = write_back_collapses(client.client, COLLECTION_NAME, dedup)
+        print(f"近似去重: {dedup.stats()}, 回写出处 {updated} 条")
+        return total
+    finally:
+        invalidate(COLLECTION_NAME)
+
+def ingest_books_incremental():
+    """增量入库：只向量化并写入变化的 chunk，删除已消失的 chunk"""
+    files, base_path = get_system_files()
+    sources = {
+        os.path.join(base_path, file_name): file_hash(os.path.join(base_path, file_name))
+        for file_name in files if file_name.endswith(".md")
+    }
+    text_splitter = get_text_splitter()
+
+    # client 是 langchain 的 Milvus store，按行写入 / 按过滤条件删除需要使用底层的 MilvusClient
+    milvus_client = client.client
+
+    def _upsert(chunks, ids):
+        vectors = embed_in_batches([chunk.page_content for chunk in chunks], embeddings)
+        milvus_client.upsert(collection_name=COLLECTION_NAME, data=[to_row(chunk, vector) for chunk, vector in zip(chunks, vectors)])
+
+    def _delete(ids):
+        # 主键与 chunk_id 相同，按主键删除
+        milvus_client.delete(COLLECTION_NAME, ids=ids)
+
+    def _verify(ids):
+        found = set()
+        for start in range(0, len(ids), 1000):
+            rows = milvus_client.query(
+                COLLECTION_NAME,
+                filter=in_filter("chunk_id", ids[start:start + 1000]),
+                output_fields=["chunk_id"],
+                consistency_level="Strong",
+            )
+            found.update(row["chunk_id"] for row in rows)
+        return found
+
+    stats = sync_sources(
+        IngestManifest(COLLECTION_NAME),
+        sources,
+        # 只在单个文件内去重，保证每个文件的 chunk 只由该文件内容决定，manifest 的增量比较才成立
+        lambda source: dedup_documents(text_splitter.split_documents(load_book(source)), verbose=False),
+        _upsert,
+        _delete,
+        _verify,
+    )
+    invalidate(COLLECTION_NAME)
+    print(stats)
+    return stats
 
 
 def search_milvus():
-    result = client.search(
+    result = client.client.search(
         collection_name=COLLECTION_NAME,
         data=[embeddings.embed_query("llmops")],
         limit=10
@@ -84,5 +184,7 @@ def search_milvus():
 
 if __name__ == "__main__":
     # inset_to_milvus()
+    # ingest_books_streaming()
+    # ingest_books_incremental()
     # search_milvus()
     pass
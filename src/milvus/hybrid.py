@@ -0,0 +1,165 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/19 11:30
+@Author  : tianshiyang
+@File    : hybrid.py
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from langchain_core.documents import Document
+
+
+@dataclass
+class HybridLeg:
+    """
+    混合检索中的一路召回。
+
+    Args:
+        field: 向量字段，稠密向量（如 vector / dense）或 BM25 输出的稀疏向量（如 sparse）
+        limit: 这一路召回的候选数量
+        params: 这一路的搜索参数，如 {"ef": 64} / {"drop_ratio_search": 0.2}
+        weight: ranker 为 weighted 时这一路的权重
+        metric_type: 这一路的距离度量，默认取该字段索引的 metric_type
+    """
+    field: str
+    limit: int = 20
+    params: dict = field(default_factory=dict)
+    weight: float = 1.0
+    metric_type: Optional[str] = None
+
+
+@dataclass
+class HybridResult:
+    """
+    Args:
+        documents: 融合排序后的 (Document, 融合分数)
+        leg_scores: 主键 -> {字段: 这一路的原始分数}，没有被某一路召回则不包含该字段
+        timings: 每一路单独检索和融合检索的耗时（毫秒）
+    """
+    documents: list[tuple[Document, float]]
+    leg_scores: dict = field(default_factory=dict)
+    timings: dict = field(default_factory=dict)
+
+
+def _index_metric_types(store) -> dict:
+    """向量字段 -> 建索引时的 metric_type"""
+    index_params = store._as_list(store.index_params) or []
+    return {
+        vector_field: (param or {}).get("metric_type")
+        for vector_field, param in zip(store._as_list(store._vector_field), index_params)
+    }
+
+
+def search_param(leg: HybridLeg, metric_type: Optional[str] = None) -> dict:
+    """融合检索的 AnnSearchRequest 和 explain 的单路 search 使用同一种形状：{"metric_type": ..., "params": {...}}"""
+    metric_type = leg.metric_type or metric_type
+    param = {"metric_type": metric_type} if metric_type else {}
+    param["params"] = dict(leg.params)
+    return param
+
+
+def default_legs(store, limit: int = 20) -> list[HybridLeg]:
+    """按 store 的向量字段生成默认的召回配置"""
+    params = store._as_list(store.search_params) or [{}] * len(store._as_list(store._vector_field))
+    return [
+        HybridLeg(
+            field=vector_field,
+            limit=limit,
+            params=(param or {}).get("params", {}),
+            metric_type=(param or {}).get("metric_type"),
+        )
+        for vector_field, param in zip(store._as_list(store._vector_field), params)
+    ]
+
+
+def make_ranker(ranker: str, legs: list[HybridLeg], ranker_params: Optional[dict] = None):
+    """查询时选择融合方式：rrf（可设 k）或 weighted（权重取自各路的 weight 或 ranker_params.weights）"""
+    from pymilvus import RRFRanker, WeightedRanker
+
+    ranker_params = ranker_params or {}
+    if ranker == "rrf":
+        return RRFRanker(ranker_params.get("k", 60))
+    if ranker == "weighted":
+        return WeightedRanker(*ranker_params.get("weights", [leg.weight for leg in legs]))
+    raise ValueError(f"不支持的 ranker: {ranker}，可选 rrf / weighted")
+
+
+def _search_data(store, leg: HybridLeg, query: str, cache: dict):
+    """稠密向量字段用 embedding 向量化，BM25 等函数生成的字段直接传原文"""
+    if leg.field not in store._vector_fields_from_embedding:
+        return query
+    if leg.field not in cache:
+        index = store._vector_fields_from_embedding.index(leg.field)
+        cache[leg.field] = store._as_list(store.embedding_func)[index].embed_query(query)
+    return cache[leg.field]
+
+
+def hybrid_search(
+        store,
+        query: str,
+        legs: Optional[list[HybridLeg]] = None,
+        k: int = 4,
+        ranker: str = "rrf",
+        ranker_params: Optional[dict] = None,
+        expr: Optional[str] = None,
+        explain: bool = False,
+) -> HybridResult:
+    """
+    混合检索：每一路单独设置 limit / params，查询时选择 ranker，由 Milvus 服务端融合。
+
+    Args:
+        store: 多向量字段的 Milvus store，如 hybrid_search.get_milvus_client()
+        query: 查询文本
+        legs: 各路召回配置，默认每个向量字段一路
+        k: 融合后返回条数
+        ranker: rrf / weighted
+        ranker_params: rrf 的 {"k": 60} 或 weighted 的 {"weights": [...]}
+        expr: 过滤表达式，对每一路生效
+        explain: 为 True 时额外单独执行每一路检索，返回每一路的分数和耗时
+    """
+    from pymilvus import AnnSearchRequest
+
+    legs = legs or default_legs(store)
+    metric_types = _index_metric_types(store)
+    vectors = {}
+    requests = [
+        AnnSearchRequest(
+            data=[_search_data(store, leg, query, vectors)],
+            anns_field=leg.field,
+            param=search_param(leg, metric_types.get(leg.field)),
+            limit=leg.limit,
+            expr=expr,
+        )
+        for leg in legs
+    ]
+
+    start = time.perf_counter()
+    result = store.client.hybrid_search(
+        store.collection_name,
+        reqs=requests,
+        ranker=make_ranker(ranker, legs, ranker_params),
+        limit=k,
+        output_fields=["*"],
+    )
+    timings = {"fused": (time.perf_counter() - start) * 1000}
+    documents = [(store._parse_document(dict(hit["entity"])), hit["distance"]) for hit in result[0]]
+
+    leg_scores = {}
+    if explain:
+        for leg in legs:
+            start = time.perf_counter()
+            hits = store.client.search(
+                store.collection_name,
+                data=[_search_data(store, leg, query, vectors)],
+                anns_field=leg.field,
+                limit=leg.limit,
+                filter=expr or "",
+                search_params=search_param(leg, metric_types.get(leg.field)),
+            )[0]
+            timings[leg.field] = (time.perf_counter() - start) * 1000
+            for hit in hits:
+                leg_scores.setdefault(hit["id"], {})[leg.field] = hit["distance"]
+    return HybridResult(documents=documents, leg_scores=leg_scores, timings=timings)
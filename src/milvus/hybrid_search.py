@@ -10,7 +10,8 @@ import uuid
 from langchain_core.documents import Document
 from langchain_milvus import Milvus, BM25BuiltInFunction
 from milvus import CONNECTION_ARGS
-from utils import embeddings
+from milvus.hybrid import HybridLeg, hybrid_search
+from milvus.registry import get_store
 
 docs = [
     Document(
@@ -70,8 +71,8 @@ def get_milvus_client() -> Milvus:
         "metric_type": "BM25",
         "index_type": "AUTOINDEX",
     }
-    vector_store = Milvus(
-        embedding_function=embeddings,
+    vector_store = get_store(
+        COLLECTION_NAME,
         text_field="content",
         primary_field="id",
         vector_field=["vector", "sparse"],
@@ -83,7 +84,6 @@ def get_milvus_client() -> Milvus:
         index_params=[dense_index_param, sparse_index_param],
         enable_dynamic_field=True,
         connection_args=CONNECTION_ARGS,
-        collection_name=COLLECTION_NAME,
     )
     return vector_store
 
@@ -108,7 +108,26 @@ def similarity_search_with_ranker(vector_store: Milvus):
 
     # vector_store.similarity_search(query, k=1, ranker_type="rrf", ranker_params={"k": 100})
 
+def similarity_search_with_legs(vector_store: Milvus):
+    # 每一路单独设置候选数量和搜索参数，查询时选择 ranker，并查看每一路的分数和耗时
+    query = "What are the novels Lila has written and what are their contents?"
+    result = hybrid_search(
+        vector_store,
+        query,
+        legs=[
+            HybridLeg("vector", limit=20, params={"ef": 64}, weight=0.6),
+            HybridLeg("sparse", limit=50, params={"drop_ratio_search": 0.2}, weight=0.4),
+        ],
+        k=3,
+        ranker="weighted",
+        explain=True,
+    )
+    for doc, score in result.documents:
+        print(score, result.leg_scores.get(doc.metadata.get("id")), doc.page_content[:50])
+    print(result.timings)
+
 if __name__ == "__main__":
     milvus = get_milvus_client()
     # insert_to_milvus(milvus)
-    similarity_search_with_ranker(milvus)
\ No newline at end of file
+    similarity_search_with_ranker(milvus)
+    # similarity_search_with_legs(milvus)
\ No newline at end of file
@@ -5,22 +5,15 @@
 @Author  : tianshiyang
 @File    : index.py
 """
-import os
 import uuid
 
-from langchain_milvus import Milvus
-import dotenv
 from langchain_core.documents import Document
 
-from utils import embeddings
-
-dotenv.load_dotenv()
-
-CONNECTION_ARGS = {
-    "uri": os.getenv("MILVUS_URI"),
-    "db_name": os.getenv("MILVUS_DB_NAME"),
-    "token": os.getenv("MILVUS_TOKEN"),
-}
+from milvus.bulk_delete import bulk_delete_from_store
+from milvus.config import CONNECTION_ARGS
+from milvus.mmr import MMRRetriever
+from milvus.query_cache import CachedVectorStore
+from milvus.registry import get_store
 
 CONNECTION_NAME = "books"
 
@@ -36,19 +29,19 @@ test_documents = [
     )
 ]
 
-# 获取Milvus store
-vector_store = Milvus(
-    connection_args=CONNECTION_ARGS,
-    collection_name=CONNECTION_NAME,
-    embedding_function=embeddings,
-    consistency_level="Strong",  # 设置强一致性，确保删除立即生效
-    text_field="content",
-    primary_field="id",  # 指定主键字段名，MMR 搜索需要
-)
+# 获取Milvus store，首次调用时才建立连接，之后复用；检索结果带缓存，写入 / 删除后自动失效
+def get_vector_store():
+    return CachedVectorStore(get_store(
+        CONNECTION_NAME,
+        connection_args=CONNECTION_ARGS,
+        consistency_level="Strong",  # 设置强一致性，确保删除立即生效
+        text_field="content",
+        primary_field="id",  # 指定主键字段名，MMR 搜索需要
+    ))
 
 # 往Milvus中插入数据
 def insert_documents():
-    vector_store.add_documents(
+    get_vector_store().add_documents(
         test_documents,
         ids=[str(uuid.uuid4()) for _ in range(len(test_documents))],
     )
@@ -63,15 +56,21 @@ def delete_documents():
     #     expr='content == "这是第3条测试数据"'
     # )
     # 3.使用like语句
-    vector_store.delete(
-        expr='book_name like "%book_name"'
+    # get_vector_store().delete(
+    #     expr='book_name like "%book_name"'
+    # )
+    # 4. 大量数据：按页解析主键分批删除，最后等待 compaction 完成
+    result = bulk_delete_from_store(
+        get_vector_store(),
+        'book_name like "%book_name"',
+        batch_size=500,
     )
-    # print(result)
+    print(result)
 
 # 搜索 1. 直接查询
 def similarity_search():
     # 1. 直接查询
-    result = vector_store.similarity_search_with_score(
+    result = get_vector_store().similarity_search_with_score(
         "第三条",
         k=10,
         expr='book_name == "测试数据的book_name"'
@@ -82,13 +81,12 @@ def similarity_search():
         print(doc.page_content)
 
 def retriever_search():
-    # mmr 需要 collection 主键名为 'id'，如果不是，使用 similarity 类型
-    retriever = vector_store.as_retriever(
-        search_type="mmr",
-        search_kwargs={
-            "k": 10,
-            "expr": 'book_name like "%book_name"'  # 使用 expr，不是 filter
-        }
+    # 候选向量随 search 一次取回，不依赖主键名；fetch_k 控制候选数量
+    retriever = MMRRetriever(
+        store=get_vector_store(),
+        k=10,
+        fetch_k=50,
+        expr='book_name like "%book_name"'  # 使用 expr，不是 filter
     )
     result = retriever.invoke("第三条")
     for doc in result:
@@ -0,0 +1,477 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 22:40
+@Author  : tianshiyang
+@File    : local_store.py
+"""
+import json
+import os
+import re
+import threading
+import uuid
+from typing import Any, Callable, Iterable, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+# CONNECTION_ARGS 的 uri 以 local:// 开头时使用本地向量库，例如 local://.cache/vectors
+LOCAL_URI_PREFIX = "local://"
+
+
+def is_local_uri(uri: Optional[str]) -> bool:
+    return bool(uri) and uri.startswith(LOCAL_URI_PREFIX)
+
+
+# ---------------- expr 过滤 ----------------
+_TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<number>-?\d+(?:\.\d+)?)
+      | (?P<op>==|!=|>=|<=|>|<|\[|\]|\(|\)|,)
+      | (?P<word>[A-Za-z_][A-Za-z0-9_.]*)
+    )""",
+    re.VERBOSE,
+)
+
+
+def _tokenize(expr: str) -> list[tuple[str, Any]]:
+    tokens, pos = [], 0
+    expr = expr.strip()
+    while pos < len(expr):
+        match = _TOKEN.match(expr, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"无法解析的 expr: {expr[pos:]!r}")
+        pos = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "string":
+            value = re.sub(r"\\(.)", r"\1", value[1:-1])
+        elif kind == "number":
+            value = float(value) if "." in value else int(value)
+        elif kind == "word" and value.lower() in ("and", "or", "not", "in", "like", "true", "false"):
+            kind, value = "keyword", value.lower()
+        tokens.append((kind, value))
+    return tokens
+
+
+def _like(pattern: str) -> Callable[[Any], bool]:
+    # Milvus like 支持 % 通配符
+    regex = re.compile("^" + ".*".join(re.escape(part) for part in pattern.split("%")) + "$", re.S)
+    return lambda value: isinstance(value, str) and regex.match(value) is not None
+
+
+class _ExprParser:
+    """
+    解析 Milvus expr 的一个子集：==、!=、比较、like、in、not in，以及 and / or / not 和括号。
+
+    解析结果是一个 metadata -> bool 的函数。
+    """
+
+    def __init__(self, expr: str):
+        self.tokens = _tokenize(expr)
+        self.pos = 0
+
+    def parse(self) -> Callable[[dict], bool]:
+        predicate = self._or()
+        if self.pos != len(self.tokens):
+            raise ValueError(f"expr 中存在多余内容: {self.tokens[self.pos:]}")
+        return predicate
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def _take(self, kind: str = None, value: Any = None):
+        token = self._peek()
+        if (kind and token[0] != kind) or (value is not None and token[1] != value):
+            raise ValueError(f"expr 解析失败，期望 {value or kind}，实际 {token}")
+        self.pos += 1
+        return token
+
+    def _or(self):
+        left = self._and()
+        while self._peek() == ("keyword", "or"):
+            self._take()
+            right = self._and()
+            left = (lambda a, b: lambda m: a(m) or b(m))(left, right)
+        return left
+
+    def _and(self):
+        left = self._not()
+        while self._peek() == ("keyword", "and"):
+            self._take()
+            right = self._not()
+            left = (lambda a, b: lambda m: a(m) and b(m))(left, right)
+        return left
+
+    def _not(self):
+        if self._peek() == ("keyword", "not"):
+            self._take()
+            inner = self._not()
+            return lambda m: not inner(m)
+        if self._peek() == ("op", "("):
+            self._take()
+            inner = self._or()
+            self._take("op", ")")
+            return inner
+        return self._compare()
+
+    def _literal(self):
+        kind, value = self._take()
+        if kind in ("string", "number"):
+            return value
+        if kind == "keyword" and value in ("true", "false"):
+            return value == "true"
+        raise ValueError(f"expr 中期望常量，实际 {value!r}")
+
+    def _list(self):
+        self._take("op", "[")
+        values = []
+        while self._peek() != ("op", "]"):
+            values.append(self._literal())
+            if self._peek() == ("op", ","):
+                self._take()
+        self._take("op", "]")
+        return values
+
+    def _compare(self):
+        _, field = self._take("word")
+        kind, op = self._take()
+        negate = False
+        if (kind, op) == ("keyword", "not"):
+            negate = True
+            kind, op = self._take("keyword", "in")
+        if op == "in":
+            values = set(self._list())
+            return lambda m: (m.get(field) in values) != negate
+        if op == "like":
+            match = _like(self._literal())
+            return lambda m: match(m.get(field))
+        value = self._literal()
+        compare = {
+            "==": lambda a: a == value,
+            "!=": lambda a: a != value,
+            ">": lambda a: a is not None and a > value,
+            ">=": lambda a: a is not None and a >= value,
+            "<": lambda a: a is not None and a < value,
+            "<=": lambda a: a is not None and a <= value,
+        }.get(op)
+        if compare is None:
+            raise ValueError(f"不支持的运算符: {op}")
+        return lambda m: compare(m.get(field))
+
+
+def parse_expr(expr: Optional[str]) -> Optional[Callable[[dict], bool]]:
+    return _ExprParser(expr).parse() if expr and expr.strip() else None
+
+
+def _dense_metric(index_params) -> str:
+    """从 Milvus 的 index_params 中取稠密向量的 metric_type，BM25 等稀疏索引忽略"""
+    for param in index_params if isinstance(index_params, list) else [index_params]:
+        if param and param.get("metric_type", "").upper() in ("L2", "COSINE", "IP"):
+            return param["metric_type"].upper()
+    return "COSINE"
+
+
+def from_milvus_options(collection_name: str, uri: str, embedding_function: Embeddings, **options: Any) -> "LocalVectorStore":
+    """
+    用构造 Milvus store 的参数创建 LocalVectorStore，只使用其中的文本 / 主键字段和 metric_type，
+    builtin_function（BM25）、分区等 Milvus 特有的参数会被忽略。
+    """
+    return LocalVectorStore(
+        embedding_function=embedding_function,
+        collection_name=collection_name,
+        path=uri[len(LOCAL_URI_PREFIX):],
+        text_field=options.get("text_field", "text"),
+        primary_field=options.get("primary_field", "pk"),
+        metric_type=_dense_metric(options.get("index_params")),
+        drop_old=options.get("drop_old", False),
+    )
+
+
+# ---------------- 向量库 ----------------
+class LocalVectorStore(VectorStore):
+    """
+    进程内的向量库，接口与 langchain_milvus.Milvus 常用部分一致，不依赖 Milvus 服务。
+
+    向量保存在内存映射的 float32 文件中，文本和 metadata 保存在 json 中；
+    检索用 NumPy 一次算完全部相似度，expr 支持 ==、like、in 等常用写法。
+
+    Args:
+        embedding_function: Embeddings
+        collection_name: collection 名称，对应 path 下的一个目录
+        path: 数据目录
+        text_field: 与 Milvus 一致，仅用于 expr 中引用文本
+        primary_field: 主键名，检索结果的 metadata 中会带上该字段
+        metric_type: L2 / COSINE / IP
+    """
+
+    def __init__(
+            self,
+            embedding_function: Embeddings,
+            collection_name: str = "LangChainCollection",
+            path: str = ".cache/vectors",
+            text_field: str = "text",
+            primary_field: str = "pk",
+            metric_type: str = "COSINE",
+            drop_old: bool = False,
+            **kwargs: Any,
+    ):
+        self.embedding_func = embedding_function
+        self.collection_name = collection_name
+        self._text_field = text_field
+        self._primary_field = primary_field
+        self.metric_type = metric_type.upper()
+        self._dir = os.path.join(path, collection_name)
+        self._lock = threading.RLock()
+        os.makedirs(self._dir, exist_ok=True)
+        if drop_old:
+            for name in ("vectors.f32", "records.json"):
+                if os.path.exists(os.path.join(self._dir, name)):
+                    os.remove(os.path.join(self._dir, name))
+        self._load()
+
+    # 与 Milvus store 保持一致，方便 CachedVectorStore 等复用
+    @staticmethod
+    def _as_list(value):
+        if value is None:
+            return []
+        return value if isinstance(value, list) else [value]
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding_func
+
+    # ---------------- 持久化 ----------------
+    def _load(self):
+        records_path = os.path.join(self._dir, "records.json")
+        if os.path.exists(records_path):
+            with open(records_path, encoding="utf-8") as f:
+                state = json.load(f)
+        else:
+            state = {"dim": 0, "capacity": 0, "records": []}
+        self._dim = state["dim"]
+        self._capacity = state["capacity"]
+        self._records: list[dict] = state["records"]
+        self._index = {record["id"]: i for i, record in enumerate(self._records)}
+        self._vectors = self._open(self._capacity) if self._capacity else None
+
+    def _open(self, capacity: int, mode: str = "r+") -> np.memmap:
+        return np.memmap(os.path.join(self._dir, "vectors.f32"), dtype=np.float32, mode=mode, shape=(capacity, self._dim))
+
+    def _save(self):
+        if self._vectors is not None:
+            self._vectors.flush()
+        tmp = os.path.join(self._dir, "records.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"dim": self._dim, "capacity": self._capacity, "records": self._records}, f, ensure_ascii=False)
+        os.replace(tmp, os.path.join(self._dir, "records.json"))
+
+    def _reserve(self, size: int):
+        """容量不够时按 2 倍扩容"""
+        if size <= self._capacity:
+            return
+        capacity = max(1024, self._capacity * 2, size)
+        old = np.array(self._vectors[:len(self._records)]) if self._vectors is not None else None
+        self._vectors = None
+        self._capacity = capacity
+        self._vectors = self._open(capacity, mode="w+")
+        if old is not None:
+            self._vectors[:len(old)] = old
+
+    def _prepare_vectors(self, vectors: np.ndarray) -> np.ndarray:
+        if self.metric_type == "COSINE":
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms == 0, 1, norms)
+        return vectors
+
+    # ---------------- 写入 / 删除 ----------------
+    def add_texts(
+            self,
+            texts: Iterable[str],
+            metadatas: Optional[list[dict]] = None,
+            ids: Optional[list[str]] = None,
+            **kwargs: Any,
+    ) -> list[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids = [str(i) if i is not None else str(uuid.uuid4()) for i in (ids or [None] * len(texts))]
+        vectors = self._prepare_vectors(np.asarray(self.embedding_func.embed_documents(texts), dtype=np.float32))
+
+        with self._lock:
+            if not self._dim:
+                self._dim = vectors.shape[1]
+            # 与 Milvus 不同，相同 id 直接覆盖，避免重复
+            self._delete_ids([i for i in ids if i in self._index])
+            start = len(self._records)
+            self._reserve(start + len(texts))
+            self._vectors[start:start + len(texts)] = vectors
+            for i, (doc_id, text, metadata) in enumerate(zip(ids, texts, metadatas)):
+                self._records.append({"id": doc_id, "text": text, "metadata": dict(metadata)})
+                self._index[doc_id] = start + i
+            self._save()
+        return ids
+
+    def _delete_ids(self, ids: list[str]):
+        rows = {self._index[i] for i in ids if i in self._index}
+        if not rows:
+            return
+        keep = np.asarray([i for i in range(len(self._records)) if i not in rows], dtype=np.int64)
+        # 删除后整体前移，保持向量连续
+        if len(keep):
+            self._vectors[:len(keep)] = self._vectors[keep]
+        self._records = [self._records[i] for i in keep]
+        self._index = {record["id"]: i for i, record in enumerate(self._records)}
+
+    def delete(self, ids: Optional[list[str]] = None, expr: Optional[str] = None, **kwargs: Any) -> bool:
+        with self._lock:
+            targets = list(ids or [])
+            if expr:
+                predicate = parse_expr(expr)
+                targets += [self._records[i]["id"] for i in range(len(self._records)) if predicate(self._view(i))]
+            self._delete_ids(targets)
+            self._save()
+        return True
+
+    # ---------------- 检索 ----------------
+    def _view(self, row: int) -> dict:
+        """expr 过滤时看到的字段：metadata + 主键 + 文本"""
+        record = self._records[row]
+        return {**record["metadata"], self._primary_field: record["id"], self._text_field: record["text"]}
+
+    def _document(self, row: int) -> Document:
+        record = self._records[row]
+        return Document(
+            page_content=record["text"],
+            metadata={**record["metadata"], self._primary_field: record["id"]},
+            id=record["id"],
+        )
+
+    def _candidates(self, expr: Optional[str]) -> np.ndarray:
+        predicate = parse_expr(expr)
+        if predicate is None:
+            return np.arange(len(self._records))
+        return np.asarray([i for i in range(len(self._records)) if predicate(self._view(i))], dtype=np.int64)
+
+    def _search_many(self, embeddings: list[list[float]], k: int, expr: Optional[str]) -> list[list[tuple[int, float]]]:
+        """多个 query 向量一次矩阵运算完成检索；L2 返回距离（越小越近），COSINE / IP 返回相似度（越大越近），与 Milvus 一致"""
+        with self._lock:
+            if not self._records:
+                return [[] for _ in embeddings]
+            rows = self._candidates(expr)
+            if not len(rows):
+                return [[] for _ in embeddings]
+            queries = self._prepare_vectors(np.asarray(embeddings, dtype=np.float32))
+            vectors = self._vectors[rows]
+            if self.metric_type == "L2":
+                scores = (
+                    np.einsum("ij,ij->i", vectors, vectors)[None, :]
+                    - 2 * queries @ vectors.T
+                    + np.einsum("ij,ij->i", queries, queries)[:, None]
+                )
+                order_scores = scores
+            else:
+                scores = queries @ vectors.T
+                order_scores = -scores
+            k = min(k, len(rows))
+            top = np.argpartition(order_scores, k - 1, axis=1)[:, :k]
+            top = np.take_along_axis(top, np.argsort(np.take_along_axis(order_scores, top, axis=1), axis=1), axis=1)
+            return [[(int(rows[i]), float(scores[q, i])) for i in top[q]] for q in range(len(queries))]
+
+    def _search(self, embedding: list[float], k: int, expr: Optional[str]) -> list[tuple[int, float]]:
+        return self._search_many([embedding], k, expr)[0]
+
+    def batch_search_by_vectors(
+            self, embeddings: list[list[float]], k: int = 4, expr: Optional[str] = None
+    ) -> list[list[tuple[Document, float]]]:
+        with self._lock:
+            return [
+                [(self._document(row), score) for row, score in hits]
+                for hits in self._search_many(embeddings, k, expr)
+            ]
+
+    def similarity_search_with_score_by_vector(
+            self, embedding: list[float], k: int = 4, expr: Optional[str] = None, **kwargs: Any
+    ) -> list[tuple[Document, float]]:
+        with self._lock:
+            return [(self._document(row), score) for row, score in self._search(embedding, k, expr)]
+
+    def similarity_search_with_score(
+            self, query: str, k: int = 4, expr: Optional[str] = None, **kwargs: Any
+    ) -> list[tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(self.embedding_func.embed_query(query), k=k, expr=expr)
+
+    def similarity_search_by_vector(
+            self, embedding: list[float], k: int = 4, expr: Optional[str] = None, **kwargs: Any
+    ) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k=k, expr=expr)]
+
+    def similarity_search(self, query: str, k: int = 4, expr: Optional[str] = None, **kwargs: Any) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, expr=expr)]
+
+    def max_marginal_relevance_search_by_vector(
+            self,
+            embedding: list[float],
+            k: int = 4,
+            fetch_k: int = 20,
+            lambda_mult: float = 0.5,
+            expr: Optional[str] = None,
+            **kwargs: Any,
+    ) -> list[Document]:
+        with self._lock:
+            candidates = self._search(embedding, fetch_k, expr)
+            if not candidates:
+                return []
+            from milvus.mmr import mmr_select
+
+            rows = [row for row, _ in candidates]
+            selected = mmr_select(
+                np.asarray(embedding, dtype=np.float32),
+                np.asarray(self._vectors[rows]),
+                k=k,
+                lambda_mult=lambda_mult,
+            )
+            return [self._document(rows[i]) for i in selected]
+
+    def max_marginal_relevance_search(
+            self,
+            query: str,
+            k: int = 4,
+            fetch_k: int = 20,
+            lambda_mult: float = 0.5,
+            expr: Optional[str] = None,
+            **kwargs: Any,
+    ) -> list[Document]:
+        return self.max_marginal_relevance_search_by_vector(
+            self.embedding_func.embed_query(query), k=k, fetch_k=fetch_k, lambda_mult=lambda_mult, expr=expr
+        )
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        if self.metric_type == "L2":
+            return self._euclidean_relevance_score_fn
+        # COSINE / IP 返回的已经是相似度
+        return lambda score: score
+
+    def get_by_ids(self, ids: list[str], /) -> list[Document]:
+        with self._lock:
+            return [self._document(self._index[i]) for i in ids if i in self._index]
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @classmethod
+    def from_texts(
+            cls,
+            texts: list[str],
+            embedding: Embeddings,
+            metadatas: Optional[list[dict]] = None,
+            ids: Optional[list[str]] = None,
+            **kwargs: Any,
+    ) -> "LocalVectorStore":
+        store = cls(embedding_function=embedding, **kwargs)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
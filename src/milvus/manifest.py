@@ -0,0 +1,187 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 13:20
+@Author  : tianshiyang
+@File    : manifest.py
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import uuid
+from typing import Callable, Optional
+
+from langchain_core.documents import Document
+
+DEFAULT_MANIFEST_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "ingest_manifest.sqlite"
+)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_id(source: str, start_index: int, text: str) -> str:
+    """由 (source, start_index, 内容 hash) 生成确定性的 chunk id，内容不变重复入库 id 也不变"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{source}#{start_index}#{content_hash(text)}"))
+
+
+def assign_chunk_ids(chunks: list[Document], source_key: str = "source") -> list[str]:
+    """为 chunk 计算确定性 id，并写入 metadata 的 chunk_id / chunk_hash"""
+    ids = []
+    for i, chunk in enumerate(chunks):
+        source = str(chunk.metadata.get(source_key, ""))
+        # 没有 add_start_index 时退化为序号
+        start_index = chunk.metadata.get("start_index", i)
+        cid = chunk_id(source, start_index, chunk.page_content)
+        chunk.metadata["chunk_id"] = cid
+        chunk.metadata["chunk_hash"] = content_hash(chunk.page_content)
+        ids.append(cid)
+    return ids
+
+
+class IngestManifest:
+    """
+    记录每个 collection 已入库的文件 hash 和 chunk id，用于增量入库。
+
+    Args:
+        collection: collection 名称
+        path: SQLite 文件路径
+    """
+
+    def __init__(self, collection: str, path: str = DEFAULT_MANIFEST_PATH):
+        self.collection = collection
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS manifest_files ("
+            "collection TEXT NOT NULL, source TEXT NOT NULL, hash TEXT NOT NULL, "
+            "PRIMARY KEY (collection, source))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS manifest_chunks ("
+            "collection TEXT NOT NULL, source TEXT NOT NULL, chunk_id TEXT NOT NULL, "
+            "PRIMARY KEY (collection, source, chunk_id))"
+        )
+        self._conn.commit()
+
+    def sources(self) -> set[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source FROM manifest_files WHERE collection = ?", (self.collection,)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def file_hash(self, source: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT hash FROM manifest_files WHERE collection = ? AND source = ?",
+                (self.collection, source),
+            ).fetchone()
+        return row[0] if row else None
+
+    def chunk_ids(self, source: str) -> set[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT chunk_id FROM manifest_chunks WHERE collection = ? AND source = ?",
+                (self.collection, source),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def commit_file(self, source: str, digest: str, ids: list[str]):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM manifest_chunks WHERE collection = ? AND source = ?", (self.collection, source)
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO manifest_chunks (collection, source, chunk_id) VALUES (?, ?, ?)",
+                [(self.collection, source, cid) for cid in ids],
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO manifest_files (collection, source, hash) VALUES (?, ?, ?)",
+                (self.collection, source, digest),
+            )
+
+    def remove_file(self, source: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM manifest_chunks WHERE collection = ? AND source = ?", (self.collection, source)
+            )
+            self._conn.execute(
+                "DELETE FROM manifest_files WHERE collection = ? AND source = ?", (self.collection, source)
+            )
+
+
+def sync_sources(
+        manifest: IngestManifest,
+        sources: dict[str, str],
+        load_chunks: Callable[[str], list[Document]],
+        upsert: Callable[[list[Document], list[str]], None],
+        delete: Callable[[list[str]], None],
+        verify: Optional[Callable[[list[str]], set[str]]] = None,
+) -> dict:
+    """
+    按文件 hash 增量同步：未变化的文件跳过，变化的文件只写入新增 chunk、删除消失的 chunk，
+    manifest 中存在但本次不存在的文件整体删除。
+
+    Args:
+        manifest: 入库清单
+        sources: source -> 文件 hash
+        load_chunks: 加载并切分一个 source，返回 chunk 列表
+        upsert: 写入 chunk，参数为 (chunks, ids)
+        delete: 按 id 删除
+        verify: 返回给定 id 中已经存在于向量库的 id；提供时写入后先校验，缺失则不更新清单并抛出异常
+    """
+    stats = {"files_skipped": 0, "files_changed": 0, "files_removed": 0, "chunks_upserted": 0, "chunks_deleted": 0}
+
+    for source, digest in sources.items():
+        if manifest.file_hash(source) == digest:
+            stats["files_skipped"] += 1
+            continue
+
+        chunks = load_chunks(source)
+        ids = assign_chunk_ids(chunks)
+        old_ids = manifest.chunk_ids(source)
+
+        new_chunks, new_ids = [], []
+        for chunk, cid in zip(chunks, ids):
+            if cid not in old_ids:
+                new_chunks.append(chunk)
+                new_ids.append(cid)
+        removed = list(old_ids - set(ids))
+
+        if new_chunks:
+            upsert(new_chunks, new_ids)
+            if verify is not None:
+                missing = set(new_ids) - set(verify(new_ids))
+                if missing:
+                    raise RuntimeError(f"{source} 有 {len(missing)} 个 chunk 未写入向量库，清单未更新")
+        if removed:
+            delete(removed)
+        # 向量库写成功后再更新清单，失败时下次会重试
+        manifest.commit_file(source, digest, ids)
+
+        stats["files_changed"] += 1
+        stats["chunks_upserted"] += len(new_ids)
+        stats["chunks_deleted"] += len(removed)
+
+    for source in manifest.sources() - set(sources):
+        removed = list(manifest.chunk_ids(source))
+        if removed:
+            delete(removed)
+        manifest.remove_file(source)
+        stats["files_removed"] += 1
+        stats["chunks_deleted"] += len(removed)
+
+    return stats
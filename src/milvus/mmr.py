@@ -0,0 +1,138 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/19 09:20
+@Author  : tianshiyang
+@File    : mmr.py
+"""
+from typing import Any, Optional
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def mmr_select(query: np.ndarray, candidates: np.ndarray, k: int = 4, lambda_mult: float = 0.5) -> list[int]:
+    """
+    最大边际相关性选择，返回 candidates 中被选中的下标。
+
+    候选之间的相似度矩阵一次算好，每轮只用向量运算更新"与已选集合的最大相似度"，
+    循环次数为 k 而不是 k * fetch_k。
+
+    Args:
+        query: query 向量，shape (dim,)
+        candidates: 候选向量，shape (n, dim)
+        k: 选出的条数
+        lambda_mult: 1 只看相关性，0 只看多样性
+    """
+    n = len(candidates)
+    k = min(k, n)
+    if k <= 0:
+        return []
+    candidates = _normalize(np.asarray(candidates, dtype=np.float32))
+    query = _normalize(np.asarray(query, dtype=np.float32))
+
+    relevance = candidates @ query
+    pairwise = candidates @ candidates.T
+    max_redundancy = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+
+    selected = [int(np.argmax(relevance))]
+    available[selected[0]] = False
+    while len(selected) < k:
+        np.maximum(max_redundancy, pairwise[selected[-1]], out=max_redundancy)
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+    return selected
+
+
+def _dense_field(store) -> str:
+    return store._vector_fields_from_embedding[0]
+
+
+def fetch_candidates(
+        store,
+        vector: list[float],
+        fetch_k: int = 20,
+        expr: Optional[str] = None,
+        param: Optional[dict] = None,
+) -> tuple[list[Document], np.ndarray]:
+    """
+    一次 search 同时取回候选文档和它们的向量，不依赖主键名（原 MMR 需要按 id 再查一次向量）。
+    """
+    if not hasattr(store, "client"):
+        # LocalVectorStore
+        rows = store._search(vector, fetch_k, expr)
+        return [store._document(row) for row, _ in rows], np.asarray(store._vectors[[row for row, _ in rows]])
+
+    field = _dense_field(store)
+    result = store.client.search(
+        collection_name=store.collection_name,
+        data=[vector],
+        anns_field=field,
+        limit=fetch_k,
+        filter=expr or "",
+        output_fields=["*", field],
+        search_params=param or {},
+    )
+    hits = result[0] if result else []
+    vectors = np.asarray([hit["entity"][field] for hit in hits], dtype=np.float32)
+    documents = [store._parse_document(dict(hit["entity"])) for hit in hits]
+    return documents, vectors
+
+
+def mmr_search(
+        store,
+        query: str,
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        expr: Optional[str] = None,
+        param: Optional[dict] = None,
+) -> list[Document]:
+    """对 Milvus store / LocalVectorStore 做 MMR 检索"""
+    embedding = store._as_list(store.embedding_func)[0]
+    vector = embedding.embed_query(query)
+    documents, vectors = fetch_candidates(store, vector, fetch_k=max(fetch_k, k), expr=expr, param=param)
+    if not documents:
+        return []
+    return [documents[i] for i in mmr_select(np.asarray(vector), vectors, k=k, lambda_mult=lambda_mult)]
+
+
+class MMRRetriever(BaseRetriever):
+    """
+    基于 mmr_search 的检索器，invoke 时可以通过关键字参数覆盖 k / fetch_k / lambda_mult / expr。
+
+    store 为 CachedVectorStore 时结果同样走检索缓存。
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    store: Any
+    k: int = 4
+    fetch_k: int = 20
+    lambda_mult: float = 0.5
+    expr: Optional[str] = None
+
+    def _get_relevant_documents(
+            self, query: str, *, run_manager: CallbackManagerForRetrieverRun, **kwargs: Any
+    ) -> list[Document]:
+        params = {
+            "k": kwargs.get("k", self.k),
+            "fetch_k": kwargs.get("fetch_k", self.fetch_k),
+            "lambda_mult": kwargs.get("lambda_mult", self.lambda_mult),
+            "expr": kwargs.get("expr", self.expr),
+        }
+        if hasattr(self.store, "_cached"):
+            return self.store._cached("mmr", query, params, lambda: mmr_search(self.store.store, query, **params))
+        return mmr_search(self.store, query, **params)
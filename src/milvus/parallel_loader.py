@@ -0,0 +1,127 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/19 19:10
+@Author  : tianshiyang
+@File    : parallel_loader.py
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional
+
+from langchain_core.documents import Document
+
+# 大 PDF 按页拆分，每个任务解析的页数
+DEFAULT_PAGES_PER_TASK = 16
+
+
+# ---------------- 按扩展名解析（在子进程中执行，必须是模块级函数） ----------------
+def load_markdown(path: str, pages: Optional[range] = None) -> list[Document]:
+    from langchain_community.document_loaders import UnstructuredMarkdownLoader
+
+    return UnstructuredMarkdownLoader(path).load()
+
+
+def load_text(path: str, pages: Optional[range] = None) -> list[Document]:
+    with open(path, encoding="utf-8") as f:
+        return [Document(page_content=f.read(), metadata={"source": path})]
+
+
+def load_pdf_pages(path: str, pages: Optional[range] = None) -> list[Document]:
+    """解析 PDF 的一段页码，每页一个 Document，metadata 带 page_no（从 1 开始）"""
+    from io import StringIO
+
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+
+    resource_manager = PDFResourceManager()
+    documents = []
+    # 文件只打开解析一次，只处理本任务的页
+    with open(path, "rb") as f:
+        page_numbers = sorted(pages) if pages is not None else None
+        for i, page in enumerate(PDFPage.get_pages(f, pagenos=set(page_numbers) if page_numbers else None)):
+            output = StringIO()
+            device = TextConverter(resource_manager, output, laparams=LAParams())
+            PDFPageInterpreter(resource_manager, device).process_page(page)
+            device.close()
+            page_no = page_numbers[i] if page_numbers else i
+            documents.append(Document(page_content=output.getvalue(), metadata={"source": path, "page_no": page_no + 1}))
+    return documents
+
+
+def count_pdf_pages(path: str) -> int:
+    from pdfminer.pdfpage import PDFPage
+
+    with open(path, "rb") as f:
+        return sum(1 for _ in PDFPage.get_pages(f))
+
+
+LOADERS: dict[str, Callable[[str, Optional[range]], list[Document]]] = {
+    ".md": load_markdown,
+    ".markdown": load_markdown,
+    ".txt": load_text,
+    ".pdf": load_pdf_pages,
+}
+
+
+def _load_task(task: tuple[str, Optional[range]]) -> list[Document]:
+    path, pages = task
+    return LOADERS[os.path.splitext(path)[1].lower()](path, pages)
+
+
+def plan_tasks(paths: Iterable[str], pages_per_task: int = DEFAULT_PAGES_PER_TASK) -> Iterator[tuple[str, Optional[range]]]:
+    """每个文件一个任务，PDF 按 pages_per_task 页拆成多个任务；不支持的扩展名跳过"""
+    for path in paths:
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in LOADERS:
+            print(f"跳过不支持的文件: {path}")
+            continue
+        if extension != ".pdf":
+            yield path, None
+            continue
+        total = count_pdf_pages(path)
+        for start in range(0, total, pages_per_task):
+            yield path, range(start, min(start + pages_per_task, total))
+
+
+def parallel_load(
+        paths: Iterable[str],
+        max_workers: Optional[int] = None,
+        pages_per_task: int = DEFAULT_PAGES_PER_TASK,
+        prefetch: int = 2,
+) -> Iterator[Document]:
+    """
+    多进程解析文件，按扩展名选择 loader，按输入顺序（PDF 内按页码顺序）流式返回 Document。
+    同时在途的任务最多 max_workers * prefetch 个，内存占用与文件数量无关。
+
+    Args:
+        paths: 文件路径，可以是生成器
+        max_workers: 进程数，默认 CPU 核数；为 1 时在当前进程解析
+        pages_per_task: PDF 每个任务解析的页数
+        prefetch: 每个进程预先提交的任务数
+    """
+    tasks = plan_tasks(paths, pages_per_task)
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1:
+        for task in tasks:
+            yield from _load_task(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        for task in tasks:
+            pending.append(executor.submit(_load_task, task))
+            if len(pending) >= max_workers * prefetch:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def parallel_load_stage(max_workers: Optional[int] = None, pages_per_task: int = DEFAULT_PAGES_PER_TASK):
+    """pipeline 的加载阶段：文件路径 -> Document，替代单线程的 load_stage"""
+    def _stage(paths: Iterator[str]) -> Iterator[Document]:
+        yield from parallel_load(paths, max_workers=max_workers, pages_per_task=pages_per_task)
+    return _stage
@@ -0,0 +1,187 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 11:02
+@Author  : tianshiyang
+@File    : pipeline.py
+"""
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_text_splitters import TextSplitter
+
+from utils import RateLimiter, embed_in_batches
+
+# 阶段结束标记
+_DONE = object()
+
+Stage = Callable[[Iterator[Any]], Iterable[Any]]
+
+
+class PipelineStopped(Exception):
+    """流水线因其他阶段出错而停止，下游阶段收到后不再做收尾写入"""
+
+
+class _Channel:
+    """两个阶段之间的有界队列，满了上游就阻塞（背压），出错时整条流水线一起停下"""
+
+    def __init__(self, maxsize: int, stop: threading.Event):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._stop = stop
+
+    def put(self, item: Any):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def __iter__(self) -> Iterator[Any]:
+        while not self._stop.is_set():
+            try:
+                item = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _DONE:
+                return
+            yield item
+        # 被中止而不是正常结束：抛出异常，阶段里迭代之后的代码（如写入最后不满一批的数据）不会执行
+        raise PipelineStopped()
+
+
+def run_pipeline(source: Iterable[Any], stages: list[Stage], queue_size: int = 8) -> Iterator[Any]:
+    """
+    把 source 依次流经 stages，每个阶段一个线程，阶段之间用有界队列连接。
+
+    每个 stage 接收上游的迭代器并产出下游的元素；返回最后一个阶段的输出迭代器。
+    内存里同时存在的元素数量只和 queue_size 有关，与数据总量无关。
+    """
+    stop = threading.Event()
+    errors: list[BaseException] = []
+    channels = [_Channel(queue_size, stop) for _ in range(len(stages) + 1)]
+
+    def _feed():
+        try:
+            for item in source:
+                if stop.is_set():
+                    return
+                channels[0].put(item)
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            channels[0].put(_DONE)
+
+    def _run(stage: Stage, inbox: _Channel, outbox: _Channel):
+        try:
+            for item in stage(iter(inbox)):
+                if stop.is_set():
+                    return
+                outbox.put(item)
+        except PipelineStopped:
+            pass
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            outbox.put(_DONE)
+
+    threads = [threading.Thread(target=_feed, daemon=True)]
+    for i, stage in enumerate(stages):
+        threads.append(threading.Thread(target=_run, args=(stage, channels[i], channels[i + 1]), daemon=True))
+    for thread in threads:
+        thread.start()
+
+    try:
+        yield from channels[-1]
+    except PipelineStopped:
+        pass
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    if errors:
+        raise errors[0]
+
+
+# ---------------- 常用阶段 ----------------
+def load_stage(loader: Callable[[str], Iterable[Document]]) -> Stage:
+    """文件路径 -> Document"""
+    def _stage(paths: Iterator[str]) -> Iterator[Document]:
+        for path in paths:
+            yield from loader(path)
+    return _stage
+
+
+def split_stage(text_splitter: TextSplitter) -> Stage:
+    """Document -> chunk"""
+    def _stage(docs: Iterator[Document]) -> Iterator[Document]:
+        for doc in docs:
+            yield from text_splitter.split_documents([doc])
+    return _stage
+
+
+def batch_stage(batch_size: int) -> Stage:
+    """把单个元素攒成固定大小的列表"""
+    def _stage(items: Iterator[Any]) -> Iterator[list[Any]]:
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    return _stage
+
+
+def embed_stage(embeddings: Embeddings, batch_size: int = 10, max_workers: int = 4, max_rps: float = None) -> Stage:
+    """list[chunk] -> list[(chunk, vector)]，max_rps 对整个阶段生效，而不是每个批次各自计算"""
+    limiter = RateLimiter(max_rps)
+
+    def _stage(batches: Iterator[list[Document]]) -> Iterator[list[tuple[Document, list[float]]]]:
+        for chunks in batches:
+            vectors = embed_in_batches(
+                [chunk.page_content for chunk in chunks],
+                embeddings,
+                batch_size=batch_size,
+                max_workers=max_workers,
+                verbose=False,
+                limiter=limiter,
+            )
+            yield list(zip(chunks, vectors))
+    return _stage
+
+
+def insert_stage(insert: Callable[[list[dict]], Any], to_row: Callable[[Document, list[float]], dict], insert_batch_size: int) -> Stage:
+    """list[(chunk, vector)] -> 按 insert_batch_size 攒满后写入，产出每次写入的条数"""
+    def _stage(batches: Iterator[list[tuple[Document, list[float]]]]) -> Iterator[int]:
+        rows = []
+        for pairs in batches:
+            for chunk, vector in pairs:
+                rows.append(to_row(chunk, vector))
+                if len(rows) >= insert_batch_size:
+                    insert(rows)
+                    yield len(rows)
+                    rows = []
+        if rows:
+            insert(rows)
+            yield len(rows)
+    return _stage
+
+
+def report(inserted: Iterable[int]) -> int:
+    """消费流水线输出并打印吞吐"""
+    start = time.perf_counter()
+    total = 0
+    for count in inserted:
+        total += count
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed else float("inf")
+    print(f"写入完成: {total} 条, 耗时 {elapsed:.2f}s, {rate:.1f} chunks/s")
+    return total
@@ -0,0 +1,198 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/19 17:30
+@Author  : tianshiyang
+@File    : quantization.py
+"""
+import uuid
+from typing import Iterable, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+VECTOR_TYPES = ("float32", "float16", "binary")
+
+# 检索字段的索引：float 向量用 HNSW + COSINE，二值向量用 BIN_IVF_FLAT + HAMMING
+SEARCH_INDEX = {
+    "float32": {"index_type": "HNSW", "metric_type": "COSINE", "params": {"M": 16, "efConstruction": 200}},
+    "float16": {"index_type": "HNSW", "metric_type": "COSINE", "params": {"M": 16, "efConstruction": 200}},
+    "binary": {"index_type": "BIN_IVF_FLAT", "metric_type": "HAMMING", "params": {"nlist": 128}},
+}
+
+
+def bytes_per_vector(dim: int, vector_type: str) -> int:
+    return {"float32": dim * 4, "float16": dim * 2, "binary": (dim + 7) // 8}[vector_type]
+
+
+def normalize(vectors) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def quantize(vectors, vector_type: str) -> np.ndarray:
+    """float16 直接降精度；binary 按符号取 1 bit，每 8 维打包成 1 字节"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vector_type == "float16":
+        return vectors.astype(np.float16)
+    if vector_type == "binary":
+        return np.packbits(vectors > 0, axis=-1)
+    return vectors
+
+
+def to_field_data(vectors, vector_type: str) -> list:
+    """转换成 pymilvus 写入 / 检索需要的格式：float16 为 np.float16 数组，binary 为 bytes"""
+    quantized = quantize(vectors, vector_type)
+    if vector_type == "float16":
+        return list(quantized)
+    if vector_type == "binary":
+        return [row.tobytes() for row in quantized]
+    return quantized.tolist()
+
+
+def rerank(query, candidates, k: int) -> list[tuple[int, float]]:
+    """用 float32 向量按余弦相似度精排，返回 (候选下标, 相似度)"""
+    if len(candidates) == 0:
+        return []
+    scores = normalize(candidates) @ normalize(query)
+    order = np.argsort(-scores)[:k]
+    return [(int(i), float(scores[i])) for i in order]
+
+
+class QuantizedVectorStore:
+    """
+    低内存的向量存储：检索字段存 float16 / 二值向量，先粗召回 k * rerank_factor 个候选，
+    再用 float32 原始向量精排。原始向量字段和它的 FLAT 索引都开启 mmap，不常驻 query node 内存。
+
+    Args:
+        client: MilvusClient
+        collection_name: 集合名
+        embeddings: Embeddings 实例，可以使用 get_embeddings(dimension=512) 得到降维向量
+        vector_type: 检索字段的类型 float32 / float16 / binary
+        rerank_factor: 粗召回数量是 k 的多少倍
+        keep_full: 是否保存 float32 原始向量用于精排
+        text_field: 文本字段名
+    """
+
+    search_field = "vector"
+    full_field = "vector_full"
+
+    def __init__(
+            self,
+            client,
+            collection_name: str,
+            embeddings: Embeddings,
+            vector_type: str = "float16",
+            rerank_factor: int = 4,
+            keep_full: bool = True,
+            text_field: str = "content",
+    ):
+        if vector_type not in VECTOR_TYPES:
+            raise ValueError(f"vector_type 只支持 {VECTOR_TYPES}")
+        self.client = client
+        self.collection_name = collection_name
+        self.embeddings = embeddings
+        self.vector_type = vector_type
+        self.rerank_factor = rerank_factor
+        # float32 检索字段本身就是原始向量，不需要额外保存
+        self.keep_full = keep_full and vector_type != "float32"
+        self.text_field = text_field
+        # 确认过集合存在后不再每次写入都请求 has_collection
+        self._created = False
+
+    def create(self, dim: int, drop_old: bool = False):
+        from pymilvus import DataType
+
+        if self._created and not drop_old:
+            return
+        if self.client.has_collection(self.collection_name):
+            if not drop_old:
+                self._created = True
+                return
+            self.client.drop_collection(self.collection_name)
+
+        dtype = {
+            "float32": DataType.FLOAT_VECTOR,
+            "float16": DataType.FLOAT16_VECTOR,
+            "binary": DataType.BINARY_VECTOR,
+        }[self.vector_type]
+        schema = self.client.create_schema(auto_id=False, enable_dynamic_field=True)
+        schema.add_field("id", DataType.VARCHAR, max_length=64, is_primary=True)
+        schema.add_field(self.text_field, DataType.VARCHAR, max_length=65535)
+        schema.add_field(self.search_field, dtype, dim=dim)
+        params = self.client.prepare_index_params()
+        params.add_index(self.search_field, **SEARCH_INDEX[self.vector_type])
+        if self.keep_full:
+            # 原始向量只在精排时随检索结果读取，原始数据和索引都 mmap 到磁盘
+            # （Milvus 要求每个向量字段都有索引才能 load，FLAT 索引的数据同样需要单独开启 mmap）
+            schema.add_field(self.full_field, DataType.FLOAT_VECTOR, dim=dim, mmap_enabled=True)
+            params.add_index(self.full_field, index_type="FLAT", metric_type="COSINE", params={"mmap.enabled": "true"})
+        self.client.create_collection(self.collection_name, schema=schema, index_params=params)
+        self._created = True
+
+    def add_texts(self, texts: list[str], metadatas: list[dict] = None, ids: list[str] = None) -> list[str]:
+        texts = list(texts)
+        vectors = normalize(self.embeddings.embed_documents(texts))
+        self.create(vectors.shape[1])
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        metadatas = metadatas or [{} for _ in texts]
+        search_data = to_field_data(vectors, self.vector_type)
+        rows = []
+        for i, text in enumerate(texts):
+            row = {**metadatas[i], "id": ids[i], self.text_field: text, self.search_field: search_data[i]}
+            if self.keep_full:
+                row[self.full_field] = vectors[i].tolist()
+            rows.append(row)
+        self.client.insert(self.collection_name, rows)
+        return ids
+
+    def add_documents(self, documents: Iterable[Document], ids: list[str] = None) -> list[str]:
+        documents = list(documents)
+        return self.add_texts(
+            [doc.page_content for doc in documents],
+            [doc.metadata for doc in documents],
+            ids or [doc.id or str(uuid.uuid4()) for doc in documents],
+        )
+
+    def similarity_search_with_score_by_vector(
+            self,
+            vector: list[float],
+            k: int = 4,
+            expr: Optional[str] = None,
+            param: dict = None,
+    ) -> list[tuple[Document, float]]:
+        """返回 (Document, 余弦相似度)，rerank 后分数越大越相似"""
+        query = normalize(vector)
+        limit = k * self.rerank_factor if self.keep_full else k
+        output_fields = ["*", self.full_field] if self.keep_full else ["*"]
+        hits = self.client.search(
+            self.collection_name,
+            data=to_field_data([query], self.vector_type),
+            anns_field=self.search_field,
+            limit=limit,
+            filter=expr or "",
+            search_params=param or {},
+            output_fields=output_fields,
+        )[0]
+        if not hits:
+            return []
+
+        if not self.keep_full:
+            # float32 检索或没有原始向量时直接使用召回顺序
+            return [(self._to_document(hit), float(hit["distance"])) for hit in hits[:k]]
+        full = np.asarray([hit["entity"][self.full_field] for hit in hits], dtype=np.float32)
+        return [(self._to_document(hits[i]), score) for i, score in rerank(query, full, k)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, expr: Optional[str] = None, **kwargs):
+        return self.similarity_search_with_score_by_vector(self.embeddings.embed_query(query), k, expr, **kwargs)
+
+    def similarity_search(self, query: str, k: int = 4, expr: Optional[str] = None, **kwargs) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, expr, **kwargs)]
+
+    def _to_document(self, hit: dict) -> Document:
+        entity = dict(hit["entity"])
+        for field in ("id", self.search_field, self.full_field):
+            entity.pop(field, None)
+        return Document(page_content=entity.pop(self.text_field, ""), metadata=entity, id=str(hit["id"]))
@@ -0,0 +1,260 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 19:05
+@Author  : tianshiyang
+@File    : query_cache.py
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+import numpy as np
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict, Field
+
+
+def normalize_query(query: str) -> str:
+    """去掉首尾空白和结尾标点、合并空白、转小写，"什么是RAG？" 和 "什么是rag" 视为同一个问题"""
+    query = re.sub(r"\s+", " ", query.strip().lower())
+    return query.rstrip("?？!！.。")
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _copy(result):
+    # 返回副本，调用方修改 metadata 不会污染缓存
+    if isinstance(result, Document):
+        return Document(page_content=result.page_content, metadata=dict(result.metadata), id=result.id)
+    if isinstance(result, tuple):
+        return tuple(_copy(item) for item in result)
+    if isinstance(result, list):
+        return [_copy(item) for item in result]
+    return result
+
+
+class QueryCache:
+    """
+    检索结果缓存，key 为 (collection, 规范化后的 query, 其余检索参数)。
+
+    Args:
+        ttl: 缓存有效期（秒）
+        max_entries: 最多缓存的条数，超出按 LRU 淘汰
+        similarity_threshold: 设置后开启近似匹配，query 向量余弦相似度不低于该值即视为命中
+    """
+
+    def __init__(self, ttl: float = 300, max_entries: int = 2048, similarity_threshold: Optional[float] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        # (collection, 检索参数) -> [(单位化的 query 向量, key)]
+        self._vectors: dict[tuple, list[tuple[np.ndarray, tuple]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(collection: str, query: str, params: dict) -> tuple:
+        return collection, normalize_query(query), _freeze(params)
+
+    def _alive(self, key: tuple) -> bool:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return False
+        return True
+
+    def get(self, collection: str, query: str, params: dict, vector: list[float] = None):
+        key = self.make_key(collection, query, params)
+        with self._lock:
+            if self._alive(key):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _copy(self._entries[key][1])
+
+            if vector is not None and self.similarity_threshold is not None:
+                candidates = self._vectors.get((collection, key[2]), [])
+                # 清理已过期的向量
+                candidates[:] = [(v, k) for v, k in candidates if self._alive(k)]
+                if candidates:
+                    query_vector = np.asarray(vector, dtype=np.float32)
+                    query_vector /= np.linalg.norm(query_vector) or 1.0
+                    scores = np.stack([v for v, _ in candidates]) @ query_vector
+                    best = int(np.argmax(scores))
+                    if scores[best] >= self.similarity_threshold:
+                        matched = candidates[best][1]
+                        self._entries.move_to_end(matched)
+                        self.hits += 1
+                        self.semantic_hits += 1
+                        return _copy(self._entries[matched][1])
+
+            self.misses += 1
+            return None
+
+    def set(self, collection: str, query: str, params: dict, result, vector: list[float] = None):
+        key = self.make_key(collection, query, params)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, _copy(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if vector is not None and self.similarity_threshold is not None:
+                unit = np.asarray(vector, dtype=np.float32)
+                unit /= np.linalg.norm(unit) or 1.0
+                self._vectors.setdefault((collection, key[2]), []).append((unit, key))
+
+    def invalidate(self, collection: str):
+        """collection 有写入或删除时调用，清掉该 collection 的全部缓存"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == collection]:
+                del self._entries[key]
+            for key in [key for key in self._vectors if key[0] == collection]:
+                del self._vectors[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+# 进程内默认缓存
+query_cache = QueryCache()
+
+
+def invalidate(collection: str):
+    query_cache.invalidate(collection)
+
+
+class CachedVectorStore:
+    """
+    在 Milvus store 外包一层检索缓存：similarity_search / similarity_search_with_score / as_retriever 走缓存，
+    add_documents / add_texts / upsert / delete 会让该 collection 的缓存失效，其余属性原样转发。
+
+    Args:
+        store: Milvus store
+        cache: 使用的缓存，默认进程内共享的 query_cache
+    """
+
+    def __init__(self, store, cache: QueryCache = None):
+        self.store = store
+        self.cache = cache or query_cache
+
+    def __getattr__(self, name: str):
+        return getattr(self.store, name)
+
+    def _query_vector(self, query: str):
+        # 只有开启近似匹配时才需要 query 向量（embeddings 自带缓存，重复问题不会再请求模型）
+        if self.cache.similarity_threshold is None:
+            return None
+        return self.store._as_list(self.store.embedding_func)[0].embed_query(query)
+
+    def _cached(self, method: str, query: str, params: dict, search):
+        vector = self._query_vector(query)
+        params = {"method": method, **params}
+        result = self.cache.get(self.store.collection_name, query, params, vector)
+        if result is None:
+            result = search()
+            self.cache.set(self.store.collection_name, query, params, result, vector)
+        return result
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs) -> list[Document]:
+        return self._cached(
+            "similarity", query, {"k": k, **kwargs},
+            lambda: self.store.similarity_search(query, k=k, **kwargs),
+        )
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs) -> list[tuple[Document, float]]:
+        return self._cached(
+            "similarity_with_score", query, {"k": k, **kwargs},
+            lambda: self.store.similarity_search_with_score(query, k=k, **kwargs),
+        )
+
+    def as_retriever(self, search_type: str = "similarity", search_kwargs: dict = None, **kwargs) -> "CachedRetriever":
+        return CachedRetriever(store=self, search_type=search_type, search_kwargs=search_kwargs or {}, **kwargs)
+
+    # ---------------- 写操作，先写再失效 ----------------
+    def add_documents(self, *args, **kwargs):
+        try:
+            return self.store.add_documents(*args, **kwargs)
+        finally:
+            self.cache.invalidate(self.store.collection_name)
+
+    def add_texts(self, *args, **kwargs):
+        try:
+            return self.store.add_texts(*args, **kwargs)
+        finally:
+            self.cache.invalidate(self.store.collection_name)
+
+    def upsert(self, *args, **kwargs):
+        try:
+            return self.store.upsert(*args, **kwargs)
+        finally:
+            self.cache.invalidate(self.store.collection_name)
+
+    def delete(self, *args, **kwargs):
+        try:
+            return self.store.delete(*args, **kwargs)
+        finally:
+            self.cache.invalidate(self.store.collection_name)
+
+
+class CachedRetriever(BaseRetriever):
+    """CachedVectorStore.as_retriever 返回的检索器，search_type / search_kwargs 与 VectorStoreRetriever 一致"""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    store: Any
+    search_type: str = "similarity"
+    search_kwargs: dict = Field(default_factory=dict)
+
+    def _search_kwargs(self, kwargs: dict) -> dict:
+        return {**self.search_kwargs, **kwargs}
+
+    def _get_relevant_documents(
+            self, query: str, *, run_manager: CallbackManagerForRetrieverRun, **kwargs: Any
+    ) -> list[Document]:
+        search_kwargs = self._search_kwargs(kwargs)
+        return self.store._cached(
+            self.search_type, query, search_kwargs,
+            lambda: self.store.store.as_retriever(
+                search_type=self.search_type, search_kwargs=search_kwargs
+            ).invoke(query),
+        )
+
+    async def _aget_relevant_documents(
+            self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun, **kwargs: Any
+    ) -> list[Document]:
+        search_kwargs = self._search_kwargs(kwargs)
+        params = {"method": self.search_type, **search_kwargs}
+        collection = self.store.store.collection_name
+        vector = None
+        if self.store.cache.similarity_threshold is not None:
+            embedding = self.store.store._as_list(self.store.store.embedding_func)[0]
+            vector = await embedding.aembed_query(query)
+        result = self.store.cache.get(collection, query, params, vector)
+        if result is None:
+            result = await self.store.store.as_retriever(
+                search_type=self.search_type, search_kwargs=search_kwargs
+            ).ainvoke(query)
+            self.store.cache.set(collection, query, params, result, vector)
+        return result
@@ -5,6 +5,7 @@
 @Author  : tianshiyang
 @File    : rag.py
 """
+import asyncio
 import uuid
 
 import bs4
@@ -13,12 +14,16 @@ from langchain_community.document_loaders import WebBaseLoader
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import PromptTemplate
 from langchain_core.runnables import RunnablePassthrough, RunnableLambda, ConfigurableField
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_milvus import Milvus
 
 from milvus import CONNECTION_ARGS
-from provider import chatGptLLM
-from utils import embeddings
+from milvus.async_retrieval import AsyncMilvusRetriever
+from milvus.bulk_import import bulk_insert_documents
+from milvus.query_cache import CachedVectorStore, invalidate
+from milvus.registry import get_store
+from milvus.streaming import astream_rag, get_stream_metrics
+from provider import chatGptLLM, CachedChatModel
+from utils import embeddings, TokenAwareSplitter
 
 
 # 1. 准备数据
@@ -36,7 +41,7 @@ def prepare_data() -> list[Document]:
 
     loader_documents = loader.load()
 
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=200)
+    text_splitter = TokenAwareSplitter(chunk_size=512, chunk_overlap=64)
 
     chunks = text_splitter.split_documents(loader_documents)
 
@@ -46,23 +51,25 @@ def insert_data(chunks: list[Document]):
     def _insert_data(doc: Document):
         doc.metadata['content'] = doc.page_content
         return doc
-    Milvus.from_documents(
+    get_vector_store().add_documents(
         documents=list(map(_insert_data, chunks)),
         ids=[str(uuid.uuid4()) for _ in range(len(chunks))],
-        embedding=embeddings,
-        connection_args=CONNECTION_ARGS,
-        collection_name="milvus_rag",
-        primary_field="id",
     )
 
+def bulk_insert_data(chunks: list[Document]):
+    """首次灌入大量数据时使用：写 Parquet/NumPy 文件后 bulk import，导入完成后再建索引"""
+    timings = bulk_insert_documents("milvus_rag", chunks, embeddings, connection_args=CONNECTION_ARGS)
+    invalidate("milvus_rag")
+    return timings
+
+# 检索结果带缓存，重复的问题不会再次向量化和检索
 def get_vector_store() -> Milvus:
-    return Milvus(
+    return CachedVectorStore(get_store(
+        "milvus_rag",
         connection_args=CONNECTION_ARGS,
-        collection_name="milvus_rag",
-        embedding_function=embeddings,
         primary_field="id",
         text_field="content"
-    )
+    ))
 
 def similarity_search(vector: Milvus):
     result = vector.similarity_search(
@@ -74,15 +81,7 @@ def similarity_search(vector: Milvus):
 def format_docs(chunks: list[Document]):
     return "\n\n".join(chunk.page_content for chunk in chunks)
 
-if __name__ == "__main__":
-    # documents = prepare_data()
-    # insert_data(documents)
-    # 获取向量数据库
-    vector_store = get_vector_store()
-    # search_result = similarity_search(vector_store)
-
-    llm = chatGptLLM
-    PROMPT_TEMPLATE = """
+PROMPT_TEMPLATE = """
     Human: You are an AI assistant, and provides answers to questions by using fact based and statistical information when possible.
     Use the following pieces of information to provide a concise answer to the question enclosed in <question> tags.
     If you don't know the answer, just say that you don't know, don't try to make up an answer.
@@ -97,11 +96,60 @@ if __name__ == "__main__":
     The response should be specific and use statistics or numbers when possible.
 
     Assistant:"""
-    prompt = PromptTemplate(
+
+def get_prompt() -> PromptTemplate:
+    return PromptTemplate(
         template=PROMPT_TEMPLATE,
         input_variables=["context", "question"]
     )
 
+# 相同的 question + context 直接使用缓存的回答，stream 时按 chunk 回放
+def build_chain(retriever, llm=None):
+    return ({
+        "context": retriever | format_docs,
+        "question": RunnablePassthrough()
+    } | get_prompt() | CachedChatModel(llm or chatGptLLM) | StrOutputParser())
+
+# 异步 retriever：ainvoke / astream 时向量化和 Milvus 检索都不占用线程
+def get_async_retriever(expr: str = None, k: int = 1) -> AsyncMilvusRetriever:
+    return AsyncMilvusRetriever(store=get_vector_store(), expr=expr, k=k)
+
+async def ask_concurrently(questions: list[str]) -> list[str]:
+    """一个事件循环并发处理多个问题"""
+    chain = build_chain(get_async_retriever(
+        expr="source == 'https://lilianweng.github.io/posts/2023-06-23-agent/'",
+    ))
+    return await asyncio.gather(*(chain.ainvoke(question) for question in questions))
+
+async def stream_answer(question: str, expr: str = None, k: int = 1, llm=None):
+    """流式问答：先返回来源，再逐个返回 token，最后返回本次的 TTFT 等耗时"""
+    async for event in astream_rag(
+            question,
+            get_async_retriever(expr=expr, k=k),
+            CachedChatModel(llm or chatGptLLM),
+            get_prompt(),
+            format_docs,
+    ):
+        yield event
+
+async def print_stream_answer(question: str):
+    async for event in stream_answer(question, expr="source == 'https://lilianweng.github.io/posts/2023-06-23-agent/'"):
+        if event["event"] == "sources":
+            print("来源:", [doc.metadata.get("source") for doc, _ in event["data"]])
+        elif event["event"] == "token":
+            print(event["data"], end="", flush=True)
+        else:
+            print(f"\n耗时: {event['data']}")
+    print(get_stream_metrics().stats())
+
+if __name__ == "__main__":
+    # documents = prepare_data()
+    # insert_data(documents)
+    # bulk_insert_data(documents)
+    # 获取向量数据库
+    vector_store = get_vector_store()
+    # search_result = similarity_search(vector_store)
+
     # 带搜索条件的retriever
     retriever = vector_store.as_retriever().configurable_fields(
         search_kwargs=ConfigurableField(
@@ -117,11 +165,13 @@ if __name__ == "__main__":
         }
     )
 
-    chain = ({
-        "context": retriever | format_docs,
-        "question": RunnablePassthrough()
-    } | prompt | llm | StrOutputParser())
-
+    chain = build_chain(retriever)
 
     res = chain.invoke("What is self-reflection of an AI Agent??")
     print(res)
+
+    # 异步并发
+    # answers = asyncio.run(ask_concurrently(["What is self-reflection of an AI Agent?"] * 100))
+
+    # 流式输出，统计首 token 延迟
+    # asyncio.run(print_stream_answer("What is self-reflection of an AI Agent?"))
@@ -0,0 +1,99 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 16:05
+@Author  : tianshiyang
+@File    : registry.py
+"""
+import threading
+from collections import defaultdict
+from enum import Enum
+
+from milvus.config import CONNECTION_ARGS
+
+_stores = {}
+_metrics = defaultdict(lambda: {"connects": 0, "reuses": 0})
+_lock = threading.Lock()
+
+
+def _freeze(value, depth: int = 0):
+    """把构造参数转换成可哈希的 key，内容相同的参数得到相同的 key"""
+    if value is None or isinstance(value, (str, int, float, bool, bytes)):
+        return value
+    if isinstance(value, Enum):
+        return f"{type(value).__qualname__}.{value.name}"
+    if isinstance(value, type):
+        return value.__qualname__
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _freeze(v, depth + 1)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v, depth + 1) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v, depth + 1) for v in value)
+    # BM25BuiltInFunction 之类每次都会新建的对象，按属性比较
+    if hasattr(value, "__dict__") and depth < 4:
+        return type(value).__qualname__, _freeze(vars(value), depth + 1)
+    return repr(value)
+
+
+def get_store(collection_name: str, connection_args: dict = None, **options):
+    """
+    进程内共享的 Milvus store，相同 (connection_args, collection_name, 其余构造参数) 只创建一次。
+    connection_args 的 uri 为 local://path 时返回 LocalVectorStore。
+    没有副作用：不会建集合、建索引或 release / load 集合，这些由 schema.migrate_collection 显式执行。
+
+    Milvus store 内部的 MilvusClient 是线程安全的，可以被多个线程同时使用。
+
+    Args:
+        collection_name: collection 名称
+        connection_args: 连接参数，默认 CONNECTION_ARGS
+        options: 其余传给 Milvus 的参数，如 index_params / vector_field / builtin_function
+    """
+    connection_args = connection_args or CONNECTION_ARGS
+    embedding_function = options.pop("embedding_function", None)
+    if embedding_function is None:
+        from utils import get_embeddings
+        embedding_function = get_embeddings()
+
+    key = (_freeze(connection_args), collection_name, _freeze(options), id(embedding_function))
+    with _lock:
+        store = _stores.get(key)
+        if store is not None:
+            _metrics[collection_name]["reuses"] += 1
+            return store
+
+        from milvus.local_store import from_milvus_options, is_local_uri
+
+        if is_local_uri(connection_args.get("uri")):
+            # uri 为 local://path 时使用进程内向量库，不需要 Milvus 服务
+            store = from_milvus_options(collection_name, connection_args["uri"], embedding_function, **options)
+        else:
+            from langchain_milvus import Milvus
+
+            # 只连接，不建集合也不建索引；声明了过滤字段的集合需要先执行 schema.migrate_collection
+            store = Milvus(
+                embedding_function=embedding_function,
+                connection_args=connection_args,
+                collection_name=collection_name,
+                **options,
+            )
+        _stores[key] = store
+        _metrics[collection_name]["connects"] += 1
+        return store
+
+
+def store_metrics() -> dict:
+    """每个 collection 的连接创建次数和复用次数，稳定运行后 connects 不应再增长"""
+    with _lock:
+        return {name: dict(metric) for name, metric in _metrics.items()}
+
+
+def clear_stores(collection_name: str = None):
+    """清空缓存的 store；指定 collection_name 时只清除该集合的，下次 get_store 重新连接"""
+    with _lock:
+        if collection_name is None:
+            _stores.clear()
+            _metrics.clear()
+            return
+        for key in [key for key in _stores if key[1] == collection_name]:
+            del _stores[key]
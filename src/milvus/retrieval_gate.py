@@ -0,0 +1,139 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/19 22:40
+@Author  : tianshiyang
+@File    : retrieval_gate.py
+"""
+import asyncio
+import re
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional, Sequence
+
+from langchain_core.documents import Document
+from langchain_core.messages import BaseMessage
+
+from milvus.query_cache import normalize_query
+
+# 问候、致谢、确认之类的消息不需要检索
+_SMALL_TALK = re.compile(
+    r"^(hi|hello|hey|thanks?( you)?|thx|ok(ay)?|bye|good (morning|afternoon|evening|night)|"
+    r"你好|您好|嗨|哈喽|在吗|谢谢|多谢|感谢|好的|好|嗯|收到|明白了?|再见|拜拜|早上好|晚上好)[\s,，~～!！.。?？]*$",
+    re.IGNORECASE,
+)
+
+# 需要检索
+SEARCH = "search"
+# 最后一条不是新的用户消息（如工具调用之后的再次调用模型），沿用本轮的检索结果
+NOT_HUMAN = "not_human"
+# 与上一个问题相同，沿用上次的检索结果
+REPEATED = "repeated"
+# 分类器判断不需要检索
+NO_RETRIEVAL = "no_retrieval"
+
+
+def needs_retrieval(query: str) -> bool:
+    """本地规则分类：空消息、纯标点和寒暄不需要检索"""
+    query = query.strip()
+    if not re.search(r"\w", query):
+        return False
+    return not _SMALL_TALK.match(query)
+
+
+class RetrievalGate:
+    """
+    决定每次调用模型前是否需要检索，按会话记录上一次的问题和检索结果，并统计省掉的检索次数。
+
+    Args:
+        search: 同步检索函数 query -> list[Document]
+        asearch: 异步检索函数，默认在线程中执行 search
+        classifier: 判断 query 是否需要检索
+        max_conversations: 最多保留的会话数，超出按最久未使用淘汰
+    """
+
+    def __init__(
+            self,
+            search: Callable[[str], list[Document]],
+            asearch: Optional[Callable[[str], Awaitable[list[Document]]]] = None,
+            classifier: Callable[[str], bool] = needs_retrieval,
+            max_conversations: int = 1024,
+    ):
+        self.search = search
+        self.asearch = asearch
+        self.classifier = classifier
+        self.max_conversations = max_conversations
+        self._conversations: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _state(self, conversation_id: str) -> dict:
+        """调用方需持有 _lock"""
+        state = self._conversations.get(conversation_id)
+        if state is None:
+            state = {
+                "query": None,
+                "documents": [],
+                "counters": {"calls": 0, SEARCH: 0, NOT_HUMAN: 0, REPEATED: 0, NO_RETRIEVAL: 0},
+            }
+            self._conversations[conversation_id] = state
+            while len(self._conversations) > self.max_conversations:
+                self._conversations.popitem(last=False)
+        self._conversations.move_to_end(conversation_id)
+        return state
+
+    def decide(self, conversation_id: str, messages: Sequence[BaseMessage]) -> tuple[str, str]:
+        """返回 (决策, query)，同时更新计数"""
+        last = messages[-1] if messages else None
+        query = last.text if last is not None else ""
+        with self._lock:
+            state = self._state(conversation_id)
+            if last is None or last.type != "human":
+                decision = NOT_HUMAN
+            elif state["query"] is not None and normalize_query(query) == state["query"]:
+                decision = REPEATED
+            elif not self.classifier(query):
+                decision = NO_RETRIEVAL
+            else:
+                decision = SEARCH
+            state["counters"]["calls"] += 1
+            state["counters"][decision] += 1
+        return decision, query
+
+    def _remember(self, conversation_id: str, decision: str, query: str, documents: list[Document]) -> list[Document]:
+        with self._lock:
+            state = self._state(conversation_id)
+            if decision == SEARCH:
+                state["query"], state["documents"] = normalize_query(query), documents
+            elif decision == NO_RETRIEVAL:
+                # 寒暄之后的工具调用也不带上一轮的上下文
+                state["query"], state["documents"] = None, []
+            return state["documents"]
+
+    def retrieve(self, conversation_id: str, messages: Sequence[BaseMessage]) -> list[Document]:
+        decision, query = self.decide(conversation_id, messages)
+        documents = self.search(query) if decision == SEARCH else []
+        return self._remember(conversation_id, decision, query, documents)
+
+    async def aretrieve(self, conversation_id: str, messages: Sequence[BaseMessage]) -> list[Document]:
+        decision, query = self.decide(conversation_id, messages)
+        documents = []
+        if decision == SEARCH:
+            if self.asearch is not None:
+                documents = await self.asearch(query)
+            else:
+                documents = await asyncio.to_thread(self.search, query)
+        return self._remember(conversation_id, decision, query, documents)
+
+    def stats(self, conversation_id: str = None) -> dict:
+        """单个会话或全部会话的计数，avoided 为省掉的检索次数"""
+        with self._lock:
+            if conversation_id is not None:
+                states = [self._conversations[conversation_id]] if conversation_id in self._conversations else []
+            else:
+                states = list(self._conversations.values())
+            totals = {"calls": 0, SEARCH: 0, NOT_HUMAN: 0, REPEATED: 0, NO_RETRIEVAL: 0}
+            for state in states:
+                for name, value in state["counters"].items():
+                    totals[name] += value
+            totals["avoided"] = totals["calls"] - totals[SEARCH]
+            return totals
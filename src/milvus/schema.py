@@ -0,0 +1,217 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/19 16:20
+@Author  : tianshiyang
+@File    : schema.py
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+# 没有指定 index_type 时按类型选择标量索引：字符串用 INVERTED（==、in、前缀 like），整数用 STL_SORT（范围查询）
+DEFAULT_SCALAR_INDEX = {
+    "VARCHAR": "INVERTED",
+    "INT64": "STL_SORT",
+    "INT32": "STL_SORT",
+    "DOUBLE": "STL_SORT",
+    "BOOL": "INVERTED",
+}
+
+
+@dataclass
+class FilterField:
+    """
+    expr 中会用到的过滤字段，建集合时声明为有类型的标量字段并自动建标量索引。
+
+    Args:
+        name: 字段名，与 Document.metadata 的 key 一致
+        dtype: Milvus 数据类型名，如 VARCHAR / INT64
+        max_length: VARCHAR 的最大长度
+        index_type: 标量索引类型（INVERTED / Trie / STL_SORT），None 按 dtype 选择
+    """
+    name: str
+    dtype: str = "VARCHAR"
+    max_length: int = 512
+    index_type: Optional[str] = None
+
+    @property
+    def scalar_index(self) -> str:
+        return self.index_type or DEFAULT_SCALAR_INDEX[self.dtype]
+
+
+# 各 collection 的过滤字段声明
+COLLECTION_SCHEMAS = {
+    "books": [
+        FilterField("book_id", max_length=64),
+        # book_name 主要是 == 和前缀 like，用 Trie
+        FilterField("book_name", max_length=256, index_type="Trie"),
+        FilterField("source", max_length=1024),
+        FilterField("page_no", "INT64"),
+        FilterField("chunk_id", max_length=64),
+    ],
+    "financial_report": [
+        FilterField("source", max_length=1024),
+        FilterField("page_no", "INT64"),
+        FilterField("chunk_id", max_length=64),
+    ],
+    "milvus_rag": [
+        FilterField("source", max_length=1024),
+        FilterField("chunk_id", max_length=64),
+    ],
+}
+
+
+def get_filter_fields(collection_name: str) -> list[FilterField]:
+    return COLLECTION_SCHEMAS.get(collection_name, [])
+
+
+def create_collection(
+        client,
+        collection_name: str,
+        dim: int,
+        fields: list[FilterField],
+        primary_field: str = "pk",
+        text_field: str = "text",
+        vector_field: str = "vector",
+        index_params: dict = None,
+        auto_id: bool = False,
+        with_index: bool = True,
+):
+    """
+    按声明创建集合：主键 / 文本 / 向量 + 有类型的过滤字段（可为空），其余 metadata 进入动态字段。
+    向量索引和过滤字段的标量索引一起创建。
+
+    Args:
+        client: MilvusClient
+        collection_name: 集合名
+        dim: 向量维度
+        fields: 过滤字段声明
+        primary_field: 主键字段名，与 Milvus store 的 primary_field 一致
+        text_field: 文本字段名，与 Milvus store 的 text_field 一致
+        vector_field: 向量字段名
+        index_params: 向量索引参数，默认 AUTOINDEX / L2（与 langchain Milvus 一致）
+        auto_id: 主键是否自动生成
+        with_index: False 时只建集合不建索引，用于 bulk import 导入完成后再建
+    """
+    from pymilvus import DataType
+
+    schema = client.create_schema(auto_id=auto_id, enable_dynamic_field=True)
+    if auto_id:
+        schema.add_field(primary_field, DataType.INT64, is_primary=True)
+    else:
+        schema.add_field(primary_field, DataType.VARCHAR, max_length=65535, is_primary=True)
+    schema.add_field(text_field, DataType.VARCHAR, max_length=65535)
+    schema.add_field(vector_field, DataType.FLOAT_VECTOR, dim=dim)
+    for spec in fields:
+        kwargs = {"max_length": spec.max_length} if spec.dtype == "VARCHAR" else {}
+        schema.add_field(spec.name, getattr(DataType, spec.dtype), nullable=True, **kwargs)
+
+    if not with_index:
+        client.create_collection(collection_name, schema=schema)
+        return
+    client.create_collection(
+        collection_name,
+        schema=schema,
+        index_params=prepare_index_params(client, fields, vector_field, index_params),
+    )
+
+
+def prepare_index_params(client, fields: list[FilterField], vector_field: str = "vector", index_params: dict = None):
+    """向量索引 + 过滤字段的标量索引"""
+    params = client.prepare_index_params()
+    params.add_index(vector_field, **(index_params or {"index_type": "AUTOINDEX", "metric_type": "L2"}))
+    for spec in fields:
+        params.add_index(spec.name, index_type=spec.scalar_index, index_name=f"{spec.name}_idx")
+    return params
+
+
+def ensure_scalar_indexes(client, collection_name: str, fields: list[FilterField]) -> list[str]:
+    """
+    给已有集合中缺少索引的过滤字段补建标量索引，返回新建索引的字段。
+    过滤字段在动态字段（$meta）中时无法建索引，只打印提示，需要按声明重建集合。
+    """
+    if not fields or not client.has_collection(collection_name):
+        return []
+    described = {field["name"]: field for field in client.describe_collection(collection_name)["fields"]}
+    indexed = {client.describe_index(collection_name, name).get("field_name") for name in client.list_indexes(collection_name)}
+
+    params = client.prepare_index_params()
+    created = []
+    for spec in fields:
+        if spec.name in indexed:
+            continue
+        if spec.name not in described:
+            print(f"{collection_name}.{spec.name} 不是有类型的字段（在动态字段中），无法建标量索引")
+            continue
+        params.add_index(spec.name, index_type=spec.scalar_index, index_name=f"{spec.name}_idx")
+        created.append(spec.name)
+    if created:
+        # 已 load 的集合先 release，建完索引再 load
+        client.release_collection(collection_name)
+        client.create_index(collection_name, params)
+        client.load_collection(collection_name)
+    return created
+
+
+def prepare_collection(client, collection_name: str, embedding_function, options: dict) -> list[str]:
+    """
+    集合不存在时按声明建集合，已存在时补建标量索引。
+    没有声明过滤字段的集合不做任何处理，仍由 langchain Milvus 按第一批数据推断字段。
+    """
+    fields = get_filter_fields(collection_name)
+    if not fields or options.get("drop_old") or options.get("builtin_function"):
+        return []
+    if client.has_collection(collection_name):
+        return ensure_scalar_indexes(client, collection_name, fields)
+
+    create_collection(
+        client,
+        collection_name,
+        dim=len(embedding_function.embed_query("dimension")),
+        fields=fields,
+        primary_field=options.get("primary_field", "pk"),
+        text_field=options.get("text_field", "text"),
+        vector_field=options.get("vector_field", "vector"),
+        index_params=options.get("index_params"),
+        auto_id=options.get("auto_id", False),
+    )
+    return [spec.name for spec in fields]
+
+
+def migrate_collection(collection_name: str, connection_args: dict = None, embedding_function=None, **options) -> list[str]:
+    """
+    管理操作：按 COLLECTION_SCHEMAS 建集合或补建标量索引，返回新建索引的字段。
+    补建索引会 release / load 集合，期间集合不可查询，应在发布或维护窗口单独执行，而不是在请求路径上。
+
+    Args:
+        collection_name: 集合名
+        connection_args: 连接参数，默认 CONNECTION_ARGS
+        embedding_function: 建集合时用于确定向量维度，默认 get_embeddings()
+        options: 与 get_store 相同的构造参数（primary_field / text_field / vector_field / index_params 等）
+    """
+    from pymilvus import MilvusClient
+
+    from milvus.config import CONNECTION_ARGS
+    from milvus.registry import clear_stores
+
+    if embedding_function is None:
+        from utils import get_embeddings
+        embedding_function = get_embeddings()
+    client = MilvusClient(**{k: v for k, v in (connection_args or CONNECTION_ARGS).items() if v})
+    try:
+        created = prepare_collection(client, collection_name, embedding_function, options)
+    finally:
+        client.close()
+    # 之前创建的 store 可能还认为集合不存在，下次 get_store 重新连接
+    clear_stores(collection_name)
+    return created
+
+
+if __name__ == "__main__":
+    # 部署时执行一次：python -m milvus.schema
+    # from milvus.books_store import URI
+    # migrate_collection("books", {"uri": URI, "token": "root:Milvus", "db_name": "langchain"}, text_field="content",
+    #                    index_params={"index_type": "FLAT", "metric_type": "L2"})
+    # migrate_collection("financial_report", primary_field="id", text_field="content")
+    # migrate_collection("milvus_rag", primary_field="id", text_field="content")
+    pass
@@ -0,0 +1,129 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/19 22:10
+@Author  : tianshiyang
+@File    : streaming.py
+"""
+import asyncio
+import threading
+import time
+from typing import AsyncIterator, Callable, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.prompts import BasePromptTemplate
+
+from milvus.async_retrieval import AsyncMilvusRetriever
+
+
+class StreamMetrics:
+    """
+    流式问答的延迟统计：首 token 延迟（TTFT）、检索耗时、总耗时，单位秒。
+
+    Args:
+        max_samples: 最多保留的最近样本数
+    """
+
+    def __init__(self, max_samples: int = 10000):
+        self.max_samples = max_samples
+        self._samples: dict[str, list[float]] = {"ttft": [], "retrieval": [], "total": []}
+        self._lock = threading.Lock()
+
+    def record(self, **values: float):
+        with self._lock:
+            for name, value in values.items():
+                samples = self._samples.setdefault(name, [])
+                samples.append(value)
+                if len(samples) > self.max_samples:
+                    del samples[:len(samples) - self.max_samples]
+
+    def stats(self) -> dict:
+        with self._lock:
+            result = {"requests": len(self._samples["total"])}
+            for name, samples in self._samples.items():
+                if samples:
+                    p50, p95 = np.percentile(samples, [50, 95])
+                    result[f"{name}_p50"] = float(p50)
+                    result[f"{name}_p95"] = float(p95)
+            return result
+
+
+_metrics = None
+_lock = threading.Lock()
+
+
+def get_stream_metrics() -> StreamMetrics:
+    """进程内共享的流式延迟统计"""
+    global _metrics
+    with _lock:
+        if _metrics is None:
+            _metrics = StreamMetrics()
+        return _metrics
+
+
+async def _search_by_vector(retriever: AsyncMilvusRetriever, vector: list[float]) -> list[tuple[Document, float]]:
+    if hasattr(retriever.store, "aclient"):
+        return await retriever.asearch_by_vector(vector, k=retriever.k, expr=retriever.expr)
+    # LocalVectorStore 没有异步检索，放到线程里执行
+    return await asyncio.to_thread(
+        retriever.store.similarity_search_with_score_by_vector, vector, k=retriever.k, expr=retriever.expr
+    )
+
+
+async def astream_rag(
+        question: str,
+        retriever: AsyncMilvusRetriever,
+        llm,
+        prompt: BasePromptTemplate,
+        format_docs: Callable[[list[Document]], str],
+        metrics: Optional[StreamMetrics] = None,
+) -> AsyncIterator[dict]:
+    """
+    流式 RAG：请求到达立即开始向量化，检索完成后先返回来源，再逐个返回模型输出的 token。
+
+    依次产出的事件：
+        {"event": "sources", "data": [(Document, score), ...]}
+        {"event": "token", "data": str}            多次
+        {"event": "end", "data": {"ttft": ..., "retrieval": ..., "total": ...}}
+
+    Args:
+        question: 问题
+        retriever: 异步检索器，提供 store / k / expr
+        llm: 支持 astream 的 chat model（如 CachedChatModel）
+        prompt: 输入变量为 context / question 的 prompt
+        format_docs: 把检索到的文档拼成 context
+        metrics: 延迟统计，默认 get_stream_metrics()
+    """
+    start = time.perf_counter()
+    # 请求到达后第一件事就是发出向量化请求
+    embedding = retriever.store.embeddings
+    if isinstance(embedding, list):
+        embedding = embedding[0]
+    embed_task = asyncio.create_task(embedding.aembed_query(question))
+    metrics = metrics or get_stream_metrics()
+    try:
+        # 让向量化请求先发出，等待响应期间建立 Milvus 异步连接
+        await asyncio.sleep(0)
+        await retriever.warm_up()
+        vector = await embed_task
+    finally:
+        # 连接失败时不再等待向量化结果
+        embed_task.cancel()
+    pairs = await _search_by_vector(retriever, vector)
+    retrieval = time.perf_counter() - start
+    yield {"event": "sources", "data": pairs}
+
+    prompt_value = prompt.invoke({"context": format_docs([doc for doc, _ in pairs]), "question": question})
+    ttft = None
+    async for chunk in llm.astream(prompt_value):
+        if not chunk.text:
+            continue
+        if ttft is None:
+            ttft = time.perf_counter() - start
+        yield {"event": "token", "data": chunk.text}
+
+    timings = {"ttft": ttft if ttft is not None else time.perf_counter() - start, "retrieval": retrieval,
+               "total": time.perf_counter() - start}
+    metrics.record(**timings)
+    yield {"event": "end", "data": timings}
@@ -0,0 +1,110 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/19 13:20
+@Author  : tianshiyang
+@File    : tenant.py
+"""
+from typing import Optional
+
+from langchain_core.documents import Document
+
+
+def quote(value) -> str:
+    """过滤表达式中的常量：字符串转义引号和反斜杠后加双引号，数字原样输出"""
+    if isinstance(value, bool) or not isinstance(value, (str, int)):
+        raise ValueError(f"不支持的过滤值: {value!r}")
+    if isinstance(value, int):
+        return str(value)
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def tenant_filter(tenant: str, field: str = "namespace") -> str:
+    """生成分区键过滤条件，转义引号和反斜杠，租户名不会破坏表达式"""
+    if not isinstance(tenant, str) or not tenant:
+        raise ValueError("tenant 不能为空")
+    return f"{field} == {quote(tenant)}"
+
+
+def in_filter(field: str, values) -> str:
+    """生成 field in [...] 过滤条件，每个值都经过 quote 转义"""
+    return f"{field} in [{', '.join(quote(value) for value in values)}]"
+
+
+class TenantStore:
+    """
+    按租户隔离的 store，租户是一等参数而不是手写在 expr 里的字符串。
+
+    collection 以 partition_key_field 作为分区键时，Milvus 对 "分区键 == 常量" 的过滤只会扫描该租户
+    哈希到的分区，检索延迟与租户总数无关。
+
+    Args:
+        store: 以 partition_key_field 为分区键创建的 Milvus store（或 LocalVectorStore）
+        partition_key_field: 分区键字段名
+        insert_batch_size: 写入时每批的条数
+    """
+
+    def __init__(self, store, partition_key_field: str = "namespace", insert_batch_size: int = 500):
+        self.store = store
+        self.partition_key_field = partition_key_field
+        self.insert_batch_size = insert_batch_size
+
+    def _expr(self, tenant: str, expr: Optional[str] = None) -> str:
+        scoped = tenant_filter(tenant, self.partition_key_field)
+        return f"{scoped} and ({expr})" if expr else scoped
+
+    # ---------------- 写入 ----------------
+    def add_documents(self, tenant: str, documents: list[Document], ids: Optional[list[str]] = None) -> list[str]:
+        return self.add_documents_by_tenant({tenant: documents}, {tenant: ids} if ids is not None else None)
+
+    def add_documents_by_tenant(
+            self,
+            documents_by_tenant: dict[str, list[Document]],
+            ids_by_tenant: Optional[dict[str, list[str]]] = None,
+    ) -> list[str]:
+        """
+        多个租户的数据合并后按 insert_batch_size 分批写入，分区键由服务端路由。
+        ids_by_tenant 要么不传，要么每个租户都给出与文档数相同的 ids；不修改传入的 Document。
+        """
+        documents, ids = [], []
+        for tenant, tenant_documents in documents_by_tenant.items():
+            tenant_filter(tenant, self.partition_key_field)
+            if ids_by_tenant is not None:
+                tenant_ids = ids_by_tenant.get(tenant)
+                if tenant_ids is None or len(tenant_ids) != len(tenant_documents):
+                    raise ValueError(f"租户 {tenant!r} 的 ids 数量与文档数量不一致")
+                ids.extend(tenant_ids)
+            for doc in tenant_documents:
+                documents.append(doc.model_copy(update={"metadata": {**doc.metadata, self.partition_key_field: tenant}}))
+
+        inserted = []
+        for start in range(0, len(documents), self.insert_batch_size):
+            batch = documents[start:start + self.insert_batch_size]
+            batch_ids = ids[start:start + self.insert_batch_size] if ids else None
+            if batch_ids:
+                inserted.extend(self.store.add_documents(batch, ids=batch_ids))
+            else:
+                inserted.extend(self.store.add_documents(batch))
+        return inserted
+
+    def delete(self, tenant: str, ids: Optional[list[str]] = None, expr: Optional[str] = None):
+        """只删除该租户的数据，传入 ids 时也会附加租户过滤，不会误删其他租户"""
+        if ids:
+            id_expr = in_filter(self.store._primary_field, ids)
+            expr = f"({id_expr}) and ({expr})" if expr else id_expr
+        return self.store.delete(expr=self._expr(tenant, expr))
+
+    # ---------------- 检索 ----------------
+    def similarity_search(self, tenant: str, query: str, k: int = 4, expr: Optional[str] = None, **kwargs) -> list[Document]:
+        return self.store.similarity_search(query, k=k, expr=self._expr(tenant, expr), **kwargs)
+
+    def similarity_search_with_score(
+            self, tenant: str, query: str, k: int = 4, expr: Optional[str] = None, **kwargs
+    ) -> list[tuple[Document, float]]:
+        return self.store.similarity_search_with_score(query, k=k, expr=self._expr(tenant, expr), **kwargs)
+
+    def as_retriever(self, tenant: str, search_type: str = "similarity", search_kwargs: Optional[dict] = None, **kwargs):
+        search_kwargs = dict(search_kwargs or {})
+        search_kwargs["expr"] = self._expr(tenant, search_kwargs.get("expr"))
+        return self.store.as_retriever(search_type=search_type, search_kwargs=search_kwargs, **kwargs)
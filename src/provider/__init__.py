@@ -5,10 +5,32 @@
 @Author  : tianshiyang
 @File    : __init__.py.py
 """
-from .llms import chatGptLLM, qwenLLM, google_gemini
+from . import llms
+from importlib import import_module
+
+from .llms import get_llm
 
 __all__ = [
     "chatGptLLM",
     "qwenLLM",
-    "google_gemini"
-]
\ No newline at end of file
+    "google_gemini",
+    "get_llm",
+    "get_llm_cache",
+    "CachedChatModel",
+    "SQLiteLRUCache",
+]
+
+
+# 缓存相关依赖 langchain_core，第一次访问时才 import
+_LAZY = {
+    "get_llm_cache": ".llm_cache",
+    "CachedChatModel": ".llm_cache",
+    "SQLiteLRUCache": ".llm_cache",
+}
+
+
+# chatGptLLM / qwenLLM / google_gemini 在第一次访问时才创建
+def __getattr__(name: str):
+    if name in _LAZY:
+        return getattr(import_module(_LAZY[name], __name__), name)
+    return getattr(llms, name)
@@ -0,0 +1,236 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 20:15
+@Author  : tianshiyang
+@File    : llm_cache.py
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, AsyncIterator, Iterator, Optional, Sequence
+
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.language_models import BaseChatModel
+from langchain_core.load import dumps, loads
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk
+from langchain_core.runnables import Runnable, RunnableConfig
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "llm_cache.sqlite"
+)
+
+
+# 缓存中只可能是聊天模型的输出，反序列化时只允许这些类，不按缓存内容任意实例化 langchain 对象
+ALLOWED_OBJECTS = [ChatGeneration, ChatGenerationChunk, AIMessage, AIMessageChunk]
+
+
+def _tokens(generations: Sequence) -> Optional[int]:
+    """缓存响应的 token 数，没有任何 usage_metadata 时为 None（未知，而不是 0）"""
+    total = None
+    for generation in generations:
+        usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+        if usage and "total_tokens" in usage:
+            total = (total or 0) + usage["total_tokens"]
+    return total
+
+
+class SQLiteLRUCache(BaseCache):
+    """
+    完整响应缓存：相同模型参数 + 相同 prompt 直接返回上次的结果。
+
+    key 为 llm_string（包含模型名、temperature 等全部调用参数）与渲染后 prompt 的 sha256，
+    超过 max_entries 时按最久未访问淘汰。
+
+    Args:
+        path: SQLite 文件路径
+        max_entries: 最多缓存的响应条数
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = 5000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+        # 命中但响应没有 usage_metadata 的次数，这部分节省的 token 数未知
+        self.hits_without_usage = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache(accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self._key(prompt, llm_string)
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            generations = loads(row[0], allowed_objects=ALLOWED_OBJECTS)
+            self.hits += 1
+            tokens = _tokens(generations)
+            if tokens is None:
+                self.hits_without_usage += 1
+            else:
+                self.tokens_saved += tokens
+            return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = self._key(prompt, llm_string)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, accessed_at) VALUES (?, ?, ?)",
+                (key, dumps(list(return_val)), time.time()),
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN "
+                    "(SELECT key FROM llm_cache ORDER BY accessed_at LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            self._conn.commit()
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                # 所有命中都没有 usage_metadata 时无法统计，返回 None；部分缺失时只统计已知的部分
+                "tokens_saved": self.tokens_saved if self.hits > self.hits_without_usage else None,
+                "hits_without_usage": self.hits_without_usage,
+                "entries": entries,
+            }
+
+
+_llm_cache = None
+_lock = threading.Lock()
+
+
+def get_llm_cache() -> SQLiteLRUCache:
+    """进程内共享的响应缓存"""
+    global _llm_cache
+    with _lock:
+        if _llm_cache is None:
+            _llm_cache = SQLiteLRUCache()
+        return _llm_cache
+
+
+# ---------------- 流式输出的缓存 ----------------
+def _cache_key(llm: BaseChatModel, input: Any, stop: Optional[list[str]] = None, **kwargs: Any) -> tuple[str, str]:
+    """和 BaseChatModel._generate_with_cache 使用相同的 prompt / llm_string，流式和非流式共用缓存"""
+    messages = llm._convert_input(input).to_messages()
+    messages = [msg.model_copy(update={"id": None}) if getattr(msg, "id", None) is not None else msg for msg in messages]
+    return dumps(messages), llm._get_llm_string(stop=stop, **kwargs)
+
+
+def _replay(generations: Sequence) -> Iterator[AIMessageChunk]:
+    """把缓存的完整回答按词切成 chunk 回放"""
+    message = generations[0].message
+    text = message.content if isinstance(message.content, str) else message.text
+    for piece in re.findall(r"\S+\s*|\s+", text):
+        yield AIMessageChunk(content=piece)
+    yield AIMessageChunk(content="", usage_metadata=message.usage_metadata, response_metadata=message.response_metadata)
+
+
+def _to_generations(full: AIMessageChunk) -> list[ChatGeneration]:
+    return [ChatGeneration(message=AIMessage(
+        content=full.content,
+        usage_metadata=full.usage_metadata,
+        response_metadata=full.response_metadata,
+    ))]
+
+
+class CachedChatModel(Runnable):
+    """
+    给 chat model 加上响应缓存的 Runnable，可直接放进 LCEL 链中。
+
+    invoke / ainvoke 命中缓存时直接返回；stream / astream 命中缓存时把缓存的回答按 chunk 回放，
+    未命中时边输出边累积，结束后写入缓存。
+
+    Args:
+        llm: chat model
+        cache: 响应缓存，默认使用 llm 自带的 cache，没有时使用进程内共享的 SQLiteLRUCache
+    """
+
+    def __init__(self, llm: BaseChatModel, cache: BaseCache = None):
+        self.llm = llm
+        self.cache = cache or (llm.cache if isinstance(llm.cache, BaseCache) else get_llm_cache())
+
+    def _native(self) -> bool:
+        # llm 自身已经使用同一个缓存时，invoke 直接交给 llm，避免重复查询
+        return self.cache is self.llm.cache
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> AIMessage:
+        if self._native():
+            return self.llm.invoke(input, config, **kwargs)
+        prompt, llm_string = _cache_key(self.llm, input, **kwargs)
+        cached = self.cache.lookup(prompt, llm_string)
+        if cached:
+            return cached[0].message
+        message = self.llm.invoke(input, config, **kwargs)
+        self.cache.update(prompt, llm_string, [ChatGeneration(message=message)])
+        return message
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> AIMessage:
+        if self._native():
+            return await self.llm.ainvoke(input, config, **kwargs)
+        prompt, llm_string = _cache_key(self.llm, input, **kwargs)
+        cached = await self.cache.alookup(prompt, llm_string)
+        if cached:
+            return cached[0].message
+        message = await self.llm.ainvoke(input, config, **kwargs)
+        await self.cache.aupdate(prompt, llm_string, [ChatGeneration(message=message)])
+        return message
+
+    def stream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Iterator[AIMessageChunk]:
+        prompt, llm_string = _cache_key(self.llm, input, **kwargs)
+        cached = self.cache.lookup(prompt, llm_string)
+        if cached:
+            yield from _replay(cached)
+            return
+        full = None
+        for chunk in self.llm.stream(input, config, **kwargs):
+            full = chunk if full is None else full + chunk
+            yield chunk
+        if full is not None:
+            self.cache.update(prompt, llm_string, _to_generations(full))
+
+    async def astream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> AsyncIterator[AIMessageChunk]:
+        prompt, llm_string = _cache_key(self.llm, input, **kwargs)
+        cached = await self.cache.alookup(prompt, llm_string)
+        if cached:
+            for chunk in _replay(cached):
+                yield chunk
+            return
+        full = None
+        async for chunk in self.llm.astream(input, config, **kwargs):
+            full = chunk if full is None else full + chunk
+            yield chunk
+        if full is not None:
+            await self.cache.aupdate(prompt, llm_string, _to_generations(full))
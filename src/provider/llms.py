@@ -6,32 +6,84 @@
 @File    : llms.py
 """
 import os
+import threading
 
-from langchain.chat_models import init_chat_model
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
-from langchain_qwq import ChatQwen
 
 load_dotenv()
 
-# chatGpt的大语言模型
-chatGptLLM = ChatOpenAI(
-    model="gpt-4o",
-    base_url=os.getenv('XIAO_AI_BASE_URL'),
-    api_key=os.getenv('XIAO_AI_API_KEY'),
-    temperature=0,
-    timeout=10,
-    max_tokens=1000
-)
+
+# chatGpt的大语言模型，temperature=0 输出稳定，开启响应缓存
+def _create_chat_gpt():
+    from langchain_openai import ChatOpenAI
+    from .llm_cache import get_llm_cache
+    return ChatOpenAI(
+        model="gpt-4o",
+        base_url=os.getenv('XIAO_AI_BASE_URL'),
+        api_key=os.getenv('XIAO_AI_API_KEY'),
+        temperature=0,
+        timeout=10,
+        max_tokens=1000,
+        stream_usage=True,  # 流式输出也返回 token 用量，用于统计缓存节省的 token
+        cache=get_llm_cache(),
+    )
+
 
 # 阿里千问模型
-qwenLLM = ChatQwen(
-    model="qwen3-max",
-    base_url=os.getenv('QWEN_BASE_URL'),
-    api_key=os.getenv('QWEN_API_KEY'),
-)
-
-google_gemini = ChatGoogleGenerativeAI(
-    model="gemini-3-pro-preview",
-)
\ No newline at end of file
+def _create_qwen():
+    from langchain_qwq import ChatQwen
+    return ChatQwen(
+        model="qwen3-max",
+        base_url=os.getenv('QWEN_BASE_URL'),
+        api_key=os.getenv('QWEN_API_KEY'),
+    )
+
+
+def _create_google_gemini():
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(
+        model="gemini-3-pro-preview",
+    )
+
+
+# 模型名 -> 工厂函数，SDK 只在第一次获取时才会 import
+_FACTORIES = {
+    "gpt": _create_chat_gpt,
+    "qwen": _create_qwen,
+    "gemini": _create_google_gemini,
+}
+
+# 兼容原来的模块级变量名
+_ALIASES = {
+    "chatGptLLM": "gpt",
+    "qwenLLM": "qwen",
+    "google_gemini": "gemini",
+}
+
+_instances = {}
+_lock = threading.Lock()
+
+
+def get_llm(name: str):
+    """
+    按名称获取大语言模型，首次调用时创建并缓存。
+
+    Args:
+        name: gpt / qwen / gemini
+    """
+    if name not in _FACTORIES:
+        raise ValueError(f"未知的模型: {name}，可选: {', '.join(_FACTORIES)}")
+    llm = _instances.get(name)
+    if llm is None:
+        with _lock:
+            llm = _instances.get(name)
+            if llm is None:
+                llm = _FACTORIES[name]()
+                _instances[name] = llm
+    return llm
+
+
+def __getattr__(name: str):
+    if name in _ALIASES:
+        return get_llm(_ALIASES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
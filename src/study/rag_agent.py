@@ -5,6 +5,8 @@
 @Author  : tianshiyang
 @File    : rag_agent.py
 """
+import uuid
+
 import bs4
 from langchain.agents import create_agent
 from langchain.agents.middleware import ModelRequest, dynamic_prompt
@@ -14,8 +16,11 @@ from langchain_core.tools import tool
 from langchain_milvus import Milvus, BM25BuiltInFunction
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from milvus import CONNECTION_ARGS
+from milvus.async_retrieval import AsyncMilvusRetriever
+from milvus.batch_search import batch_similarity_search
+from milvus.registry import get_store
+from milvus.retrieval_gate import RetrievalGate
 from provider import chatGptLLM
-from utils import embeddings
 
 COLLECTION_NAME = "rag_agent"
 
@@ -35,7 +40,7 @@ def load_documents() -> list[Document]:
     chunks = text_spliter.split_documents(docs)
     return chunks
 
-# 获取向量数据库
+# 获取向量数据库，进程内共享同一个 store，不会每次调用模型都重新连接
 def get_vector_store() -> Milvus:
     dense_index_param = {
         "metric_type": "COSINE",
@@ -45,11 +50,10 @@ def get_vector_store() -> Milvus:
         "metric_type": "BM25",
         "index_type": "AUTOINDEX",
     }
-    return Milvus(
+    return get_store(
+        COLLECTION_NAME,
         index_params=[dense_index_param, sparse_index_param],
-        collection_name=COLLECTION_NAME,
         connection_args=CONNECTION_ARGS,
-        embedding_function=embeddings,
         vector_field=["dense", "sparse"],
         primary_field="id",
         builtin_function=BM25BuiltInFunction(
@@ -76,18 +80,62 @@ def retrieve_context(query: str):
     )
     return serialized, retrieved_docs
 
-@dynamic_prompt
-def prompt_with_context(reqeust: ModelRequest):
-    """Inject context into state messages."""
-    last_query = reqeust.messages[-1].text
-    retrieved_docs = get_vector_store().similarity_search(last_query)
+# 多个问题一次向量化、一次检索
+@tool
+def retrieve_context_multi(queries: list[str]):
+    """同时检索多个问题的相关信息，适合把复杂问题拆成多个子问题后一起检索"""
+    results = batch_similarity_search(get_vector_store(), queries, k=2)
+    serialized = "\n\n".join(
+        f"Question: {query}\n" + "\n".join(
+            f"Source: {doc.metadata}\nContent: {doc.page_content}" for doc in docs
+        )
+        for query, docs in zip(queries, results)
+    )
+    return serialized, [doc for docs in results for doc in docs]
+
+# 工具调用之后的再次调用模型、重复的问题、寒暄都不再检索；
+# 异步检索走 AsyncMilvusRetriever，每个事件循环使用各自的 AsyncMilvusClient，不复用 store 绑定在某个 loop 上的 aclient
+retrieval_gate = RetrievalGate(
+    search=lambda query: get_vector_store().similarity_search(query),
+    asearch=lambda query: AsyncMilvusRetriever(store=get_vector_store()).ainvoke(query),
+)
+
+def get_conversation_id(messages) -> str:
+    """
+    当前会话的 key：优先 thread_id；没有 thread_id 时用第一条消息的 id（同一次运行内不变），
+    都没有时每次调用都是新的 key，不与其他会话共享检索结果。
+    """
+    try:
+        from langgraph.config import get_config
+
+        thread_id = get_config().get("configurable", {}).get("thread_id")
+        if thread_id is not None:
+            return f"thread:{thread_id}"
+    except RuntimeError:
+        pass
+    if messages and messages[0].id:
+        return f"message:{messages[0].id}"
+    return f"call:{uuid.uuid4()}"
+
+def build_system_message(retrieved_docs: list[Document]) -> str:
     docs_content = "\n\n".join(doc.page_content for doc in retrieved_docs)
-    system_message = (
+    return (
         "You are a helpful assistant. Use the following context in your response:"
         f"\n\n{docs_content}"
     )
 
-    return system_message
+@dynamic_prompt
+def prompt_with_context(reqeust: ModelRequest):
+    """Inject context into state messages."""
+    retrieved_docs = retrieval_gate.retrieve(get_conversation_id(reqeust.messages), reqeust.messages)
+    return build_system_message(retrieved_docs)
+
+# 异步版本：agent.ainvoke / astream 时使用，向量化和 Milvus 检索都是原生异步
+@dynamic_prompt
+async def aprompt_with_context(reqeust: ModelRequest):
+    """Inject context into state messages."""
+    retrieved_docs = await retrieval_gate.aretrieve(get_conversation_id(reqeust.messages), reqeust.messages)
+    return build_system_message(retrieved_docs)
 
 if __name__ == "__main__":
     chunks = load_documents()
@@ -95,7 +143,7 @@ if __name__ == "__main__":
     # insert_documents(chunks, vector_store)
 
     # 方式1
-    # tools = [retrieve_context]
+    # tools = [retrieve_context, retrieve_context_multi]
     # prompt = (
     #     "You have access to a tool that retrieves context from a blog post. "
     #     "Use the tool to help answer user queries."
@@ -112,3 +160,5 @@ if __name__ == "__main__":
             stream_mode="values",
     ):
         step["messages"][-1].pretty_print()
+    # 每个会话省掉的检索次数
+    print(retrieval_gate.stats())
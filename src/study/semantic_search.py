@@ -6,51 +6,93 @@
 @File    : semantic_search.py
 """
 import os.path
-import uuid
 
-from langchain_community.document_loaders import PDFMinerLoader
 from langchain_core.documents import Document
-from langchain_milvus import Milvus
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 from milvus import CONNECTION_ARGS
-from utils import embeddings
+from milvus.bulk_import import bulk_insert_documents
+from milvus.dedup import dedup_documents
+from milvus.mmr import MMRRetriever
+from milvus.parallel_loader import parallel_load
+from milvus.query_cache import CachedVectorStore, invalidate
+from milvus.registry import get_store
+from milvus.manifest import IngestManifest, assign_chunk_ids, file_hash, sync_sources
+from milvus.tenant import in_filter
+from utils import embeddings, TokenAwareSplitter
+
+COLLECTION_NAME = "financial_report"
 
 file_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "docs", "科大讯飞财报.pdf")
 
-vector_store = Milvus(
-    embedding_function=embeddings,
+# 检索结果带缓存，add_documents / delete 后自动失效
+vector_store = CachedVectorStore(get_store(
+    COLLECTION_NAME,
     connection_args=CONNECTION_ARGS,
     primary_field="id",
-    collection_name="financial_report",
     text_field="content",
-)
-
-def load_pdf():
-    loader = PDFMinerLoader(file_path)
+    # collapsed_offsets 等未声明的 metadata 写入动态字段，否则会被丢弃
+    enable_dynamic_field=True,
+))
 
-    documents = loader.load()
+def load_pdf(max_workers: int = None):
+    # 按页拆分后多进程解析，每页一个 Document（metadata 带 page_no）
+    documents = list(parallel_load([file_path], max_workers=max_workers))
 
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_overlap=50,
-        chunk_size=100,
+    text_splitter = TokenAwareSplitter(
+        chunk_overlap=32,
+        chunk_size=256,
         add_start_index=True
     )
 
     chunks = text_splitter.split_documents(
         documents,
     )
-    return chunks
+    # 每页重复的页眉页脚等近似重复 chunk 合并到第一次出现的 chunk，出处记在 collapsed_offsets
+    return dedup_documents(chunks)
 
-def insert_document_to_milvus(document: list[Document]):
-    def set_content(chunk: Document):
-        chunk.metadata['content'] = chunk.page_content
-        return chunk
+def set_content(chunk: Document):
+    chunk.metadata['content'] = chunk.page_content
+    return chunk
 
+def insert_document_to_milvus(document: list[Document]):
+    # 确定性 id：(source, start_index, 内容hash)，重复执行不会产生新 id
     vector_store.add_documents(
         list(map(set_content, document)),
-        ids=[str(uuid.uuid4()) for _ in range(len(document))]
+        ids=assign_chunk_ids(document)
+    )
+
+def bulk_insert_document_to_milvus(document: list[Document]):
+    """大批量首次导入：bulk import 代替逐批 add_documents，id 与 insert_document_to_milvus 一致"""
+    assign_chunk_ids(document)
+    timings = bulk_insert_documents(COLLECTION_NAME, map(set_content, document), embeddings, connection_args=CONNECTION_ARGS)
+    invalidate(COLLECTION_NAME)
+    return timings
+
+def existing_ids(ids: list[str]) -> set[str]:
+    """ids 中已经写入 Milvus 的部分，强一致读，用于更新清单前的校验"""
+    found = set()
+    for start in range(0, len(ids), 1000):
+        rows = vector_store.client.query(
+            COLLECTION_NAME,
+            filter=in_filter("id", ids[start:start + 1000]),
+            output_fields=["id"],
+            consistency_level="Strong",
+        )
+        found.update(row["id"] for row in rows)
+    return found
+
+def sync_document_to_milvus():
+    """增量同步财报：文件未变化直接跳过，变化时只写入新增 chunk、删除消失的 chunk"""
+    stats = sync_sources(
+        IngestManifest(COLLECTION_NAME),
+        {file_path: file_hash(file_path)},
+        lambda source: load_pdf(),
+        lambda chunks, ids: vector_store.add_documents(list(map(set_content, chunks)), ids=ids),
+        lambda ids: vector_store.delete(ids=ids),
+        existing_ids,
     )
+    print(stats)
+    return stats
 
 def similarity_search():
     result = vector_store.similarity_search(
@@ -70,7 +112,7 @@ def similarity_search_by_vector():
         print(doc)
 
 def search_by_retriever():
-    retriever = vector_store.as_retriever(search_type="mmr", search_kwargs={"k": 3})
+    retriever = MMRRetriever(store=vector_store, k=3, fetch_k=20)
     docs = retriever.invoke("财务报表", expr='id == "07c71d15-c70b-43ff-b22e-2d34a7ccf35e"')
     for doc in docs:
         print("#" * 30)
@@ -79,6 +121,8 @@ def search_by_retriever():
 if __name__ == "__main__":
     # documents = load_pdf()
     # insert_document_to_milvus(documents)
+    # bulk_insert_document_to_milvus(documents)
+    # sync_document_to_milvus()
     # similarity_search()
     # similarity_search_by_vector()
     search_by_retriever()
@@ -5,7 +5,37 @@
 @Author  : tianshiyang
 @File    : __init__.py.py
 """
-from .embeddings import embeddings
+from importlib import import_module
+
+# 子模块不能与懒加载的名字（embeddings）同名，否则 import 子模块后包属性会被子模块覆盖
+from .embedding_factory import get_embeddings, get_dashscope_embeddings
+
 __all__ = [
     "embeddings",
-]
\ No newline at end of file
+    "dashscope_embeddings",
+    "get_embeddings",
+    "get_dashscope_embeddings",
+    "CacheBackedEmbeddings",
+    "embed_in_batches",
+    "RateLimiter",
+    "TokenAwareSplitter",
+]
+
+# 名称 -> 所在子模块，第一次访问时才 import，避免 import utils 就加载 langchain
+_LAZY = {
+    "CacheBackedEmbeddings": ".embedding_cache",
+    "embed_in_batches": ".batch_embed",
+    "RateLimiter": ".batch_embed",
+    "TokenAwareSplitter": ".token_splitter",
+}
+
+
+# embeddings / dashscope_embeddings 在第一次访问时才创建
+def __getattr__(name: str):
+    if name == "embeddings":
+        return get_embeddings()
+    if name == "dashscope_embeddings":
+        return get_dashscope_embeddings()
+    if name in _LAZY:
+        return getattr(import_module(_LAZY[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,108 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 17:10
+@Author  : tianshiyang
+@File    : async_embeddings.py
+"""
+import asyncio
+import threading
+from typing import Optional
+
+import httpx
+from langchain_core.embeddings import Embeddings
+
+from .loop_scoped import LoopScoped
+
+DASHSCOPE_EMBEDDING_URL = "https://dashscope.aliyuncs.com/api/v1/services/embeddings/text-embedding/text-embedding"
+
+# text-embedding-v3 单次请求最多 10 条文本
+MAX_BATCH_SIZE = 10
+
+
+class DashScopeAsyncEmbeddings(Embeddings):
+    """
+    同步调用沿用 DashScopeEmbeddings，异步调用直接走 DashScope HTTP 接口（httpx），不占用线程池。
+
+    Args:
+        sync_embeddings: langchain_community 的 DashScopeEmbeddings
+        api_key: DashScope api key
+        model: 模型名
+        timeout: 单次请求超时时间（秒）
+        dimension: 输出向量维度（text-embedding-v3 支持 1024/768/512/256/128/64），None 为模型默认的 1024
+    """
+
+    def __init__(
+            self,
+            sync_embeddings: Embeddings,
+            api_key: str,
+            model: str,
+            timeout: float = 30,
+            dimension: Optional[int] = None,
+    ):
+        self.sync_embeddings = sync_embeddings
+        self.api_key = api_key
+        self.model = model
+        self.timeout = timeout
+        self.dimension = dimension
+        # httpx.AsyncClient 绑定创建时的事件循环，每个 loop 各用一个，loop 结束时关闭
+        self._clients = LoopScoped(lambda: httpx.AsyncClient(timeout=self.timeout), lambda client: client.aclose())
+        self._sync_client: httpx.Client = None
+        self._sync_lock = threading.Lock()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        # DashScopeEmbeddings 不支持 dimension 参数，指定维度时直接走 HTTP
+        if self.dimension:
+            return self._post(texts, "document")
+        return self.sync_embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        if self.dimension:
+            return self._post([text], "query")[0]
+        return self.sync_embeddings.embed_query(text)
+
+    def _payload(self, texts: list[str], text_type: str) -> dict:
+        return {
+            "url": DASHSCOPE_EMBEDDING_URL,
+            "headers": {"Authorization": f"Bearer {self.api_key}"},
+            "json": {
+                "model": self.model,
+                "input": {"texts": texts},
+                "parameters": {"text_type": text_type, **({"dimension": self.dimension} if self.dimension else {})},
+            },
+        }
+
+    @staticmethod
+    def _parse(response: httpx.Response) -> list[list[float]]:
+        response.raise_for_status()
+        items = response.json()["output"]["embeddings"]
+        items.sort(key=lambda item: item["text_index"])
+        return [item["embedding"] for item in items]
+
+    async def _request(self, texts: list[str], text_type: str) -> list[list[float]]:
+        client = await self._clients.get()
+        return self._parse(await client.post(**self._payload(texts, text_type)))
+
+    def _post(self, texts: list[str], text_type: str) -> list[list[float]]:
+        with self._sync_lock:
+            if self._sync_client is None:
+                self._sync_client = httpx.Client(timeout=self.timeout)
+        vectors = []
+        for i in range(0, len(texts), MAX_BATCH_SIZE):
+            response = self._sync_client.post(**self._payload(texts[i:i + MAX_BATCH_SIZE], text_type))
+            vectors.extend(self._parse(response))
+        return vectors
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        """一次请求向量化多条 query（text_type=query），DashScopeEmbeddings 只支持逐条请求"""
+        if len(texts) == 1:
+            return [self.embed_query(texts[0])]
+        return self._post(texts, "query")
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        batches = [texts[i:i + MAX_BATCH_SIZE] for i in range(0, len(texts), MAX_BATCH_SIZE)]
+        results = await asyncio.gather(*(self._request(batch, "document") for batch in batches))
+        return [vector for batch in results for vector in batch]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return (await self._request([text], "query"))[0]
@@ -0,0 +1,85 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 10:05
+@Author  : tianshiyang
+@File    : batch_embed.py
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from langchain_core.embeddings import Embeddings
+
+# text-embedding-v3 单次请求最多 10 条文本
+DEFAULT_BATCH_SIZE = 10
+
+
+class RateLimiter:
+    """
+    简单的令牌桶限流，多线程共享。
+
+    Args:
+        max_rps: 每秒最多发起的请求数，None 表示不限流
+    """
+
+    def __init__(self, max_rps: Optional[float] = None):
+        self.max_rps = max_rps
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def acquire(self):
+        if not self.max_rps:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_at - now
+            self._next_at = max(now, self._next_at) + 1.0 / self.max_rps
+        if wait > 0:
+            time.sleep(wait)
+
+
+def embed_in_batches(
+        texts: list[str],
+        embeddings: Embeddings,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_workers: int = 4,
+        max_rps: Optional[float] = None,
+        verbose: bool = True,
+        limiter: Optional[RateLimiter] = None,
+) -> list[list[float]]:
+    """
+    按 batch_size 分批调用 embed_documents，最多 max_workers 个批次并发请求，返回顺序与 texts 一致。
+
+    Args:
+        texts: 待向量化的文本
+        embeddings: Embeddings 实例
+        batch_size: 每次请求的文本条数，需不超过模型的单次上限
+        max_workers: 同时在途的请求数
+        max_rps: 每秒最多请求数
+        verbose: 结束时是否打印吞吐
+        limiter: 多次调用共享的限流器（如流式入库的每个批次），传入时忽略 max_rps
+    """
+    if not texts:
+        return []
+
+    limiter = limiter or RateLimiter(max_rps)
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+
+    def _embed(batch: list[str]) -> list[list[float]]:
+        limiter.acquire()
+        return embeddings.embed_documents(batch)
+
+    start = time.perf_counter()
+    vectors: list[list[float]] = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # executor.map 按提交顺序返回结果
+        for batch_vectors in executor.map(_embed, batches):
+            vectors.extend(batch_vectors)
+    elapsed = time.perf_counter() - start
+
+    if verbose:
+        rate = len(texts) / elapsed if elapsed else float("inf")
+        print(f"向量化完成: {len(texts)} 个 chunk, {len(batches)} 个批次, 耗时 {elapsed:.2f}s, {rate:.1f} chunks/s")
+    return vectors
@@ -0,0 +1,253 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18 09:12
+@Author  : tianshiyang
+@File    : embedding_cache.py
+"""
+import asyncio
+import hashlib
+import os
+import sqlite3
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+from langchain_core.embeddings import Embeddings
+
+# 默认缓存文件放在 src/.cache 下
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "embeddings.sqlite"
+)
+
+
+def _pack(vector: list[float]) -> bytes:
+    return struct.pack(f"<{len(vector)}f", *vector)
+
+
+def _unpack(blob: bytes) -> list[float]:
+    return list(struct.unpack(f"<{len(blob) // 4}f", blob))
+
+
+class CacheBackedEmbeddings(Embeddings):
+    """
+    带两级缓存的 Embeddings 包装：进程内 LRU + SQLite 磁盘缓存。
+
+    缓存 key 为 模型名 + 文本 sha256，相同文本重复向量化不会再请求模型。
+
+    Args:
+        underlying: 真正调用模型的 Embeddings
+        model_name: 模型名，参与缓存 key，换模型不会命中旧向量
+        path: SQLite 文件路径
+        memory_size: 进程内 LRU 最多保留的向量条数
+        max_disk_bytes: 磁盘缓存上限（向量字节数），超出按最久未访问淘汰
+    """
+
+    def __init__(
+            self,
+            underlying: Embeddings,
+            model_name: str,
+            path: str = DEFAULT_CACHE_PATH,
+            memory_size: int = 10_000,
+            max_disk_bytes: int = 512 * 1024 * 1024,
+    ):
+        self.underlying = underlying
+        self.model_name = model_name
+        self.path = path
+        self.memory_size = memory_size
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.RLock()
+        self._conn = None
+
+    # ---------------- 存储 ----------------
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embedding_cache ("
+                "key TEXT PRIMARY KEY, vector BLOB NOT NULL, "
+                "size INTEGER NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_embedding_cache_accessed "
+                "ON embedding_cache(accessed_at)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _key(self, text: str, kind: str = "document") -> str:
+        # query 和 document 的 text_type 不同，向量也不同，需要分开缓存
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{self.model_name}:{kind}:{digest}"
+
+    def _remember(self, key: str, vector: list[float]):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, keys: list[str]) -> dict[str, list[float]]:
+        found = {}
+        missing = []
+        for key in keys:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                found[key] = self._memory[key]
+            else:
+                missing.append(key)
+        if not missing:
+            return found
+
+        conn = self._connect()
+        now = time.time()
+        # SQLite 单条语句的参数个数有限制，分批查询
+        for start in range(0, len(missing), 500):
+            part = missing[start:start + 500]
+            placeholders = ",".join("?" * len(part))
+            rows = conn.execute(
+                f"SELECT key, vector FROM embedding_cache WHERE key IN ({placeholders})", part
+            ).fetchall()
+            for key, blob in rows:
+                vector = _unpack(blob)
+                found[key] = vector
+                self._remember(key, vector)
+            if rows:
+                conn.executemany(
+                    "UPDATE embedding_cache SET accessed_at = ? WHERE key = ?",
+                    [(now, key) for key, _ in rows],
+                )
+        conn.commit()
+        return found
+
+    def _store(self, items: dict[str, list[float]]):
+        if not items:
+            return
+        conn = self._connect()
+        now = time.time()
+        rows = []
+        for key, vector in items.items():
+            blob = _pack(vector)
+            rows.append((key, blob, len(blob), now))
+            self._remember(key, vector)
+        conn.executemany(
+            "INSERT OR REPLACE INTO embedding_cache (key, vector, size, accessed_at) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        conn.commit()
+        self._evict()
+
+    def _evict(self):
+        conn = self._connect()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM embedding_cache").fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+        # 按最久未访问淘汰，直到回到上限的 90%
+        target = int(self.max_disk_bytes * 0.9)
+        cursor = conn.execute("SELECT key, size FROM embedding_cache ORDER BY accessed_at")
+        evicted = []
+        for key, size in cursor:
+            if total <= target:
+                break
+            evicted.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM embedding_cache WHERE key = ?", evicted)
+        conn.commit()
+        for (key,) in evicted:
+            self._memory.pop(key, None)
+
+    # ---------------- Embeddings 接口 ----------------
+    def _prepare(self, texts: list[str], kind: str):
+        """查缓存，返回 (keys, 已命中的向量, 需要请求模型的 key -> 文本)"""
+        keys = [self._key(text, kind) for text in texts]
+        with self._lock:
+            found = self._lookup(list(dict.fromkeys(keys)))
+
+        # 同一批里重复的文本只请求一次
+        pending: dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                pending.setdefault(key, text)
+
+        with self._lock:
+            self.hits += len(keys) - sum(1 for key in keys if key in pending)
+            self.misses += len(pending)
+        return keys, found, pending
+
+    def _finish(self, keys, found, pending, vectors) -> list[list[float]]:
+        computed = dict(zip(pending.keys(), vectors))
+        with self._lock:
+            self._store(computed)
+        found.update(computed)
+        return [found[key] for key in keys]
+
+    def _embed(self, texts: list[str], kind: str) -> list[list[float]]:
+        keys, found, pending = self._prepare(texts, kind)
+        vectors = []
+        if pending:
+            # 只有真正的批量才走 embed_queries（HTTP 批量接口），单条 query 仍走底层 SDK 的 embed_query
+            if kind == "query" and len(pending) > 1 and hasattr(self.underlying, "embed_queries"):
+                vectors = self.underlying.embed_queries(list(pending.values()))
+            elif kind == "query":
+                vectors = [self.underlying.embed_query(text) for text in pending.values()]
+            else:
+                vectors = self.underlying.embed_documents(list(pending.values()))
+        return self._finish(keys, found, pending, vectors)
+
+    async def _aembed(self, texts: list[str], kind: str) -> list[list[float]]:
+        # SQLite 读写是同步 I/O，放到线程里执行，不阻塞事件循环
+        keys, found, pending = await asyncio.to_thread(self._prepare, texts, kind)
+        vectors = []
+        if pending:
+            if kind == "query":
+                vectors = [await self.underlying.aembed_query(text) for text in pending.values()]
+            else:
+                vectors = await self.underlying.aembed_documents(list(pending.values()))
+        return await asyncio.to_thread(self._finish, keys, found, pending, vectors)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._embed(texts, "document")
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed([text], "query")[0]
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        """批量向量化 query，与 embed_query 共用缓存"""
+        return self._embed(texts, "query")
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return await self._aembed(texts, "document")
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return (await self._aembed([text], "query"))[0]
+
+    # ---------------- 统计 ----------------
+    def stats(self) -> dict:
+        with self._lock:
+            conn = self._connect()
+            rows, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM embedding_cache"
+            ).fetchone()
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": rows,
+                "disk_bytes": size,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            conn = self._connect()
+            conn.execute("DELETE FROM embedding_cache")
+            conn.commit()
+            self.hits = 0
+            self.misses = 0
@@ -0,0 +1,66 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2025/12/24 02:14
+@Author  : tianshiyang
+@File    : embedding_factory.py
+"""
+import functools
+import os
+import threading
+
+EMBEDDING_MODEL = "text-embedding-v3"
+
+_instances = {}
+_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def _env_dimension():
+    import dotenv
+
+    dotenv.load_dotenv()
+    return int(os.getenv("EMBEDDING_DIMENSION") or 0) or None
+
+
+def embedding_dimension(dimension: int = None):
+    """向量维度：参数优先，其次环境变量 EMBEDDING_DIMENSION（512 / 256 等可以降低 Milvus 内存占用），默认 None 即 1024"""
+    return dimension or _env_dimension()
+
+
+def get_dashscope_embeddings(dimension: int = None):
+    """直接请求 DashScope 的 embeddings，首次调用时创建"""
+    dimension = embedding_dimension(dimension)
+    key = ("dashscope", dimension)
+    with _lock:
+        if key not in _instances:
+            import dotenv
+            from langchain_community.embeddings import DashScopeEmbeddings
+            from .async_embeddings import DashScopeAsyncEmbeddings
+
+            dotenv.load_dotenv()
+            api_key = os.getenv("DASHSCOPE_API_KEY")
+            # 同步走 DashScopeEmbeddings，异步走 httpx
+            _instances[key] = DashScopeAsyncEmbeddings(
+                DashScopeEmbeddings(model=EMBEDDING_MODEL, dashscope_api_key=api_key),
+                api_key=api_key,
+                model=EMBEDDING_MODEL,
+                dimension=dimension,
+            )
+        return _instances[key]
+
+
+def get_embeddings(dimension: int = None):
+    """带缓存的 embeddings，所有入库 / 查询都走这里，相同文本不会重复请求模型"""
+    dimension = embedding_dimension(dimension)
+    dashscope_embeddings = get_dashscope_embeddings(dimension)
+    key = ("cached", dimension)
+    with _lock:
+        if key not in _instances:
+            from .embedding_cache import CacheBackedEmbeddings
+
+            # 不同维度的向量分开缓存
+            model_name = f"{EMBEDDING_MODEL}@{dimension}" if dimension else EMBEDDING_MODEL
+            _instances[key] = CacheBackedEmbeddings(dashscope_embeddings, model_name=model_name)
+        return _instances[key]
+
@@ -0,0 +1,52 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/20 10:10
+@Author  : tianshiyang
+@File    : loop_scoped.py
+"""
+import asyncio
+import threading
+import weakref
+from typing import Awaitable, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class LoopScoped(Generic[T]):
+    """
+    每个事件循环各自的对象（如 httpx.AsyncClient / AsyncMilvusClient），它们绑定创建时的 loop，不能跨 loop 复用。
+
+    以 loop 对象本身为弱引用 key（不用 id(loop)，loop 回收后 id 可能被新的 loop 复用）；
+    asyncio.run 退出前会执行 shutdown_asyncgens，借助一个挂起的异步生成器在那时关闭对象。
+
+    Args:
+        factory: 创建对象，在目标 loop 中调用
+        close: 关闭对象的协程函数
+    """
+
+    def __init__(self, factory: Callable[[], T], close: Callable[[T], Awaitable]):
+        self.factory = factory
+        self.close = close
+        self._items: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    async def _close_on_shutdown(self, value: T):
+        try:
+            yield
+        finally:
+            await self.close(value)
+
+    async def get(self) -> T:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._items.get(loop)
+            if entry is not None:
+                return entry[0]
+            value = self.factory()
+            # loop 只弱引用异步生成器，这里保存强引用
+            closer = self._close_on_shutdown(value)
+            self._items[loop] = (value, closer)
+        # 第一次迭代时注册到当前 loop，停在 yield 处，loop 关闭时被 aclose
+        await closer.__anext__()
+        return value
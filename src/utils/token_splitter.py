@@ -0,0 +1,226 @@
+#!/user/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/19 20:20
+@Author  : tianshiyang
+@File    : token_splitter.py
+"""
+import copy
+import functools
+import re
+from typing import Callable, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_text_splitters import TextSplitter
+
+# 句子边界：换行、中文句末标点、英文句末标点后跟空白
+_SENTENCE_END = re.compile(r"\n+|[。！？；!?;]+[\"”’）)]*|(?<=[A-Za-z0-9%)\"”][.!?])\s+(?=[A-Z\"“(\[])")
+
+# 标题：markdown 标题、"第一章 / 第3节"、"一、" 开头的短行
+_HEADING = re.compile(r"\s*(#{1,6}\s|第[一二三四五六七八九十百\d]+[章节部分篇]|[一二三四五六七八九十]+、)")
+
+_CJK = re.compile(r"[㐀-鿿豈-﫿]")
+_WORD = re.compile(r"[A-Za-z0-9]+")
+_SYMBOL = re.compile(r"[^\sA-Za-z0-9㐀-鿿豈-﫿]")
+
+
+_SPACES = np.asarray([ord(c) for c in " \t\n\r\f\v\u3000\xa0"], dtype=np.uint32)
+
+
+def estimate_tokens(text: str) -> int:
+    """没有 tokenizer 时的估算：汉字约 1 token，英文单词约 1.3 token，标点约 0.5 token"""
+    cjk = len(_CJK.findall(text))
+    words = len(_WORD.findall(text))
+    symbols = len(_SYMBOL.findall(text))
+    return int(np.ceil(cjk + words * 1.3 + symbols * 0.5))
+
+
+def token_weight_cumsum(text: str) -> np.ndarray:
+    """
+    与 estimate_tokens 相同的口径，一次算出每个字符位置之前的 token 估算值（长度 len(text) + 1），
+    任意区间 [s, e) 的 token 数为 cum[e] - cum[s]，不需要逐句跑正则。
+    """
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    cjk = ((codes >= 0x3400) & (codes <= 0x9FFF)) | ((codes >= 0xF900) & (codes <= 0xFAFF))
+    alnum = ((codes >= 48) & (codes <= 57)) | ((codes >= 65) & (codes <= 90)) | ((codes >= 97) & (codes <= 122))
+    word_start = alnum & ~np.concatenate(([False], alnum[:-1]))
+    symbol = ~(alnum | cjk | np.isin(codes, _SPACES))
+    weights = cjk * 1.0 + word_start * 1.3 + symbol * 0.5
+    return np.concatenate(([0.0], np.cumsum(weights)))
+
+
+@functools.lru_cache(maxsize=1)
+def default_token_counter() -> Callable[[str], int]:
+    """优先使用 dashscope 的本地 Qwen tokenizer（与 text-embedding-v3 的计费口径一致），否则估算"""
+    try:
+        from dashscope import get_tokenizer
+
+        tokenizer = get_tokenizer("qwen-turbo")
+        return lambda text: len(tokenizer.encode(text))
+    except Exception:
+        return estimate_tokens
+
+
+def sentence_spans(text: str) -> np.ndarray:
+    """按句子边界切成 (start, end) 区间，只扫描一次文本，去掉纯空白的区间"""
+    ends = [match.end() for match in _SENTENCE_END.finditer(text)]
+    if not ends or ends[-1] != len(text):
+        ends.append(len(text))
+    ends = np.asarray(ends, dtype=np.int64)
+    starts = np.concatenate(([0], ends[:-1]))
+    keep = np.asarray([not text[s:e].isspace() for s, e in zip(starts, ends)], dtype=bool) & (ends > starts)
+    return np.stack([starts[keep], ends[keep]], axis=1)
+
+
+class TokenAwareSplitter(TextSplitter):
+    """
+    按模型 token 数切分，中英文句子 / 标题感知：chunk 只在句子边界断开，遇到标题开始新的 chunk。
+
+    实现上先一次性算出所有句子的区间和 token 数，用 cumsum + searchsorted 找每个 chunk 的边界，
+    每个 chunk 只从原文切片一次，start_index 直接由区间得到，不需要 text.find。
+
+    Args:
+        chunk_size: 每个 chunk 最多的 token 数
+        chunk_overlap: 相邻 chunk 重叠的 token 数（按整句重叠）
+        token_counter: 计算 token 数的函数，默认 default_token_counter()
+        heading_aware: 是否在标题处强制断开，并把所在标题写入 metadata 的 heading
+        add_start_index: 是否在 metadata 中写入 start_index
+    """
+
+    def __init__(
+            self,
+            chunk_size: int = 256,
+            chunk_overlap: int = 32,
+            token_counter: Optional[Callable[[str], int]] = None,
+            heading_aware: bool = True,
+            add_start_index: bool = False,
+            **kwargs,
+    ):
+        self._count = token_counter or default_token_counter()
+        super().__init__(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_function=self._count,
+            add_start_index=add_start_index,
+            **kwargs,
+        )
+        self.heading_aware = heading_aware
+
+    # ---------------- 预计算 ----------------
+    def _span_tokens(self, text: str, start: int, end: int, cum: Optional[np.ndarray]) -> int:
+        if cum is not None:
+            return int(np.ceil(cum[end] - cum[start]))
+        return self._count(text[start:end])
+
+    def _split_long(self, text: str, start: int, end: int, count: int, cum: Optional[np.ndarray]) -> list[tuple]:
+        """
+        超过 chunk_size 的区间按字符均分，每段重新计数；仍然超出的继续细分，直到不超过 chunk_size 或只剩一个字符。
+        没有空白、按估算几乎不算 token 的长串（如 URL、base64）也会因此按字符切开。
+        """
+        if count <= self._chunk_size or end - start <= 1:
+            return [(start, end, count)]
+        pieces = min(max(2, int(np.ceil(count / self._chunk_size))), end - start)
+        cuts = np.linspace(start, end, pieces + 1).astype(np.int64)
+        # 英文尽量在空白处断开，不切断单词
+        for i in range(1, pieces):
+            space = text.rfind(" ", int(cuts[i - 1]) + 1, int(cuts[i]))
+            if space > 0 and cuts[i] - space < 20:
+                cuts[i] = space + 1
+        result = []
+        for piece_start, piece_end in zip(cuts[:-1], cuts[1:]):
+            piece_start, piece_end = int(piece_start), int(piece_end)
+            if piece_end > piece_start:
+                piece_count = self._span_tokens(text, piece_start, piece_end, cum)
+                result.extend(self._split_long(text, piece_start, piece_end, piece_count, cum))
+        return result
+
+    def _units(self, text: str):
+        """句子区间、每句 token 数、是否标题；超过 chunk_size 的长句切成多段，每段按实际 token 数计"""
+        spans, tokens, headings = [], [], []
+        sentences = sentence_spans(text)
+        cum = None
+        if self._count is estimate_tokens:
+            # 估算口径可以整段文本一次算完
+            cum = token_weight_cumsum(text)
+            counts = np.ceil(cum[sentences[:, 1]] - cum[sentences[:, 0]]).astype(np.int64)
+        else:
+            counts = [self._count(text[start:end]) for start, end in sentences]
+        for (start, end), count in zip(sentences, counts):
+            sentence = text[start:end]
+            is_heading = self.heading_aware and len(sentence) < 80 and bool(_HEADING.match(sentence))
+            for i, (piece_start, piece_end, piece_count) in enumerate(self._split_long(text, int(start), int(end), int(count), cum)):
+                spans.append((piece_start, piece_end))
+                tokens.append(piece_count)
+                headings.append(is_heading and i == 0)
+        return np.asarray(spans, dtype=np.int64).reshape(-1, 2), np.asarray(tokens, dtype=np.int64), np.asarray(headings)
+
+    def _chunk_ranges(self, tokens: np.ndarray, headings: np.ndarray) -> list[tuple[int, int]]:
+        """返回每个 chunk 覆盖的句子下标 [first, last)"""
+        n = len(tokens)
+        if n == 0:
+            return []
+        cum = np.concatenate(([0], np.cumsum(tokens)))
+        # 每句所在段落（标题到下一个标题之间）的结束位置，chunk 不跨段；连续的多级标题算同一段的开头
+        if self.heading_aware:
+            section_starts = np.flatnonzero(headings & ~np.concatenate(([False], headings[:-1])))
+        else:
+            section_starts = np.asarray([], dtype=np.int64)
+        section_bounds = np.append(section_starts[section_starts > 0], n)
+        section_end = section_bounds[np.searchsorted(section_bounds, np.arange(n), side="right")]
+
+        ranges = []
+        first = 0
+        while first < n:
+            last = int(np.searchsorted(cum, cum[first] + self._chunk_size, side="right")) - 1
+            last = min(max(last, first + 1), int(section_end[first]))
+            ranges.append((first, last))
+            if last >= n:
+                break
+            if last == section_end[first]:
+                # 新的段落不带上一段的重叠
+                first = last
+                continue
+            # 从后往前保留不超过 chunk_overlap 的整句作为重叠，且下一个 chunk 至少要放得下第 last 句
+            overlap_start = int(np.searchsorted(cum, cum[last] - self._chunk_overlap, side="left"))
+            fit_start = int(np.searchsorted(cum, cum[last + 1] - self._chunk_size, side="left"))
+            first = min(max(overlap_start, fit_start, first + 1), last)
+        return ranges
+
+    # ---------------- TextSplitter 接口 ----------------
+    def _split(self, text: str) -> list[tuple[str, int, Optional[str]]]:
+        spans, tokens, headings = self._units(text)
+        heading_index = np.flatnonzero(headings)
+        chunks = []
+        for first, last in self._chunk_ranges(tokens, headings):
+            start, end = int(spans[first][0]), int(spans[last - 1][1])
+            chunk = text[start:end]
+            if self._strip_whitespace:
+                stripped = chunk.lstrip()
+                start += len(chunk) - len(stripped)
+                chunk = stripped.rstrip()
+            if not chunk:
+                continue
+            heading = None
+            position = np.searchsorted(heading_index, first, side="right") - 1
+            if position >= 0:
+                h_start, h_end = spans[heading_index[position]]
+                heading = text[h_start:h_end].strip().lstrip("#").strip()
+            chunks.append((chunk, start, heading))
+        return chunks
+
+    def split_text(self, text: str) -> list[str]:
+        return [chunk for chunk, _, _ in self._split(text)]
+
+    def create_documents(self, texts: list[str], metadatas: Optional[list[dict]] = None) -> list[Document]:
+        metadatas = metadatas or [{}] * len(texts)
+        documents = []
+        for text, metadata in zip(texts, metadatas):
+            for chunk, start, heading in self._split(text):
+                chunk_metadata = copy.deepcopy(metadata)
+                if self._add_start_index:
+                    chunk_metadata["start_index"] = start
+                if heading:
+                    chunk_metadata["heading"] = heading
+                documents.append(Document(page_content=chunk, metadata=chunk_metadata))
+        return documents